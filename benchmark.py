@@ -0,0 +1,179 @@
+""" Python module that runs the bid path benchmark """
+import json
+import sys
+from typing import Optional
+from rich import print
+from rich.table import Table
+
+from algosdk.v2client.algod import AlgodClient
+
+from source.utils.utils_account import initialize_algod_client
+from source.utils.utils_benchmark import compare_contracts, compare_results, measure_startup, measure_transport, profile_contract, run_scenario, write_results
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.classes.class_SimulatedKMDClient import SimulatedKMDClient
+from source.classes.class_TealProfiler import profile_regressions
+
+USAGE = """usage:
+    python benchmark.py SCENARIO.json           run a scenario, write results to benchmark_results/
+    python benchmark.py compare OLD.json NEW.json
+    python benchmark.py contracts [BASELINE [CANDIDATE]] [--sandbox]   size and opcode cost of two approval programs
+    python benchmark.py profile [CONTRACT] [--json] [--sandbox]        static cost of every branch and subroutine
+    python benchmark.py profile-check OLD.json [CONTRACT] [--sandbox]  exits 1 when CONTRACT regressed from a saved profile
+    --sandbox compiles through the sandbox algod for exact program sizes, they are estimated otherwise
+    python benchmark.py startup [ARTIFACTS] [RUNS]        cold start of a bidding process, with and without artifacts
+    python benchmark.py transport [REQUESTS] [THREADS]    urllib against pooled keep-alive connections on a local stand-in for algod
+"""
+
+
+def benchmark(scenario_path: str) -> None:
+    """ Runs a scenario file and prints a summary """
+    with open(scenario_path) as scenario_file:
+        spec = json.load(scenario_file)
+
+    if spec.get("client", "simulated") == "simulated":
+        algod_client = SimulatedAlgodClient()
+        kmd_client = SimulatedKMDClient(algod_client)
+    else:
+        algod_client = initialize_algod_client()
+        kmd_client = None
+
+    results = run_scenario(spec, algod_client, kmd_client)
+    path = write_results(results, spec.get("results_dir", "benchmark_results"))
+
+    table = Table(title=f"Bid path: {results['scenario']}")
+    for column in ("Auctions", "Bidders", "Bids", "Bids/s", "p50 ms", "p95 ms", "p99 ms", "Failure rate", "RPC/bid"):
+        table.add_column(column, justify="right")
+    for run in results["runs"]:
+        table.add_row(
+            str(run["auctions"]), str(run["bidders"]), str(run["bids"]),
+            f"{run['bids_per_second']:.1f}",
+            f"{run['latency_ms']['p50']:.2f}", f"{run['latency_ms']['p95']:.2f}", f"{run['latency_ms']['p99']:.2f}",
+            f"{run['failure_rate']:.1%}", f"{run['rpc_calls_per_bid']:.2f}",
+        )
+    print(table)
+    print(f"[green] Results written to [cyan]{path}")
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """ Prints the change between two result files """
+    with open(baseline_path) as baseline_file, open(candidate_path) as candidate_file:
+        rows = compare_results(json.load(baseline_file), json.load(candidate_file))
+
+    table = Table(title="Benchmark comparison")
+    for column in ("Run", "Metric", "Baseline", "Candidate", "Change"):
+        table.add_column(column, justify="right")
+    for row in rows:
+        change = "n/a" if row["change"] is None else f"{row['change']:+.1%}"
+        table.add_row(str(row["run"]), row["metric"], f"{row['baseline']:.3f}", f"{row['candidate']:.3f}", change)
+    print(table)
+
+
+def contracts(baseline: str = "baseline", candidate: str = "optimized", compiler: Optional[AlgodClient] = None) -> None:
+    """ Prints the size and per call opcode cost of two approval programs """
+    table = Table(title=f"Approval program: {baseline} vs {candidate}")
+    for column in ("Metric", baseline, candidate, "Change"):
+        table.add_column(column, justify="right")
+    for row in compare_contracts(baseline, candidate, compiler):
+        change = "n/a" if row["change"] is None else f"{row['change']:+.1%}"
+        table.add_row(row["metric"], str(row["baseline"]), str(row["candidate"]), change)
+    print(table)
+
+
+def _cost(value: Optional[int]) -> str:
+    """ Formats an opcode cost, None meaning the path can loop """
+    return "loop" if value is None else str(value)
+
+
+def profile(contract: str = "optimized", as_json: bool = False, compiler: Optional[AlgodClient] = None) -> None:
+    """ Prints the static cost of every branch and subroutine of an approval program """
+    report = profile_contract(contract, compiler)
+    if as_json:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return
+
+    branches = Table(title=f"Approval program {contract}: branches")
+    for column in ("Branch", "Dispatch", "Min", "Max", "Budget", "Subroutines"):
+        branches.add_column(column, justify="left" if column in ("Branch", "Subroutines") else "right")
+    for branch in report["branches"]:
+        budget = "n/a" if branch["max_cost"] is None else f"{branch['max_cost'] / report['budget']:.1%}"
+        branches.add_row(
+            branch["branch"], str(branch["dispatch_cost"]), str(branch["min_cost"]), _cost(branch["max_cost"]),
+            budget, ", ".join(branch["subroutines"]),
+        )
+    print(branches)
+
+    subroutines = Table(title=f"Approval program {contract}: subroutines")
+    for column in ("Subroutine", "Ops", "Est. bytes", "Cost/call", "Call sites"):
+        subroutines.add_column(column, justify="left" if column == "Subroutine" else "right")
+    for region in report["subroutines"]:
+        per_call = "" if region["min_cost"] is None else f"{region['min_cost']}-{_cost(region['max_cost'])}"
+        subroutines.add_row(region["subroutine"], str(region["ops"]), str(region["bytes"]), per_call, str(region["call_sites"]))
+    print(subroutines)
+    print(
+        f"[green] {report['size_bytes']} bytes approval + {report['clear_bytes']} bytes clear = "
+        f"[cyan]{report['total_bytes']}[/cyan] of {report['size_limit']} bytes"
+        f"{' (estimated)' if report['size_estimated'] else ''}, worst branch {_cost(report['max_cost'])} "
+        f"of {report['budget']} ops"
+    )
+
+
+def profile_check(baseline_path: str, contract: str = "optimized", compiler: Optional[AlgodClient] = None) -> None:
+    """ Exits with status 1 when the contract regressed from a saved profile """
+    with open(baseline_path) as baseline_file:
+        regressions = profile_regressions(json.load(baseline_file), profile_contract(contract, compiler))
+    for regression in regressions:
+        print(f"[red] {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"[green] {contract} has not regressed from {baseline_path}")
+
+
+def startup(artifacts: Optional[str] = None, runs: str = "9") -> None:
+    """ Prints the cold start of a process that creates an auction and bids, with and without artifacts """
+    table = Table(title=f"Cold start, median of {runs} processes")
+    for column in ("Programs from", "Import ms", "First bid ms", "Process ms", "Process CPU ms", "PyTeal imported"):
+        table.add_column(column, justify="right")
+    for directory in [None] + ([artifacts] if artifacts else []):
+        result = measure_startup(int(runs), directory)
+        table.add_row(
+            directory or "TEAL cache", f"{result['import_ms']:.0f}", f"{result['first_bid_ms']:.0f}",
+            f"{result['process_ms']:.0f}", f"{result['process_cpu_ms']:.0f}", "yes" if result["pyteal_imported"] else "no",
+        )
+    print(table)
+
+
+def transport(requests: str = "2000", concurrency: str = "8") -> None:
+    """ Prints the default and the pooled transport side by side on a local stand-in for algod """
+    table = Table(title="HTTP transport on a local stand-in for algod")
+    for column in ("Workload", "Transport", "Requests", "Requests/s", "Mean µs", "Connections"):
+        table.add_column(column, justify="right")
+    for row in measure_transport(int(requests), int(concurrency)):
+        table.add_row(
+            row["workload"], row["transport"], str(row["requests"]), f"{row['requests_per_second']:.0f}",
+            f"{row['mean_us']:.0f}", str(row["connections"]),
+        )
+    print(table)
+
+
+if __name__ == "__main__":
+    # the sandbox algod compiles the programs whose size is reported
+    compiler = initialize_algod_client() if "--sandbox" in sys.argv[2:] else None
+    arguments = [argument for argument in sys.argv[2:] if argument not in ("--json", "--sandbox")]
+    if len(sys.argv) in (2, 3, 4, 5) and sys.argv[1] == "contracts" and len(arguments) <= 2:
+        contracts(*arguments, compiler=compiler)
+    elif len(sys.argv) in (2, 3, 4, 5) and sys.argv[1] == "profile" and len(arguments) <= 1:
+        profile(*arguments, as_json="--json" in sys.argv[2:], compiler=compiler)
+    elif len(sys.argv) in (3, 4, 5) and sys.argv[1] == "profile-check" and 1 <= len(arguments) <= 2:
+        profile_check(*arguments, compiler=compiler)
+    elif len(sys.argv) in (2, 3, 4) and sys.argv[1] == "startup":
+        startup(*sys.argv[2:])
+    elif len(sys.argv) in (2, 3, 4) and sys.argv[1] == "transport":
+        transport(*sys.argv[2:])
+    elif len(sys.argv) == 2:
+        benchmark(sys.argv[1])
+    elif len(sys.argv) == 4 and sys.argv[1] == "compare":
+        compare(sys.argv[2], sys.argv[3])
+    else:
+        print(USAGE)
+        sys.exit(1)
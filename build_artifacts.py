@@ -0,0 +1,32 @@
+""" Python module that builds the contract artifacts used for fast startup """
+import sys
+from rich import print
+
+from source.utils.utils_account import initialize_algod_client
+from source.classes.class_ContractCompiler import build_artifacts
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+
+USAGE = """usage:
+    python build_artifacts.py [DIRECTORY] [--algod]   compile every contract for the simulator, and for the sandbox algod with --algod
+
+Then run with AUCTION_ARTIFACTS=DIRECTORY (default artifacts) to create auctions without importing PyTeal.
+"""
+
+
+def build(directory: str = "artifacts", algod: bool = False) -> None:
+    """ Compiles the contracts and writes their bytecode and interface to directory """
+    clients = [SimulatedAlgodClient()]
+    if algod:
+        clients.append(initialize_algod_client())
+    artifacts = build_artifacts(clients, directory)
+    for contract in artifacts.contracts():
+        print(f"[green] {contract}: {', '.join(artifacts.manifest['programs'][contract])}")
+    print(f"[green] Artifacts written to [cyan]{artifacts.path}")
+
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if argument != "--algod"]
+    if len(arguments) > 1 or any(argument.startswith("-") for argument in arguments):
+        print(USAGE)
+        sys.exit(1)
+    build(*arguments, algod="--algod" in sys.argv[1:])
@@ -0,0 +1,72 @@
+""" Python module that runs auction scenarios headless """
+import json
+import os
+import sys
+from time import perf_counter
+from rich import print
+
+from source.utils.utils_account import initialize_algod_client
+from source.utils.utils_scenarios import make_console, narrate, results_table
+from source.classes.class_ScenarioRunner import ScenarioRunner, load_scenarios
+
+USAGE = """usage:
+    python run_scenarios.py FILE... [options]   run the scenarios of JSON or TOML files, exits 1 when one fails
+
+options:
+    --concurrency N   scenarios played at once (default 8)
+    --processes N     worker processes for simulated runs (default one per core)
+    --repeat N        play every scenario N times
+    --sandbox         play against the sandbox instead of a simulated ledger per scenario
+    --verbose         tell every step as it happens
+    --json            print the results as JSON
+"""
+OPTIONS = ("--concurrency", "--processes", "--repeat")
+FLAGS = ("--sandbox", "--verbose", "--json")
+
+
+def main(arguments: list) -> int:
+    """ Runs the scenario files and prints their results """
+    files, options, flags = [], {"--concurrency": 8, "--processes": os.cpu_count() or 1, "--repeat": 1}, set()
+    arguments = iter(arguments)
+    for argument in arguments:
+        if argument in OPTIONS:
+            options[argument] = int(next(arguments, "0"))
+        elif argument in FLAGS:
+            flags.add(argument)
+        elif argument.startswith("-"):
+            raise ValueError(f"unknown option {argument}")
+        else:
+            files.append(argument)
+    if not files or min(options.values()) < 1:
+        raise ValueError("expected scenario files and positive counts")
+
+    scenarios = [scenario for path in files for scenario in load_scenarios(path)] * options["--repeat"]
+    sandbox = "--sandbox" in flags
+    runner = ScenarioRunner(
+        client=initialize_algod_client() if sandbox else None,
+        concurrency=options["--concurrency"],
+        processes=1 if sandbox else options["--processes"],
+        listener=narrate(make_console(), prefix_names=True) if "--verbose" in flags else None,
+    )
+    started = perf_counter()
+    results = runner.run_all(scenarios)
+    seconds = perf_counter() - started
+
+    failed = [result for result in results if not result["passed"]]
+    if "--json" in flags:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    else:
+        shown = results if len(results) <= 50 else failed
+        if shown:
+            print(results_table(shown))
+        print(f"[green] {len(results) - len(failed)} of {len(results)} scenarios passed in {seconds:.2f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except ValueError as exception:
+        print(f"[red] {exception}")
+        print(USAGE)
+        sys.exit(1)
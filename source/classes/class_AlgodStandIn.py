@@ -0,0 +1,96 @@
+""" Module with a local HTTP server standing in for algod in transport benchmarks """
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Dict, Optional
+
+ACCOUNT = {"amount": 10_000_000, "amount-without-pending-rewards": 10_000_000, "assets": [], "round": 1, "status": "Offline"}
+STATUS = {"last-round": 1, "time-since-last-round": 0, "catchup-time": 0, "last-version": "future"}
+PENDING = {"confirmed-round": 1, "pool-error": "", "txn": {}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Answers the GETs of the bid path with canned JSON """
+
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes, which Nagle would hold back on a kept alive connection
+    disable_nagle_algorithm = True
+    server: "AlgodStandIn"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.count_connection()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, code: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path == "/v2/status":
+            self._reply(200, STATUS)
+        elif path.startswith("/v2/accounts/"):
+            self._reply(200, {**ACCOUNT, "address": path.rsplit("/", 1)[1]})
+        elif path.startswith("/v2/transactions/pending/"):
+            self._reply(200, PENDING)
+        else:
+            self._reply(404, {"message": f"no route for {path}"})
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(200, {"txId": "STANDIN"})
+
+
+class AlgodStandIn(ThreadingHTTPServer):
+    """ Keep-alive HTTP/1.1 server on a free local port
+
+        Answers status, account_info and pending_transaction_info like an
+        idle algod, so clients and transports can be timed without a
+        node. connections counts the TCP connections accepted.
+    """
+
+    daemon_threads = True
+    # a client opening a connection per request on many threads overflows the default backlog of 5
+    request_queue_size = 128
+
+    def __init__(self) -> None:
+        """ Constructor for the server, bound but not serving until start """
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.connections = 0
+        self.lock = Lock()
+        self.thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> str:
+        """ URL clients connect to """
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count_connection(self) -> None:
+        """ Counts an accepted connection """
+        with self.lock:
+            self.connections += 1
+
+    def start(self) -> "AlgodStandIn":
+        """ Serves on a thread """
+        self.thread = Thread(target=self.serve_forever, name="algod-stand-in", daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self) -> None:
+        """ Stops serving and closes the socket """
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "AlgodStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
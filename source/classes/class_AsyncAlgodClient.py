@@ -0,0 +1,236 @@
+""" Module with asyncio algod clients """
+
+import asyncio
+import json
+from base64 import b64decode
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+from algosdk import constants, encoding, error
+from algosdk.future import transaction
+
+DEFAULT_MAX_CONNECTIONS = 32
+API_VERSION_PATH_PREFIX = "/v2"
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncAlgodClient:
+    """ Algod client speaking HTTP/1.1 over asyncio streams
+
+        Connections are kept alive and reused, at most max_connections are
+        open at once. Only the calls this project makes are implemented.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS) -> None:
+        """ Constructor for the async client """
+        parsed = urlparse(algod_address)
+        self.algod_token = algod_token
+        self.algod_address = algod_address
+        self.headers = headers or dict()
+        self.host = parsed.hostname
+        self.ssl = parsed.scheme == "https"
+        self.port = parsed.port or (443 if self.ssl else 80)
+        self.max_connections = max_connections
+        self.idle: List[Connection] = []
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _acquire(self) -> Connection:
+        """ Returns an idle connection or opens a new one """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_connections)
+        await self.semaphore.acquire()
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+        try:
+            return await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    def _release(self, connection: Connection, reusable: bool) -> None:
+        """ Hands a connection back to the pool """
+        if reusable:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+        self.semaphore.release()
+
+    async def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: str = "json") -> Any:
+        """ Executes a request and returns the decoded body """
+        header = dict(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = API_VERSION_PATH_PREFIX + requrl
+        if params:
+            requrl = requrl + "?" + urlencode(params)
+
+        body = data or b""
+        lines = [f"{method} {requrl} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{key}: {value}" for key, value in header.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        connection = await self._acquire()
+        reusable = False
+        try:
+            reader, writer = connection
+            writer.write(request)
+            await writer.drain()
+            code, response_headers, payload = await read_response(reader)
+            reusable = response_headers.get("connection", "").lower() != "close"
+        finally:
+            self._release(connection, reusable)
+
+        if code >= 400:
+            message = payload.decode("utf-8")
+            try:
+                message = json.loads(message)["message"]
+            finally:
+                raise error.AlgodHTTPError(message, code)
+        if response_format == "json":
+            try:
+                return json.loads(payload)
+            except Exception as exception:
+                raise error.AlgodResponseError("Failed to parse JSON response from algod") from exception
+        return payload
+
+    async def close(self) -> None:
+        """ Closes every idle connection """
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+
+    async def status(self) -> Dict[str, Any]:
+        """ Returns node status """
+        return await self.algod_request("GET", "/status")
+
+    async def status_after_block(self, block_num: int) -> Dict[str, Any]:
+        """ Returns node status immediately after block_num """
+        return await self.algod_request("GET", f"/status/wait-for-block-after/{block_num}")
+
+    async def block_info(self, block: int) -> Dict[str, Any]:
+        """ Returns the block of a round """
+        return await self.algod_request("GET", f"/blocks/{block}", {"format": "json"})
+
+    async def account_info(self, address: str) -> Dict[str, Any]:
+        """ Returns account information """
+        return await self.algod_request("GET", f"/accounts/{address}")
+
+    async def application_info(self, application_id: int) -> Dict[str, Any]:
+        """ Returns application information """
+        return await self.algod_request("GET", f"/applications/{application_id}")
+
+    async def pending_transaction_info(self, transaction_id: str) -> Dict[str, Any]:
+        """ Returns the pool status of a transaction """
+        return await self.algod_request("GET", f"/transactions/pending/{transaction_id}", {"format": "json"})
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        """ Returns suggested transaction parameters """
+        res = await self.algod_request("GET", "/transactions/params")
+        return transaction.SuggestedParams(
+            res["fee"],
+            res["last-round"],
+            res["last-round"] + 1000,
+            res["genesis-hash"],
+            res["genesis-id"],
+            False,
+            res["consensus-version"],
+            res["min-fee"],
+        )
+
+    async def send_transactions(self, txns: List[transaction.SignedTransaction]) -> str:
+        """ Broadcasts a list of signed transactions, returns the first id """
+        data = b"".join(b64decode(encoding.msgpack_encode(txn)) for txn in txns)
+        response = await self.algod_request(
+            "POST", "/transactions", data=data, headers={"Content-Type": "application/x-binary"}
+        )
+        return response["txId"]
+
+    async def send_transaction(self, txn: transaction.SignedTransaction) -> str:
+        """ Broadcasts a signed transaction """
+        return await self.send_transactions([txn])
+
+    async def compile(self, source: str) -> Dict[str, str]:
+        """ Compiles TEAL source with algod """
+        return await self.algod_request(
+            "POST", "/teal/compile", data=source.encode("utf-8"), headers={"Content-Type": "application/x-binary"}
+        )
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    """ Reads one HTTP/1.1 response, handling fixed length and chunked bodies """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed by algod")
+    code = int(status_line.split()[1])
+
+    headers: Dict[str, str] = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        return code, headers, b"".join(chunks)
+
+    length = headers.get("content-length")
+    if length is not None:
+        return code, headers, await reader.readexactly(int(length))
+    headers["connection"] = "close"
+    return code, headers, await reader.read()
+
+
+class AsyncClientAdapter:
+    """ Exposes a synchronous client, such as SimulatedAlgodClient, as awaitables
+
+        Blocking clients run on the default executor; in-memory clients can
+        be called inline with blocking=False.
+    """
+
+    def __init__(self, client: Any, blocking: bool = True) -> None:
+        """ Constructor for the adapter """
+        self.client = client
+        self.blocking = blocking
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.client, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            if self.blocking:
+                return await asyncio.to_thread(method, *args, **kwargs)
+            return method(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def close(self) -> None:
+        """ Nothing to release for a wrapped client """
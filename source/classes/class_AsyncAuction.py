@@ -0,0 +1,201 @@
+""" Asyncio auction python module """
+import asyncio
+from time import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from algosdk import error
+
+from source.classes.class_UserAccount import UserAccount
+from source.classes.class_ContractCompiler import DEFAULT_CONTRACT, CompiledContracts
+from source.classes.class_ParamsProvider import get_params_provider
+from source.classes.class_AsyncConfirmationWaiter import get_async_confirmation_waiter
+from source.classes.class_Transaction import Transaction
+from source.classes.class_BalanceSnapshot import parse_balance
+from source.classes.class_BidTemplate import BidTemplate
+from source.classes.class_BidValidator import BID_TOO_EARLY, BID_TOO_LOW, BidValidator
+from source.classes.class_AuctionState import AuctionState, decode_auction_state
+from source.utils.utils_auction import build_bid_transactions, build_close_transaction, build_create_transaction, build_fund_transactions
+from source.utils.utils_console import rprint
+
+
+class AsyncAuction:
+    """ Auction driven from an asyncio event loop
+
+        Mirrors Auction, every network call is awaited so one loop can run
+        many auctions and bidders at once. client is an AsyncAlgodClient or
+        an AsyncClientAdapter around a synchronous client.
+    """
+    def __init__(self,
+        client: Any,
+        artist: UserAccount,
+        auctioneer: UserAccount,
+        nft_id: int,
+        nft_amount: int = 1,
+        start_time: int = int(time())+10,
+        end_time: int = int(time()) + 130,
+        reserve: int = 1_000_000,
+        min_bid_increment: int = 100_000,
+        contract: str = DEFAULT_CONTRACT):
+        """Constructor for auction"""
+
+        self.client = client
+        self.artist = artist
+        self.auctioneer = auctioneer
+        self.nft_id = nft_id
+        self.nft_amount = nft_amount
+        self.start_time = start_time
+        self.end_time = end_time
+        self.reserve = reserve
+        self.min_bid_increment = min_bid_increment
+        self.contract = contract
+        self.app_id: Optional[int] = None
+        self.waiter = get_async_confirmation_waiter(client)
+        self.bid_validator = BidValidator()
+        # accounts known to hold the NFT, their bids need no opt in
+        self.nft_holders: Set[str] = set()
+        # prepared bid group, made on the first bid
+        self.bid_template: Optional[BidTemplate] = None
+
+    async def _suggested_params(self) -> transaction.SuggestedParams:
+        """ Shared suggested params of the client """
+        return await get_params_provider(self.client).get_async()
+
+    async def _global_state(self) -> AuctionState:
+        """ Decoded global state of the auction """
+        return decode_auction_state((await self.client.application_info(self.app_id))["params"]["global-state"])
+
+    async def latest_timestamp(self) -> int:
+        """ Timestamp of the last block """
+        last_round = (await self.client.status())["last-round"]
+        timestamp = (await self.client.block_info(last_round))["block"]["ts"]
+        self.bid_validator.observe_timestamp(timestamp)
+        return timestamp
+
+    async def refresh_state(self) -> BidValidator:
+        """ Reloads the global state into the bid validator """
+        last_round = (await self._suggested_params()).first
+        self.bid_validator.update_state(await self._global_state(), last_round)
+        return self.bid_validator
+
+    async def validate_bid(self, bid_amount: int) -> Optional[str]:
+        """ Returns why a bid would be rejected
+
+            Rejections come from cached state where it is conclusive, the
+            state is reloaded before a bid that passes is sent on a newer round.
+        """
+        if self.bid_validator.state is None:
+            await self.refresh_state()
+        reason = self.bid_validator.check(bid_amount)
+        if reason == BID_TOO_EARLY:
+            await self.latest_timestamp()
+            reason = self.bid_validator.check(bid_amount)
+        if reason is None and not self.bid_validator.is_current((await self._suggested_params()).first):
+            await self.refresh_state()
+            reason = self.bid_validator.check(bid_amount)
+        return reason
+
+    async def init_auction(self) -> int:
+        """Returns id of newly created auction"""
+        app_id = await self.create_application()
+        await self.fund(app_id)
+        self.app_id = app_id
+        return app_id
+
+    async def create_application(self) -> int:
+        """Creates the auction application, bids need it funded first"""
+        approval, clear = await CompiledContracts(self.client, contract=self.contract).get_compiled_contracts_async()
+
+        signed_transaction = build_create_transaction(self, approval, clear, await self._suggested_params())
+        await self.client.send_transaction(signed_transaction)
+
+        response = await self.waiter.wait(signed_transaction.get_txid())
+        assert response.application_index is not None and response.application_index > 0
+
+        return response.application_index
+
+    async def fund(self, app_id: int) -> None:
+        """Funds the escrow of an application and hands it the NFT"""
+        fund_transactions = build_fund_transactions(self, app_id, await self._suggested_params())
+        await self.client.send_transactions(fund_transactions)
+
+        await self.waiter.wait(fund_transactions[1].get_txid())
+
+    async def get_balance(self) -> Dict[int, int]:
+        """ Retrieve escrow account balance """
+        return parse_balance(await self.client.account_info(get_application_address(self.app_id)))
+
+    async def place_bid(self, bidder: UserAccount, bid_amount: int, with_opt_in: bool = False) -> bool:
+        """ Places bid, with_opt_in opts the bidder in to the NFT in the same group """
+        try:
+            reason, params = await asyncio.gather(self.validate_bid(bid_amount), self._suggested_params())
+            if reason is not None:
+                rprint(f"[red bold] {self.bid_validator.message(reason)}")
+                return False
+
+            opt_in = with_opt_in and bidder.get_address() not in self.nft_holders
+            signed_transactions = build_bid_transactions(
+                self, bidder, bid_amount, self.bid_validator.highest_bidder(), params, opt_in)
+
+            await self.client.send_transactions(signed_transactions)
+
+            confirmed = await self.waiter.wait(signed_transactions[-1].get_txid())
+            self.bid_validator.observe_bid(bidder.get_address(), bid_amount, confirmed.confirmed_round)
+            if opt_in:
+                self.nft_holders.add(bidder.get_address())
+            return True
+        except error.WrongAmountType:
+            rprint("[red bold] Wrong amount input for bid")
+        except error.AlgodHTTPError:
+            validator = await self.refresh_state()
+            reason = validator.check(bid_amount)
+            if reason is None:
+                await self.latest_timestamp()
+                reason = validator.check(bid_amount)
+            rprint(f"[red bold] {validator.message(reason or BID_TOO_LOW)}")
+
+        return False
+
+    async def place_bids(self, bids: List[Tuple[UserAccount, int]], with_opt_in: bool = False) -> List[bool]:
+        """ Submits many bids concurrently, results keep the input order """
+        return list(await asyncio.gather(*[self.place_bid(bidder, amount, with_opt_in) for bidder, amount in bids]))
+
+    async def opt_in(self, bidder: UserAccount) -> Transaction:
+        """Opts in the given transaction"""
+        opt_in_transaction = transaction.AssetOptInTxn(
+            sender=bidder.get_address(),
+            index=self.nft_id,
+            sp=await self._suggested_params()
+        )
+
+        signed_opt_in = opt_in_transaction.sign(bidder.get_private_key())
+        await self.client.send_transaction(signed_opt_in)
+        confirmed = await self.waiter.wait(signed_opt_in.get_txid())
+        self.nft_holders.add(bidder.get_address())
+        return confirmed
+
+    async def close(self, transactor: UserAccount) -> bool:
+        """Close an auction."""
+        try:
+            app_global_state = await self._global_state()
+
+            end_auction_transaction = build_close_transaction(
+                self, transactor.get_address(), app_global_state, await self._suggested_params())
+            signed_end_auction_transaction = end_auction_transaction.sign(transactor.get_private_key())
+            await self.client.send_transaction(signed_end_auction_transaction)
+
+            await self.waiter.wait(signed_end_auction_transaction.get_txid())
+            return True
+        except error.AlgodHTTPError as exception:
+            if not (transactor.get_address() == self.artist.get_address() or
+                    transactor.get_address() == self.auctioneer.get_address()):
+
+                rprint("[red bold] This close_bid transaction is not authorized. Only artist or auctioneer can close auctions.")
+            else:
+                if str(exception) == "application does not exist":
+                    rprint("[red3 bold] The auction has already been closed.")
+                else:
+                    rprint(f"Error : {exception}")
+
+        return False
@@ -0,0 +1,132 @@
+""" Module with the asyncio counterpart of ConfirmationWaiter """
+
+import asyncio
+from typing import Any, Dict, List, Optional
+from weakref import WeakKeyDictionary, ref
+
+from source.classes.class_Transaction import Transaction
+from source.classes.class_ParamsProvider import get_params_provider
+from source.classes.class_ConfirmationWaiter import DEFAULT_TIMEOUT_ROUNDS, PendingEntry
+from source.utils.utils_weak import dereference
+
+
+class AsyncConfirmationWaiter:
+    """ Follows blocks in one task and resolves every pending transaction id
+
+        Pending transactions of a round are polled concurrently. The task
+        starts with the first waiter and ends once nothing is pending.
+    """
+
+    def __init__(self, client: Any) -> None:
+        """ Constructor for the waiter, client must be an async client """
+        # weak, the shared waiter of a client must not keep it alive
+        self.client_ref = ref(client)
+        self.waiting: Dict[str, List[PendingEntry]] = dict()
+        self.last_round: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> Any:
+        """ The client, ReferenceError once it was garbage collected """
+        return dereference(self.client_ref)
+
+    def submit(self, transaction_id: str, timeout: int = DEFAULT_TIMEOUT_ROUNDS) -> "asyncio.Future[Transaction]":
+        """ Returns a future that resolves once the transaction is confirmed """
+        future: "asyncio.Future[Transaction]" = asyncio.get_running_loop().create_future()
+        if timeout <= 0:
+            future.set_exception(Exception(f"Transaction with ID: {transaction_id} not confirmed after {timeout} rounds"))
+            return future
+
+        self.waiting.setdefault(transaction_id, []).append(PendingEntry(future, timeout))
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._follow())
+        return future
+
+    async def wait(self, transaction_id: str, timeout: int = DEFAULT_TIMEOUT_ROUNDS) -> Transaction:
+        """ Waits until the transaction is confirmed """
+        return await self.submit(transaction_id, timeout)
+
+    async def wait_all(self, transaction_ids: List[str], timeout: int = DEFAULT_TIMEOUT_ROUNDS) -> List[Transaction]:
+        """ Waits until every transaction is confirmed, results keep the input order """
+        return list(await asyncio.gather(*[self.submit(transaction_id, timeout) for transaction_id in transaction_ids]))
+
+    def _resolve(self, transaction_id: str, result: Optional[Transaction] = None, exception: Optional[BaseException] = None) -> None:
+        """ Completes every future waiting for a transaction id """
+        for entry in self.waiting.pop(transaction_id, []):
+            if entry.future.done():
+                continue
+            if exception is not None:
+                entry.future.set_exception(exception)
+            else:
+                entry.future.set_result(result)
+
+    async def _poll(self, transaction_ids: List[str]) -> None:
+        """ Checks the pool status of every waiting transaction concurrently """
+        responses = await asyncio.gather(
+            *[self.client.pending_transaction_info(transaction_id) for transaction_id in transaction_ids],
+            return_exceptions=True,
+        )
+        for transaction_id, pending_trans in zip(transaction_ids, responses):
+            if isinstance(pending_trans, BaseException):
+                self._resolve(transaction_id, exception=pending_trans)
+            elif pending_trans.get("confirmed-round", 0) > 0:
+                self._resolve(transaction_id, result=Transaction(pending_trans))
+            elif pending_trans["pool-error"]:
+                error = pending_trans["pool-error"]
+                self._resolve(transaction_id, exception=Exception(f"Pool Error: {error}"))
+
+    def _expire(self, transaction_ids: List[str]) -> None:
+        """ Fails the callers that ran out of rounds """
+        for transaction_id in transaction_ids:
+            entries = self.waiting.get(transaction_id)
+            if entries is None:
+                continue
+            for entry in entries:
+                entry.rounds_left -= 1
+                if entry.rounds_left <= 0 and not entry.future.done():
+                    entry.future.set_exception(Exception(
+                        f"Transaction with ID: {transaction_id} not confirmed after {entry.timeout} rounds"
+                    ))
+            remaining = [entry for entry in entries if entry.rounds_left > 0]
+            if remaining:
+                self.waiting[transaction_id] = remaining
+            else:
+                del self.waiting[transaction_id]
+
+    async def _follow(self) -> None:
+        """ Block follower task """
+        try:
+            if self.last_round is None:
+                self.last_round = (await self.client.status())["last-round"]
+
+            while True:
+                transaction_ids = list(self.waiting)
+                if transaction_ids:
+                    await self._poll(transaction_ids)
+                    self._expire(transaction_ids)
+                if not self.waiting:
+                    return
+
+                client_status = await self.client.status_after_block(self.last_round)
+                self.last_round = client_status["last-round"]
+                get_params_provider(self.client).observe_round(self.last_round)
+        except Exception as exception:
+            for entries in self.waiting.values():
+                for entry in entries:
+                    if not entry.future.done():
+                        entry.future.set_exception(exception)
+            self.waiting = dict()
+        finally:
+            self.task = None
+            self.last_round = None
+
+
+_waiters: "WeakKeyDictionary[Any, AsyncConfirmationWaiter]" = WeakKeyDictionary()
+
+
+def get_async_confirmation_waiter(client: Any) -> AsyncConfirmationWaiter:
+    """ Returns the waiter shared by every coroutine using this client """
+    waiter = _waiters.get(client)
+    if waiter is None:
+        waiter = _waiters[client] = AsyncConfirmationWaiter(client)
+    return waiter
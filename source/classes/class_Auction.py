@@ -1,21 +1,30 @@
 """Auction python module"""
-from typing import Any, Dict,  List
+import sys
+from typing import Any, Dict, Optional, Set
 from time import sleep, time
-from rich import print as rprint
 
 from algosdk.v2client.algod import AlgodClient
 from algosdk.future import transaction
 from algosdk.logic import get_application_address
-from algosdk import encoding, error
+from algosdk import error
 
 
 from source.classes.class_UserAccount import UserAccount
-from source.classes.class_ContractCompiler import CompiledContracts
+from source.classes.class_ContractCompiler import DEFAULT_CONTRACT, CompiledContracts
+from source.classes.class_ParamsProvider import suggested_params
+from source.classes.class_BalanceSnapshot import parse_balance
+from source.classes.class_BidTemplate import BidTemplate
+from source.classes.class_BidValidator import BID_TOO_EARLY, BID_TOO_LOW, BidValidator
+from source.classes.class_AuctionState import decode_auction_state
 from source.utils.utils_transactions import async_get_transaction
 from source.classes.class_Transaction import Transaction
-from source.utils.utils_auction import decode_state
-
-MIN_TRANSACTION_COST = 1000
+from source.utils.utils_auction import (
+    build_bid_transactions,
+    build_close_transaction,
+    build_create_transaction,
+    build_fund_transactions,
+)
+from source.utils.utils_console import rprint
 
 class Auction:
     """Auction python module"""
@@ -28,7 +37,8 @@ class Auction:
         start_time: int = int(time())+10,
         end_time: int = int(time()) + 130,
         reserve: int = 1_000_000,
-        min_bid_increment: int = 100_000):
+        min_bid_increment: int = 100_000,
+        contract: str = DEFAULT_CONTRACT):
         """Constructor for auction"""
 
         self.client = client
@@ -40,100 +50,45 @@ class Auction:
         self.end_time = end_time
         self.reserve = reserve
         self.min_bid_increment = min_bid_increment
+        self.contract = contract
         self.app_id = None
+        self.bid_validator = BidValidator()
+        # accounts known to hold the NFT, their bids need no opt in
+        self.nft_holders: Set[str] = set()
+        # prepared bid group, made on the first bid
+        self.bid_template: Optional[BidTemplate] = None
     
     def init_auction(self) -> int:
         """Returns id of newly created auction"""
-        contracts = CompiledContracts(self.client)
-        approval, clear = contracts.get_compiled_contracts()
+        app_id = self.create_application()
+        self.fund(app_id)
+        self.app_id = app_id
+        return app_id
 
-        global_schema = transaction.StateSchema(num_uints=7, num_byte_slices=3)
-        local_schema = transaction.StateSchema(num_uints=0, num_byte_slices=0)
-
-        app_args = [
-            encoding.decode_address(self.artist.get_address()),
-            self.nft_id.to_bytes(8, "big"),
-            self.start_time.to_bytes(8, "big"),
-            self.end_time.to_bytes(8, "big"),
-            self.reserve.to_bytes(8, "big"),
-            self.min_bid_increment.to_bytes(8, "big"),
-            encoding.decode_address(self.auctioneer.get_address()),
-        ]
-
-        auction_transaction =  transaction.ApplicationCreateTxn(
-            sender=self.auctioneer.get_address(),
-            on_complete=transaction.OnComplete.NoOpOC,
-            approval_program=approval,
-            clear_program=clear,
-            global_schema=global_schema,
-            local_schema=local_schema,
-            app_args=app_args,
-            sp=self.client.suggested_params(),
-        )
+    def create_application(self) -> int:
+        """Creates the auction application, bids need it funded first"""
+        contracts = CompiledContracts(self.client, contract=self.contract)
+        approval, clear = contracts.get_compiled_contracts()
 
-        singed_transaction = auction_transaction.sign(self.auctioneer.get_private_key())
+        singed_transaction = build_create_transaction(self, approval, clear, suggested_params(self.client))
 
         self.client.send_transaction(singed_transaction)
 
         response = async_get_transaction(self.client, singed_transaction.get_txid())
         assert response.application_index is not None and response.application_index > 0
 
-        app_id = response.application_index
-        escrow_address = get_application_address(app_id)
-
-        fund_cost = 3*MIN_TRANSACTION_COST + 2*self.min_bid_increment
-
-        fund_auction_transaction = transaction.PaymentTxn(
-            sender=self.auctioneer.get_address(),
-            receiver=escrow_address,
-            amt=fund_cost,
-            sp=self.client.suggested_params()
-        )
+        return response.application_index
 
-        hosting_transaction = transaction.ApplicationCallTxn(
-            sender=self.auctioneer.get_address(),
-            index=app_id,
-            on_complete=transaction.OnComplete.NoOpOC,
-            app_args=[b"fund"],
-            foreign_assets=[self.nft_id],
-            sp=self.client.suggested_params()
-        )
+    def fund(self, app_id: int) -> None:
+        """Funds the escrow of an application and hands it the NFT"""
+        fund_transactions = build_fund_transactions(self, app_id, suggested_params(self.client))
+        self.client.send_transactions(fund_transactions)
 
-        nft_fund_transaction = transaction.AssetTransferTxn(
-            sender=self.artist.get_address(),
-            receiver=get_application_address(app_id),
-            index=self.nft_id,
-            amt=self.nft_amount,
-            sp=self.client.suggested_params()
-        )
-
-        transaction.assign_group_id([fund_auction_transaction, hosting_transaction, nft_fund_transaction])        
-        
-        singed_fund_auc_trans = fund_auction_transaction.sign(self.auctioneer.get_private_key())
-        signed_hosting_transaction = hosting_transaction.sign(self.auctioneer.get_private_key())
-        singed_nft_fund_trans = nft_fund_transaction.sign(self.artist.get_private_key())
-        
-        self.client.send_transactions([singed_fund_auc_trans, signed_hosting_transaction, singed_nft_fund_trans])
-        
-        async_get_transaction(self.client, signed_hosting_transaction.get_txid())
-        self.app_id = app_id
-        return app_id
+        async_get_transaction(self.client, fund_transactions[1].get_txid())
 
     def get_balance(self) -> Dict[int,int]:
         """ Retrieve account balance """
-        balance: Dict[int,int] = dict()
-
-        account_info = self.client.account_info(get_application_address(self.app_id))
-
-        balance[0] = account_info["amount"]
-
-        assets: List[Dict[str, Any]] = account_info.get("assets", [])
-        for asset in assets:
-            asset_id = asset["asset-id"]
-            amount = asset["amount"]
-            balance[asset_id] = amount
-        
-        return balance
+        return parse_balance(self.client.account_info(get_application_address(self.app_id)))
 
     def finish_round(self) -> None:
         """Waits until round finishes"""
@@ -141,61 +96,82 @@ class Auction:
         last_round = status["last-round"]
         block = self.client.block_info(last_round)
         timestamp = block["block"]["ts"]
+        self.bid_validator.observe_timestamp(timestamp)
         # print(timestamp, self.start_time)
         if timestamp > self.start_time + 1000:
-            rich.print("[bold red] TIME SYNCHRONISATION ERROR. Reset the sandbox!\n")
-            exit(1)
+            rprint("[bold red] TIME SYNCHRONISATION ERROR. Reset the sandbox!\n")
+            sys.exit(1)
         if timestamp < self.start_time + 5:
             sleep(self.start_time + 5 - timestamp)
 
+    def latest_timestamp(self) -> int:
+        """ Timestamp of the last block """
+        last_round = self.client.status()["last-round"]
+        timestamp = self.client.block_info(last_round)["block"]["ts"]
+        self.bid_validator.observe_timestamp(timestamp)
+        return timestamp
+
+    def refresh_state(self) -> BidValidator:
+        """ Reloads the global state into the bid validator """
+        last_round = suggested_params(self.client).first
+        self.bid_validator.update_state(
+            decode_auction_state(self.client.application_info(self.app_id)["params"]["global-state"]), last_round)
+        return self.bid_validator
+
+    def validate_bid(self, bid_amount: int) -> Optional[str]:
+        """ Returns why a bid would be rejected
+
+            Rejections come from cached state where it is conclusive, the
+            state is reloaded before a bid that passes is sent on a newer round.
+        """
+        if self.bid_validator.state is None:
+            self.refresh_state()
+        reason = self.bid_validator.check(bid_amount)
+        if reason == BID_TOO_EARLY:
+            self.latest_timestamp()
+            reason = self.bid_validator.check(bid_amount)
+        if reason is None and not self.bid_validator.is_current(suggested_params(self.client).first):
+            self.refresh_state()
+            reason = self.bid_validator.check(bid_amount)
+        return reason
+
     def place_bid(
         self,
         bidder: UserAccount,
-        bid_amount: int) -> bool:
-        """ Places bid """
+        bid_amount: int,
+        with_opt_in: bool = False) -> bool:
+        """ Places bid
+
+            Bids the contract would reject are refused locally, without
+            sending anything. with_opt_in opts the bidder in to the NFT in
+            the same group, unless they are known to hold it already.
+        """
         try:  
-            global_state_auction = decode_state(self.client.application_info(self.app_id)["params"]["global-state"])
-            
-            if any(global_state_auction[b"bid_account"]):
-                current_highest_bidder = encoding.encode_address(global_state_auction[b"bid_account"])
-                
-                min_new_bid = global_state_auction[b"bid_amount"] + self.min_bid_increment 
+            reason = self.validate_bid(bid_amount)
+            if reason is not None:
+                rprint(f"[red bold] {self.bid_validator.message(reason)}")
+                return False
 
-            else:
-                current_highest_bidder = None
-            
+            opt_in = with_opt_in and bidder.get_address() not in self.nft_holders
+            signed_transactions = build_bid_transactions(
+                self, bidder, bid_amount, self.bid_validator.highest_bidder(), suggested_params(self.client), opt_in)
 
-            bid_transaction = transaction.PaymentTxn(
-            sender=bidder.get_address(),
-            receiver=get_application_address(self.app_id),
-            amt=bid_amount,
-            sp=self.client.suggested_params(),
-            )
-
-            return_bid_trans = transaction.ApplicationCallTxn(
-                sender=bidder.get_address(),
-                index=self.app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[b"bid"],
-                foreign_assets=[self.nft_id],
-                accounts=[current_highest_bidder] if current_highest_bidder is not None else [],
-                sp=self.client.suggested_params(),
-            )
-
-            transaction.assign_group_id([ bid_transaction, return_bid_trans])
-            signed_bid_transaction = bid_transaction.sign(bidder.get_private_key())
-            signed_return_bid_trans = return_bid_trans.sign(bidder.get_private_key())
-
-            self.client.send_transactions([signed_bid_transaction, signed_return_bid_trans])
-
-            async_get_transaction(self.client, signed_bid_transaction.get_txid())
+            self.client.send_transactions(signed_transactions)
+
+            confirmed = async_get_transaction(self.client, signed_transactions[-1].get_txid())
+            self.bid_validator.observe_bid(bidder.get_address(), bid_amount, confirmed.confirmed_round)
+            if opt_in:
+                self.nft_holders.add(bidder.get_address())
             return True
         except error.WrongAmountType:
             rprint("[red bold] Wrong amount input for bid")
         except error.AlgodHTTPError:
-            global_state_auction = decode_state(self.client.application_info(self.app_id)["params"]["global-state"])
-            min_new_bid = global_state_auction[b'bid_amount'] + self.min_bid_increment 
-            rprint(f"[red bold] The proposed bid is smaller than the required bid amount, i.e. {min_new_bid}")
+            validator = self.refresh_state()
+            reason = validator.check(bid_amount)
+            if reason is None:
+                self.latest_timestamp()
+                reason = validator.check(bid_amount)
+            rprint(f"[red bold] {validator.message(reason or BID_TOO_LOW)}")
             
         return False
             
@@ -206,31 +182,22 @@ class Auction:
         opt_in_transaction = transaction.AssetOptInTxn(
             sender=bidder.get_address(),
             index=self.nft_id,
-            sp=self.client.suggested_params()
+            sp=suggested_params(self.client)
         )
 
         signed_opt_in = opt_in_transaction.sign(bidder.get_private_key())
         self.client.send_transaction(signed_opt_in)
-        return async_get_transaction(self.client, signed_opt_in.get_txid())
+        confirmed = async_get_transaction(self.client, signed_opt_in.get_txid())
+        self.nft_holders.add(bidder.get_address())
+        return confirmed
     
     def close(self, transactor: UserAccount ):
         """Close an auction."""
         try:
-            app_global_state = decode_state(self.client.application_info(self.app_id)["params"]["global-state"])
-
-            accounts: List[str] = [encoding.encode_address(app_global_state[b"seller"])]
-
-            if any(app_global_state[b'bid_account']):
-                accounts.append(encoding.encode_address(app_global_state[b"bid_account"]))
-            
+            app_global_state = decode_auction_state(self.client.application_info(self.app_id)["params"]["global-state"])
 
-            end_auction_transaction = transaction.ApplicationDeleteTxn(
-                sender=transactor.get_address(),
-                index = self.app_id,
-                accounts=accounts,
-                foreign_assets=[self.nft_id],
-                sp=self.client.suggested_params()
-            )
+            end_auction_transaction = build_close_transaction(
+                self, transactor.get_address(), app_global_state, suggested_params(self.client))
             signed_end_auction_transaction = end_auction_transaction.sign(transactor.get_private_key())
             self.client.send_transaction(signed_end_auction_transaction)
 
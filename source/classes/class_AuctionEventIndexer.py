@@ -0,0 +1,184 @@
+""" Module that reads auction events out of blocks into an AuctionEventStore """
+
+from base64 import b64decode
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from algosdk import encoding, error
+from algosdk.future import transaction
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_ContractCompiler import CompiledContracts, contract_names
+from source.classes.class_AuctionEventStore import (
+    EVENT_BID,
+    EVENT_CLOSE,
+    EVENT_CREATE,
+    EVENT_FUND,
+    EVENT_REFUND,
+    AuctionEventStore,
+)
+from source.utils.utils_console import rprint
+
+
+def auction_programs(client: AlgodClient) -> Set[bytes]:
+    """ Compiled approval program of every contract variant """
+    return {CompiledContracts(client, contract=contract).get_compiled_contracts()[0] for contract in contract_names()}
+
+
+def _fields(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """ Transaction fields of a block or inner transaction entry """
+    txn = entry.get("txn", {})
+    return txn.get("txn", txn)
+
+
+def _int(value: bytes) -> int:
+    """ Decodes a uint64 application argument """
+    return int.from_bytes(value, "big")
+
+
+class AuctionEventIndexer:
+    """ Follows blocks and records the create, fund, bid, refund and close events of auctions
+
+        An auction is recognised by its creation with one of programs, the
+        compiled approval programs of contracts.py unless given, or by
+        track for apps created before the store was started. Bids and
+        funding read their amount from the payment just before the
+        application call in the group, refunds from the inner payments of
+        the bid, and the winner of a close is the last bidder recorded.
+    """
+
+    def __init__(
+        self,
+        client: AlgodClient,
+        store: AuctionEventStore,
+        programs: Optional[Iterable[bytes]] = None,
+        start_round: int = 1) -> None:
+        """ Constructor for the indexer """
+        self.client = client
+        self.store = store
+        self.programs = set(auction_programs(client) if programs is None else programs)
+        self.start_round = start_round
+        self.app_ids: Set[int] = set(store.auction_ids())
+
+    def track(self, app_id: int) -> None:
+        """ Records the events of an auction whose creation is not in the store """
+        self.app_ids.add(app_id)
+
+    def sync(self, last_round: Optional[int] = None) -> int:
+        """ Ingests every block after the cursor up to last_round, the latest by default
+
+            Returns the number of rounds ingested. A store filled from
+            another network, e.g. a sandbox that was reset, is cleared first.
+            Raises when the node no longer has the cursor's round.
+        """
+        if last_round is None:
+            last_round = self.client.status()["last-round"]
+        cursor = self.store.cursor()
+        next_round = self.start_round if cursor is None else cursor["round"] + 1
+
+        if cursor is not None and self._genesis_hash(cursor, last_round) != cursor["genesis_hash"]:
+            rprint(f"[yellow] Event store {self.store.path} holds another network's blocks, starting over")
+            self.store.reset()
+            self.app_ids = set()
+            next_round = self.start_round
+
+        for round_number in range(next_round, last_round + 1):
+            self.ingest_block(self.client.block_info(round_number)["block"])
+        return max(0, last_round + 1 - next_round)
+
+    def _genesis_hash(self, cursor: Dict[str, Any], last_round: int) -> str:
+        """ Genesis hash of the network the client follows, from the cursor's block when the node still has it
+
+            A node without that block is asked for last_round instead. If
+            that block is from the store's network too, the cursor round was
+            pruned or not reached yet, and the store cannot be continued.
+        """
+        try:
+            return self.client.block_info(cursor["round"])["block"].get("gh", "")
+        except error.AlgodHTTPError as exception:
+            if exception.code != 404:
+                raise
+        genesis_hash = self.client.block_info(last_round)["block"].get("gh", "")
+        if genesis_hash == cursor["genesis_hash"]:
+            raise Exception(
+                f"Round {cursor['round']} of event store {self.store.path} is not available from the node, "
+                "sync from an archival node or reset the store"
+            )
+        return genesis_hash
+
+    def ingest_block(self, block: Dict[str, Any]) -> None:
+        """ Records the auction events of one block and moves the cursor past it """
+        round_number, timestamp = block["rnd"], block.get("ts", 0)
+        entries = block.get("txns") or []
+        auctions: List[Dict[str, Any]] = []
+        events: List[Dict[str, Any]] = []
+        highest_bids: Dict[int, Tuple[str, Optional[int]]] = dict()
+
+        def event(position: int, app_id: int, kind: str, account: Optional[str], amount: Optional[int]) -> None:
+            events.append({
+                "round": round_number,
+                "position": position,
+                "sequence": sum(1 for recorded in events if recorded["position"] == position),
+                "app_id": app_id,
+                "kind": kind,
+                "account": account,
+                "amount": amount,
+                "timestamp": timestamp,
+            })
+
+        def payment_before(position: int, fields: Dict[str, Any]) -> Optional[int]:
+            """ Amount of the payment preceding an application call in its group """
+            if position == 0 or "grp" not in fields:
+                return None
+            previous = _fields(entries[position - 1])
+            if previous.get("type") != "pay" or previous.get("grp") != fields["grp"]:
+                return None
+            return previous.get("amt", 0)
+
+        for position, entry in enumerate(entries):
+            fields = _fields(entry)
+            if fields.get("type") != "appl":
+                continue
+            sender = fields.get("snd")
+            arguments = [b64decode(argument) for argument in fields.get("apaa", [])]
+            on_complete = fields.get("apan", transaction.OnComplete.NoOpOC)
+
+            if not fields.get("apid"):
+                app_id = entry.get("apid")
+                if app_id is None or b64decode(fields.get("apap", "")) not in self.programs or len(arguments) < 7:
+                    continue
+                self.app_ids.add(app_id)
+                auctions.append({
+                    "app_id": app_id,
+                    "seller": encoding.encode_address(arguments[0]),
+                    "nft_id": _int(arguments[1]),
+                    "start": _int(arguments[2]),
+                    "end": _int(arguments[3]),
+                    "reserve_amount": _int(arguments[4]),
+                    "min_bid_inc": _int(arguments[5]),
+                    "creator": encoding.encode_address(arguments[6]),
+                    "created_round": round_number,
+                })
+                event(position, app_id, EVENT_CREATE, sender, None)
+                continue
+
+            app_id = fields["apid"]
+            if app_id not in self.app_ids:
+                continue
+            if on_complete == transaction.OnComplete.NoOpOC and arguments[:1] == [b"fund"]:
+                event(position, app_id, EVENT_FUND, sender, payment_before(position, fields))
+            elif on_complete == transaction.OnComplete.NoOpOC and arguments[:1] == [b"bid"]:
+                amount = payment_before(position, fields)
+                event(position, app_id, EVENT_BID, sender, amount)
+                highest_bids[app_id] = (sender, amount)
+                for itx in (_fields(inner) for inner in (entry.get("dt") or {}).get("itx", [])):
+                    if itx.get("type") == "pay" and itx.get("amt"):
+                        event(position, app_id, EVENT_REFUND, itx.get("rcv"), itx["amt"])
+            elif on_complete == transaction.OnComplete.DeleteApplicationOC:
+                # the contract hands the NFT to the highest bidder, if any
+                highest = highest_bids.get(app_id)
+                if highest is None:
+                    recorded = self.store.highest_bid(app_id)
+                    highest = None if recorded is None else (recorded.account, recorded.amount)
+                event(position, app_id, EVENT_CLOSE, *(highest or (None, None)))
+
+        self.store.record_block(block.get("gh", ""), round_number, auctions, events)
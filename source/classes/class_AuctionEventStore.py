@@ -0,0 +1,171 @@
+""" Module that keeps the history of auctions in SQLite """
+
+import os
+import sqlite3
+from threading import Lock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+# where the events are kept, in memory unless a file is given
+DEFAULT_EVENT_DB = os.environ.get("AUCTION_EVENT_DB", ":memory:")
+
+EVENT_CREATE = "create"
+EVENT_FUND = "fund"
+EVENT_BID = "bid"
+EVENT_REFUND = "refund"
+EVENT_CLOSE = "close"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS auctions (
+    app_id INTEGER PRIMARY KEY,
+    nft_id INTEGER NOT NULL,
+    seller TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    reserve_amount INTEGER NOT NULL,
+    min_bid_inc INTEGER NOT NULL,
+    created_round INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    round INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    sequence INTEGER NOT NULL,
+    app_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    account TEXT,
+    amount INTEGER,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY (round, position, sequence)
+);
+CREATE INDEX IF NOT EXISTS events_by_app ON events (app_id, kind, round);
+CREATE INDEX IF NOT EXISTS events_by_account ON events (account, kind, round);
+CREATE INDEX IF NOT EXISTS events_by_round ON events (round);
+CREATE TABLE IF NOT EXISTS cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    genesis_hash TEXT NOT NULL,
+    round INTEGER NOT NULL
+);
+"""
+
+
+class AuctionEvent(NamedTuple):
+    """ Something that happened to an auction, in the round it was confirmed
+
+        account is the creator for create and fund, the bidder for bid, the
+        refunded bidder for refund and the winner, if any, for close. amount
+        is what moved: the funding payment, the bid, the refund, or the
+        winning bid on close.
+    """
+    app_id: int
+    round: int
+    timestamp: int
+    kind: str
+    account: Optional[str]
+    amount: Optional[int]
+
+
+class AuctionEventStore:
+    """ SQLite tables of auctions and their events
+
+        Events are keyed by round, position in the block and order within
+        the transaction, so ingesting a block twice changes nothing. The
+        cursor records the last round ingested and the network it came
+        from.
+    """
+
+    def __init__(self, path: str = DEFAULT_EVENT_DB) -> None:
+        """ Constructor for the event store """
+        self.path = path
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """ Closes the database """
+        with self.lock:
+            self.connection.close()
+
+    def cursor(self) -> Optional[Dict[str, Any]]:
+        """ Last round ingested and its genesis hash, None for an empty store """
+        with self.lock:
+            row = self.connection.execute("SELECT genesis_hash, round FROM cursor WHERE id = 0").fetchone()
+        return None if row is None else {"genesis_hash": row[0], "round": row[1]}
+
+    def reset(self) -> None:
+        """ Forgets every auction, event and the cursor """
+        with self.lock, self.connection:
+            self.connection.executescript("DELETE FROM events; DELETE FROM auctions; DELETE FROM cursor;")
+
+    def record_block(
+        self,
+        genesis_hash: str,
+        round_number: int,
+        auctions: Iterable[Dict[str, Any]],
+        events: Iterable[Dict[str, Any]]) -> None:
+        """ Writes the auctions and events of a block and moves the cursor to it, in one transaction """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO auctions VALUES "
+                "(:app_id, :nft_id, :seller, :creator, :start, :end, :reserve_amount, :min_bid_inc, :created_round)",
+                auctions,
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO events VALUES "
+                "(:round, :position, :sequence, :app_id, :kind, :account, :amount, :timestamp)",
+                events,
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cursor VALUES (0, ?, ?)", (genesis_hash, round_number)
+            )
+
+    def _events(self, where: str, parameters: Iterable[Any], limit: Optional[int] = None) -> List[AuctionEvent]:
+        """ Events matching a WHERE clause, oldest first """
+        query = f"SELECT app_id, round, timestamp, kind, account, amount FROM events WHERE {where} ORDER BY round, position, sequence"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self.lock:
+            rows = self.connection.execute(query, tuple(parameters)).fetchall()
+        return [AuctionEvent(*row) for row in rows]
+
+    def events(self, app_id: int, kind: Optional[str] = None) -> List[AuctionEvent]:
+        """ Every event of an auction, or those of one kind """
+        if kind is None:
+            return self._events("app_id = ?", (app_id,))
+        return self._events("app_id = ? AND kind = ?", (app_id, kind))
+
+    def bid_history(self, app_id: int) -> List[AuctionEvent]:
+        """ Accepted bids of an auction, oldest first """
+        return self.events(app_id, EVENT_BID)
+
+    def bids_by(self, account: str, limit: Optional[int] = None) -> List[AuctionEvent]:
+        """ Accepted bids of an account across every auction """
+        return self._events("account = ? AND kind = ?", (account, EVENT_BID), limit)
+
+    def events_between(self, first_round: int, last_round: int) -> List[AuctionEvent]:
+        """ Events of every auction confirmed from first_round to last_round """
+        return self._events("round BETWEEN ? AND ?", (first_round, last_round))
+
+    def highest_bid(self, app_id: int) -> Optional[AuctionEvent]:
+        """ Latest accepted bid of an auction, which is its highest """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT app_id, round, timestamp, kind, account, amount FROM events "
+                "WHERE app_id = ? AND kind = ? ORDER BY round DESC, position DESC LIMIT 1",
+                (app_id, EVENT_BID),
+            ).fetchone()
+        return None if row is None else AuctionEvent(*row)
+
+    def auction(self, app_id: int) -> Optional[Dict[str, Any]]:
+        """ Creation parameters of an auction, None for an unknown app id """
+        with self.lock:
+            cursor = self.connection.execute("SELECT * FROM auctions WHERE app_id = ?", (app_id,))
+            row = cursor.fetchone()
+            names = [column[0] for column in cursor.description]
+        return None if row is None else dict(zip(names, row))
+
+    def auction_ids(self) -> List[int]:
+        """ App ids of every auction seen, in creation order """
+        with self.lock:
+            rows = self.connection.execute("SELECT app_id FROM auctions ORDER BY created_round, app_id").fetchall()
+        return [row[0] for row in rows]
@@ -0,0 +1,80 @@
+""" Module that opens many auctions at once """
+
+from typing import Any, Dict, List
+
+from algosdk import error
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_Auction import Auction
+from source.classes.class_UserAccount import UserAccount
+from source.classes.class_ContractCompiler import DEFAULT_CONTRACT, CompiledContracts
+from source.classes.class_ParamsProvider import suggested_params
+from source.classes.class_ConfirmationWaiter import get_confirmation_waiter
+from source.utils.utils_auction import build_create_transaction, build_fund_transactions
+from source.utils.utils_console import rprint
+
+
+class AuctionHouse:
+    """ An auctioneer listing many lots
+
+        create_auctions pipelines the two phases of Auction.init_auction
+        across the whole batch: every application create is submitted, then
+        confirmed together, then every funding group is submitted and
+        confirmed together. N auctions are open after about two rounds.
+    """
+
+    def __init__(self, client: AlgodClient, auctioneer: UserAccount, contract: str = DEFAULT_CONTRACT) -> None:
+        """ Constructor for the auction house """
+        self.client = client
+        self.auctioneer = auctioneer
+        self.contract = contract
+        self.auctions: List[Auction] = []
+
+    def create_auctions(self, lots: List[Dict[str, Any]]) -> List[Auction]:
+        """ Creates and funds one auction per lot
+
+            Each lot holds the Auction constructor arguments other than
+            client and auctioneer, e.g. {"artist": artist, "nft_id": nft}.
+            Auctions whose creation or funding fails keep app_id None.
+        """
+        auctions = [Auction(client=self.client, auctioneer=self.auctioneer, contract=self.contract, **lot) for lot in lots]
+        approval, clear = CompiledContracts(self.client, contract=self.contract).get_compiled_contracts()
+        waiter = get_confirmation_waiter(self.client)
+
+        params = suggested_params(self.client)
+        created = []
+        for auction in auctions:
+            signed_transaction = build_create_transaction(auction, approval, clear, params)
+            try:
+                self.client.send_transaction(signed_transaction)
+            except error.AlgodHTTPError as exception:
+                rprint(f"[red bold] Auction for NFT {auction.nft_id} could not be created: {exception}")
+                continue
+            created.append((auction, waiter.submit(signed_transaction.get_txid())))
+
+        params = suggested_params(self.client)
+        funded = []
+        for auction, future in created:
+            try:
+                app_id = future.result().application_index
+            except Exception as exception:
+                rprint(f"[red bold] Auction for NFT {auction.nft_id} was not confirmed: {exception}")
+                continue
+            fund_transactions = build_fund_transactions(auction, app_id, params)
+            try:
+                self.client.send_transactions(fund_transactions)
+            except error.AlgodHTTPError as exception:
+                rprint(f"[red bold] Auction {app_id} could not be funded: {exception}")
+                continue
+            funded.append((auction, app_id, waiter.submit(fund_transactions[1].get_txid())))
+
+        for auction, app_id, future in funded:
+            try:
+                future.result()
+            except Exception as exception:
+                rprint(f"[red bold] Funding of auction {app_id} was not confirmed: {exception}")
+                continue
+            auction.app_id = app_id
+
+        self.auctions.extend(auction for auction in auctions if auction.app_id is not None)
+        return auctions
@@ -0,0 +1,199 @@
+""" Module with the decoded global state of an auction application """
+
+from base64 import b64decode
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from algosdk import encoding
+
+UINT_TYPE = 2
+BYTES_TYPE = 1
+# encoded value of a bid_account that holds no bidder
+NO_ACCOUNT = "A" * 43 + "="
+# distinct addresses kept by a decoder before its address cache is cleared
+ADDRESS_CACHE_SIZE = 4096
+
+
+class AuctionState:
+    """ Global state of an auction, one field per key on_create writes
+
+        Addresses are algorand addresses rather than raw public keys, and
+        bid_account is None until the first bid. bid_amount is 0 until then
+        as the contract only writes it on a bid.
+    """
+
+    __slots__ = ("seller", "nft_id", "start", "end", "reserve_amount", "min_bid_inc", "creator", "bid_account", "bid_amount")
+
+    seller: Optional[str]
+    nft_id: int
+    start: int
+    end: int
+    reserve_amount: int
+    min_bid_inc: int
+    creator: Optional[str]
+    bid_account: Optional[str]
+    bid_amount: int
+
+    def __init__(
+        self,
+        seller: Optional[str] = None,
+        nft_id: int = 0,
+        start: int = 0,
+        end: int = 0,
+        reserve_amount: int = 0,
+        min_bid_inc: int = 0,
+        creator: Optional[str] = None,
+        bid_account: Optional[str] = None,
+        bid_amount: int = 0) -> None:
+        """ Constructor for the auction state """
+        self.seller = seller
+        self.nft_id = nft_id
+        self.start = start
+        self.end = end
+        self.reserve_amount = reserve_amount
+        self.min_bid_inc = min_bid_inc
+        self.creator = creator
+        self.bid_account = bid_account
+        self.bid_amount = bid_amount
+
+    def copy(self) -> "AuctionState":
+        """ Returns an independent copy of the state """
+        state = AuctionState.__new__(AuctionState)
+        for field in AuctionState.__slots__:
+            setattr(state, field, getattr(self, field))
+        return state
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AuctionState):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in AuctionState.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in AuctionState.__slots__)
+        return f"AuctionState({fields})"
+
+
+# field and value type of each key, by key name
+STATE_FIELDS: Dict[bytes, Tuple[str, int]] = {
+    b"seller": ("seller", BYTES_TYPE),
+    b"nft_id": ("nft_id", UINT_TYPE),
+    b"start": ("start", UINT_TYPE),
+    b"end": ("end", UINT_TYPE),
+    b"reserve_amount": ("reserve_amount", UINT_TYPE),
+    b"min_bid_inc": ("min_bid_inc", UINT_TYPE),
+    b"creator": ("creator", BYTES_TYPE),
+    b"bid_account": ("bid_account", BYTES_TYPE),
+    b"bid_amount": ("bid_amount", UINT_TYPE),
+}
+
+
+class AuctionStateDecoder:
+    """ Decodes the global-state array of algod into AuctionState records
+
+        The base64 keys are the same in every response, so each is decoded
+        once and then looked up by its encoded form. Addresses are cached
+        the same way, by their base64 value, so a bidder or seller seen
+        before costs neither a base64 decode nor a checksum.
+    """
+
+    def __init__(self) -> None:
+        """ Constructor for the decoder """
+        self.fields: Dict[str, Optional[Tuple[str, int]]] = dict()
+        self.addresses: Dict[str, Optional[str]] = {NO_ACCOUNT: None}
+
+    def field(self, key: str) -> Optional[Tuple[str, int]]:
+        """ Field and value type of an encoded key, None for keys of no field """
+        try:
+            return self.fields[key]
+        except KeyError:
+            field = self.fields[key] = STATE_FIELDS.get(b64decode(key))
+            return field
+
+    def address(self, value: str) -> Optional[str]:
+        """ Address of an encoded public key, None for the zero key """
+        try:
+            return self.addresses[value]
+        except KeyError:
+            if len(self.addresses) >= ADDRESS_CACHE_SIZE:
+                self.addresses = {NO_ACCOUNT: None}
+            address = self.addresses[value] = encoding.encode_address(b64decode(value))
+            return address
+
+    def decode(self, state_array: List[Any]) -> AuctionState:
+        """ Decodes the global-state array of one application """
+        state = AuctionState()
+        for pair in state_array:
+            field = self.field(pair["key"])
+            if field is None:
+                continue
+            name, value_type = field
+            value = pair["value"]
+            if value["type"] != value_type:
+                raise Exception(f"Unexpected state type: {value['type']}")
+            if value_type == UINT_TYPE:
+                setattr(state, name, value.get("uint", 0))
+            else:
+                setattr(state, name, self.address(value.get("bytes", "")))
+        return state
+
+    def raw_address(self, value: str) -> Optional[str]:
+        """ Address of a public key a JSON block wrote as a raw string, None for the zero key
+
+            algod writes the bytes of the string as they are, so a key that
+            is not valid UTF-8 comes back mangled and raises ValueError.
+        """
+        public_key = value.encode()
+        if len(public_key) != 32:
+            raise ValueError("public key mangled by the JSON encoding of the block")
+        return None if public_key == bytes(32) else encoding.encode_address(public_key)
+
+    def apply_delta(self, state: AuctionState, delta: Any) -> Optional[AuctionState]:
+        """ Copy of state with a global-state-delta applied, None when the delta cannot be read
+
+            The delta is the list of pending_transaction_info, with base64
+            keys and bytes, or the mapping from key to at/bs/ui of a JSON
+            block, whose keys and bytes are raw strings.
+        """
+        block = isinstance(delta, dict)
+        entries = delta.items() if block else ((entry.get("key"), entry.get("value")) for entry in delta)
+        state = state.copy()
+        for key, value in entries:
+            if not isinstance(key, str) or not isinstance(value, dict):
+                return None
+            try:
+                if block:
+                    field = STATE_FIELDS.get(key.encode())
+                    action, uint, raw = value.get("at"), value.get("ui", 0), value.get("bs", "")
+                else:
+                    field = self.field(key)
+                    action, uint, raw = value.get("action"), value.get("uint", 0), value.get("bytes", "")
+                if field is None:
+                    continue
+                name, value_type = field
+                if action == 3:
+                    setattr(state, name, getattr(AuctionState(), name))
+                elif action == 2 and value_type == UINT_TYPE:
+                    setattr(state, name, uint)
+                elif action == 1 and value_type == BYTES_TYPE:
+                    setattr(state, name, self.raw_address(raw) if block else self.address(raw))
+                else:
+                    return None
+            except ValueError:
+                return None
+        return state
+
+    def decode_many(self, application_infos: Iterable[Dict[str, Any]]) -> Dict[int, AuctionState]:
+        """ Decodes the state of every application_info response, by application id """
+        return {info["id"]: self.decode(info["params"].get("global-state", [])) for info in application_infos}
+
+
+_decoder = AuctionStateDecoder()
+
+
+def decode_auction_state(state_array: List[Any]) -> AuctionState:
+    """ Decodes one global-state array with the shared decoder """
+    return _decoder.decode(state_array)
+
+
+def decode_auction_states(application_infos: Iterable[Dict[str, Any]]) -> Dict[int, AuctionState]:
+    """ Decodes many application_info responses with the shared decoder """
+    return _decoder.decode_many(application_infos)
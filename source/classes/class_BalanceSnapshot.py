@@ -0,0 +1,73 @@
+""" Module with an immutable, round stamped balance matrix """
+
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
+
+def parse_balance(account_info: Dict[str, Any]) -> Dict[int, int]:
+    """ Turns an account_info response into {asset id: amount}, 0 being algos """
+    balance: Dict[int, int] = {0: account_info["amount"]}
+
+    assets: List[Dict[str, Any]] = account_info.get("assets", [])
+    for asset in assets:
+        balance[asset["asset-id"]] = asset["amount"]
+
+    return balance
+
+
+class BalanceSnapshot:
+    """ Balances of many accounts read once each
+
+        Rows are addresses, columns are asset ids with 0 for algos. The
+        snapshot is read-only and stamped with the newest round any of its
+        responses reported.
+    """
+
+    __slots__ = ("_balances", "_app_addresses", "round")
+
+    def __init__(
+        self,
+        balances: Dict[str, Dict[int, int]],
+        app_addresses: Dict[int, str],
+        round: int) -> None:
+        """ Constructor for the snapshot """
+        object.__setattr__(self, "_balances", MappingProxyType(
+            {address: MappingProxyType(dict(row)) for address, row in balances.items()}
+        ))
+        object.__setattr__(self, "_app_addresses", MappingProxyType(dict(app_addresses)))
+        object.__setattr__(self, "round", round)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("BalanceSnapshot is immutable")
+
+    def __getitem__(self, address: str) -> Mapping[int, int]:
+        """ Returns the {asset id: amount} row of an address """
+        return self._balances[address]
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._balances
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._balances)
+
+    def __len__(self) -> int:
+        return len(self._balances)
+
+    def balance(self, address: str, asset_id: int = 0) -> int:
+        """ Amount of an asset held by an address, 0 when not opted in """
+        return self._balances[address].get(asset_id, 0)
+
+    def app_balance(self, app_id: int, asset_id: int = 0) -> int:
+        """ Amount of an asset held by the escrow of an application """
+        return self.balance(self._app_addresses[app_id], asset_id)
+
+    def app_address(self, app_id: int) -> str:
+        """ Escrow address of an application in the snapshot """
+        return self._app_addresses[app_id]
+
+    def rows(self, asset_ids: Tuple[int, ...] = (0,)) -> List[Tuple[str, Tuple[int, ...]]]:
+        """ Matrix form: one (address, amounts) row per address """
+        return [
+            (address, tuple(row.get(asset_id, 0) for asset_id in asset_ids))
+            for address, row in self._balances.items()
+        ]
@@ -0,0 +1,92 @@
+""" Module that signs batches of transactions across processes """
+
+import os
+from base64 import b64encode
+from concurrent.futures import Executor
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from algosdk import account
+from algosdk.future import transaction
+
+PARALLEL_SIGNING_THRESHOLD = 512
+SIGNING_CHUNK_SIZE = 256
+
+
+def raw_signatures(pairs: Sequence[Tuple[transaction.Transaction, str]]) -> List[bytes]:
+    """ Ed25519 signature of each transaction with its private key """
+    return [txn.raw_sign(private_key) for txn, private_key in pairs]
+
+
+class BatchSigner:
+    """ Signs (transaction, private key) pairs, in worker processes for large batches
+
+        Workers msgpack encode and sign chunk_size pairs at a time and
+        only send the 64 byte signatures back; the signed transactions are
+        put together in the calling process, in input order. Batches
+        smaller than threshold, and every batch on a single core, are
+        signed inline. The pool starts with the first large batch and is
+        kept for the next ones.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        threshold: int = PARALLEL_SIGNING_THRESHOLD,
+        chunk_size: int = SIGNING_CHUNK_SIZE) -> None:
+        """ Constructor for the signer """
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.executor: Optional[Executor] = None
+        self.lock = Lock()
+
+    def _executor(self) -> Executor:
+        """ Returns the worker pool, starting it on first use """
+        with self.lock:
+            if self.executor is None:
+                # multiprocessing is only imported by processes that sign large batches
+                from concurrent.futures import ProcessPoolExecutor
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor
+
+    def sign(self, pairs: Sequence[Tuple[transaction.Transaction, str]]) -> List[transaction.SignedTransaction]:
+        """ Signs every transaction with its key, results keep the input order """
+        if len(pairs) < self.threshold or self.workers < 2:
+            signatures = raw_signatures(pairs)
+        else:
+            chunks = [pairs[start:start + self.chunk_size] for start in range(0, len(pairs), self.chunk_size)]
+            signatures = [signature for chunk in self._executor().map(raw_signatures, chunks) for signature in chunk]
+
+        # addresses are derived once per key and batch, private keys are not kept past the call
+        addresses: Dict[str, str] = dict()
+        signed = []
+        for (txn, private_key), signature in zip(pairs, signatures):
+            address = addresses.get(private_key)
+            if address is None:
+                address = addresses[private_key] = account.address_from_private_key(private_key)
+            signed.append(transaction.SignedTransaction(
+                txn, b64encode(signature).decode(), address if address != txn.sender else None
+            ))
+        return signed
+
+    def close(self) -> None:
+        """ Stops the worker processes """
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+# shared by the whole process, its pool only starts with the first large batch
+_signer = BatchSigner()
+
+
+def get_batch_signer() -> BatchSigner:
+    """ Returns the signer shared by the whole process """
+    return _signer
+
+
+def sign_transactions(pairs: Sequence[Tuple[transaction.Transaction, str]]) -> List[transaction.SignedTransaction]:
+    """ Signs pairs with the shared signer """
+    return _signer.sign(pairs)
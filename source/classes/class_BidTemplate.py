@@ -0,0 +1,151 @@
+""" Module with the prepared bid transaction group of an auction """
+
+import copy
+from base64 import b64decode
+from typing import Any, Dict, List, Optional
+
+from algosdk import constants, encoding, error
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+# distinct addresses whose public key is kept before the cache is cleared
+PUBLIC_KEY_CACHE_SIZE = 4096
+
+_public_keys: Dict[str, bytes] = dict()
+
+
+def public_key(address: str) -> bytes:
+    """ Public key of an address, decoded once while it stays in the cache """
+    key = _public_keys.get(address)
+    if key is None:
+        if len(_public_keys) >= PUBLIC_KEY_CACHE_SIZE:
+            _public_keys.clear()
+        key = _public_keys[address] = encoding.decode_address(address)
+    return key
+
+
+def _header(txn: transaction.Transaction, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """ Adds the fields every transaction has, as Transaction.dictify does """
+    if txn.fee:
+        fields["fee"] = txn.fee
+    if txn.first_valid_round:
+        fields["fv"] = txn.first_valid_round
+    if txn.genesis_id:
+        fields["gen"] = txn.genesis_id
+    fields["gh"] = b64decode(txn.genesis_hash)
+    if txn.group:
+        fields["grp"] = txn.group
+    fields["lv"] = txn.last_valid_round
+    fields["snd"] = public_key(txn.sender)
+    fields["type"] = txn.type
+    return fields
+
+
+class _BidPayment(transaction.PaymentTxn):
+    """ Bid payment to the escrow, encoded without decoding its addresses again """
+
+    def dictify(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {"rcv": public_key(self.receiver)}
+        if self.amt:
+            fields["amt"] = self.amt
+        return _header(self, fields)
+
+
+class _BidCall(transaction.ApplicationCallTxn):
+    """ Bid application call, encoded without decoding its addresses again """
+
+    def dictify(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {"apid": self.index, "apan": self.on_complete, "apaa": self.app_args, "apas": self.foreign_assets}
+        if self.accounts:
+            fields["apat"] = [public_key(address) for address in self.accounts]
+        return _header(self, fields)
+
+
+class _BidOptIn(transaction.AssetOptInTxn):
+    """ Opt in to the NFT of a bid, encoded without decoding its addresses again """
+
+    def dictify(self) -> Dict[str, Any]:
+        return _header(self, {"arcv": public_key(self.receiver), "xaid": self.index})
+
+
+class BidTemplate:
+    """ Bid group of one auction with everything but the bid itself worked out once
+
+        The escrow address, the app index, the bid argument and the NFT
+        are set on prototype transactions when the template is made. Each
+        bid copies them and patches sender, amount, accounts, fee and
+        validity window, and the public keys of addresses are cached
+        instead of decoded again on every encoding. The transactions encode
+        the same as those built with the SDK constructors.
+    """
+
+    def __init__(self, app_id: int, nft_id: int) -> None:
+        """ Constructor for the template """
+        self.app_id = app_id
+        self.nft_id = nft_id
+        self.escrow_address = get_application_address(app_id)
+        placeholder = transaction.SuggestedParams(0, 0, 0, "", flat_fee=True)
+        self.payment = _BidPayment(self.escrow_address, placeholder, self.escrow_address, 0)
+        self.call = _BidCall(
+            self.escrow_address,
+            placeholder,
+            app_id,
+            transaction.OnComplete.NoOpOC,
+            app_args=[b"bid"],
+            foreign_assets=[nft_id],
+        )
+        self.opt_in = _BidOptIn(self.escrow_address, placeholder, nft_id)
+
+    @staticmethod
+    def _patch(
+        prototype: transaction.Transaction,
+        sender: str,
+        params: transaction.SuggestedParams) -> transaction.Transaction:
+        """ Copy of a prototype from sender, valid for the rounds of params """
+        txn = copy.copy(prototype)
+        txn.sender = sender
+        txn.first_valid_round = params.first
+        txn.last_valid_round = params.last
+        txn.genesis_id = params.gen
+        txn.genesis_hash = params.gh
+        return txn
+
+    @staticmethod
+    def _set_fee(txn: transaction.Transaction, params: transaction.SuggestedParams) -> None:
+        """ Sets the fee the SDK constructors would, per byte unless params hold a flat fee """
+        txn.fee = params.fee
+        if params.flat_fee:
+            return
+        if not params.fee:
+            txn.fee = constants.min_txn_fee
+            return
+        # size of the transaction with a signature, as Transaction.estimate_size measures it
+        size = len(b64decode(encoding.msgpack_encode({"sig": bytes(64), "txn": txn.dictify()})))
+        txn.fee = max(size * params.fee, constants.min_txn_fee)
+
+    def build(
+        self,
+        bidder: str,
+        bid_amount: int,
+        highest_bidder: Optional[str],
+        params: transaction.SuggestedParams,
+        opt_in: bool = False) -> List[transaction.Transaction]:
+        """ Unsigned bid group of bidder, led by the opt in to the NFT with opt_in """
+        if not isinstance(bid_amount, int) or bid_amount < 0:
+            raise error.WrongAmountType
+
+        payment = self._patch(self.payment, bidder, params)
+        payment.amt = bid_amount
+        call = self._patch(self.call, bidder, params)
+        call.accounts = [highest_bidder] if highest_bidder is not None else []
+
+        group = [payment, call]
+        if opt_in:
+            opt_in_transaction = self._patch(self.opt_in, bidder, params)
+            opt_in_transaction.receiver = bidder
+            group.insert(0, opt_in_transaction)
+
+        for txn in group:
+            self._set_fee(txn, params)
+        transaction.assign_group_id(group)
+        return group
@@ -0,0 +1,97 @@
+""" Module that checks bids locally before they are sent """
+
+from threading import Lock
+from typing import Optional
+
+from algosdk import error
+
+from source.classes.class_AuctionState import AuctionState
+from source.utils.utils_auction import MIN_TRANSACTION_COST
+
+BID_TOO_SMALL = "too_small"
+BID_TOO_LOW = "too_low"
+BID_TOO_EARLY = "too_early"
+BID_TOO_LATE = "too_late"
+
+
+class BidValidator:
+    """ Mirrors the checks of on_bid against cached auction state
+
+        The state is the AuctionState decoded from the application and
+        the latest block timestamp seen. Both only move forward, so a bid
+        rejected from the cache is rejected by the contract as well,
+        except BID_TOO_EARLY, which the caller confirms with a fresh
+        timestamp. A bid that passes is only sent once the state is
+        current for the latest round observed, see is_current.
+    """
+
+    def __init__(self) -> None:
+        """ Constructor for the validator """
+        self.state: Optional[AuctionState] = None
+        self.round = 0
+        self.timestamp: Optional[int] = None
+        self.lock = Lock()
+
+    def update_state(self, state: AuctionState, last_round: int) -> None:
+        """ Replaces the cached state with state read at last_round """
+        with self.lock:
+            self.state = state.copy()
+            self.round = last_round
+
+    def is_current(self, last_round: int) -> bool:
+        """ True when the cached state reflects last_round """
+        return self.state is not None and self.round >= last_round
+
+    def invalidate(self) -> None:
+        """ Forgets the cached state """
+        with self.lock:
+            self.state = None
+
+    def observe_timestamp(self, timestamp: int) -> None:
+        """ Records the timestamp of a block """
+        with self.lock:
+            if self.timestamp is None or timestamp > self.timestamp:
+                self.timestamp = timestamp
+
+    def observe_bid(self, bidder_address: str, bid_amount: int, confirmed_round: int) -> None:
+        """ Applies a bid confirmed in confirmed_round to the cached state """
+        with self.lock:
+            if self.state is not None and bid_amount > self.state.bid_amount:
+                self.state.bid_amount = bid_amount
+                self.state.bid_account = bidder_address
+                self.round = max(self.round, confirmed_round)
+
+    def highest_bidder(self) -> Optional[str]:
+        """ Address of the current highest bidder, None before the first bid """
+        return self.state.bid_account
+
+    def min_bid(self) -> int:
+        """ Smallest bid the contract accepts in the cached state """
+        if self.highest_bidder() is None:
+            return MIN_TRANSACTION_COST
+        return self.state.bid_amount + self.state.min_bid_inc
+
+    def check(self, bid_amount: int) -> Optional[str]:
+        """ Returns why the bid would be rejected, None when it may pass """
+        if not isinstance(bid_amount, int) or bid_amount < 0:
+            raise error.WrongAmountType
+        if bid_amount < MIN_TRANSACTION_COST:
+            return BID_TOO_SMALL
+        if self.timestamp is not None:
+            if self.timestamp >= self.state.end:
+                return BID_TOO_LATE
+            if self.timestamp < self.state.start:
+                return BID_TOO_EARLY
+        if bid_amount < self.min_bid():
+            return BID_TOO_LOW
+        return None
+
+    def message(self, reason: str) -> str:
+        """ Text shown to the bidder for a rejection """
+        if reason == BID_TOO_SMALL:
+            return f"The proposed bid is smaller than the minimum transaction amount, i.e. {MIN_TRANSACTION_COST}"
+        if reason == BID_TOO_EARLY:
+            return f"The auction has not started yet, bidding opens at {self.state.start}"
+        if reason == BID_TOO_LATE:
+            return f"The auction ended at {self.state.end}"
+        return f"The proposed bid is smaller than the required bid amount, i.e. {self.min_bid()}"
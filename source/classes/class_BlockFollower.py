@@ -0,0 +1,348 @@
+""" Module with a block follower that streams the state of many auctions """
+
+import asyncio
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+from weakref import WeakKeyDictionary, ref
+
+from algosdk.future import transaction
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_AuctionState import AuctionState, AuctionStateDecoder
+from source.classes.class_ParamsProvider import get_params_provider
+from source.utils.utils_console import rprint
+from source.utils.utils_weak import dereference
+
+
+class StateChange(NamedTuple):
+    """ State of an auction after a round, None once the application is deleted """
+    round: int
+    app_id: int
+    state: Optional[AuctionState]
+
+
+# marks the end of a subscription in its queue
+_CLOSED = None
+
+
+class Subscription:
+    """ Blocking iterator over the state changes of some auctions, all of them when app_ids is None
+
+        Changes are queued from the moment of subscribing, starting with
+        the current state of each watched app, so a slow consumer misses
+        nothing. Iteration ends once close is called or the follower stops.
+    """
+
+    def __init__(self, follower: "BlockFollower", app_ids: Optional[Set[int]]) -> None:
+        """ Constructor for the subscription """
+        self.follower = follower
+        self.app_ids = app_ids
+        self.queue: "Queue[Optional[StateChange]]" = Queue()
+        self.closed = False
+
+    def wants(self, app_id: int) -> bool:
+        """ True when the subscription follows app_id """
+        return self.app_ids is None or app_id in self.app_ids
+
+    def deliver(self, change: Optional[StateChange]) -> None:
+        """ Queues a change, or the end of the subscription """
+        self.queue.put(change)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[StateChange]:
+        """ Next change, None when the subscription ended or timeout passed first """
+        if self.closed:
+            return None
+        try:
+            change = self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+        if change is _CLOSED:
+            self.closed = True
+        return change
+
+    def drain(self) -> List[StateChange]:
+        """ Every change queued so far, without waiting """
+        changes = []
+        while not self.closed:
+            try:
+                change = self.queue.get_nowait()
+            except Empty:
+                break
+            if change is _CLOSED:
+                self.closed = True
+            else:
+                changes.append(change)
+        return changes
+
+    def close(self) -> None:
+        """ Stops the subscription, iteration ends after the changes already queued """
+        self.follower.unsubscribe(self)
+        self.deliver(_CLOSED)
+
+    def __iter__(self) -> Iterator[StateChange]:
+        while True:
+            change = self.get()
+            if change is None:
+                return
+            yield change
+
+
+class AsyncSubscription(Subscription):
+    """ Subscription consumed with async for from the loop that created it """
+
+    def __init__(self, follower: "BlockFollower", app_ids: Optional[Set[int]]) -> None:
+        """ Constructor for the subscription, must run inside an event loop """
+        super().__init__(follower, app_ids)
+        self.loop = asyncio.get_running_loop()
+        self.async_queue: "asyncio.Queue[Optional[StateChange]]" = asyncio.Queue()
+
+    def deliver(self, change: Optional[StateChange]) -> None:
+        """ Queues a change on the subscription's loop, from any thread """
+        try:
+            self.loop.call_soon_threadsafe(self.async_queue.put_nowait, change)
+        except RuntimeError:
+            # the loop is closed, nobody is left to consume
+            pass
+
+    async def get_async(self) -> Optional[StateChange]:
+        """ Next change, None once the subscription ended """
+        if self.closed:
+            return None
+        change = await self.async_queue.get()
+        if change is _CLOSED:
+            self.closed = True
+        return change
+
+    def __aiter__(self) -> AsyncIterator[StateChange]:
+        return self._changes()
+
+    async def _changes(self) -> AsyncIterator[StateChange]:
+        while True:
+            change = await self.get_async()
+            if change is None:
+                return
+            yield change
+
+
+class BlockFollower:
+    """ Follows blocks once for every watched auction and publishes their new state
+
+        Each round costs one block_info, whatever the number of apps
+        watched. Only the apps called in the round change: their state is
+        the cached one with the global-state-delta of each call applied,
+        and application_info is only requested when a delta is missing or
+        cannot be read. A deleted app is published with state None and
+        no longer watched.
+
+        start runs the follower on a thread waiting with
+        status_after_block. SimulatedAlgodClient produces a block on every
+        status_after_block, so against it call poll after each step instead.
+    """
+
+    def __init__(self, client: AlgodClient) -> None:
+        """ Constructor for the follower """
+        # weak, the shared follower of a client must not keep it alive
+        self.client_ref = ref(client)
+        self.decoder = AuctionStateDecoder()
+        self.lock = Lock()
+        self.round_lock = Lock()
+        self.states: Dict[int, AuctionState] = dict()
+        self.subscriptions: List[Subscription] = []
+        self.last_round: Optional[int] = None
+        # timestamp of the last block read, blocks are only read while apps are watched
+        self.last_timestamp: Optional[int] = None
+        self.thread: Optional[Thread] = None
+        self.stopping = Event()
+
+    @property
+    def client(self) -> AlgodClient:
+        """ The client, ReferenceError once it was garbage collected """
+        return dereference(self.client_ref)
+
+    def _fetch(self, app_ids: Iterable[int]) -> Dict[int, Optional[AuctionState]]:
+        """ Current state of apps from application_info, None for deleted ones """
+        infos, states = [], dict()
+        for app_id in app_ids:
+            try:
+                infos.append(self.client.application_info(app_id))
+            except Exception as exception:
+                if "does not exist" not in str(exception):
+                    raise
+                states[app_id] = None
+        states.update(self.decoder.decode_many(infos))
+        return states
+
+    def _publish(self, changes: List[StateChange]) -> None:
+        """ Hands changes to every interested subscription """
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for change in changes:
+            for subscription in subscriptions:
+                if subscription.wants(change.app_id):
+                    subscription.deliver(change)
+
+    def watch(self, *app_ids: int) -> Dict[int, Optional[AuctionState]]:
+        """ Starts following apps, their current state is published and returned """
+        with self.round_lock:
+            if self.last_round is None:
+                self.last_round = self.client.status()["last-round"]
+            with self.lock:
+                new_ids = [app_id for app_id in app_ids if app_id not in self.states]
+            fetched = self._fetch(new_ids)
+            with self.lock:
+                self.states.update((app_id, state) for app_id, state in fetched.items() if state is not None)
+            self._publish([StateChange(self.last_round, app_id, state) for app_id, state in fetched.items()])
+        with self.lock:
+            return {app_id: self.states.get(app_id) for app_id in app_ids}
+
+    def unwatch(self, *app_ids: int) -> None:
+        """ Stops following apps """
+        with self.lock:
+            for app_id in app_ids:
+                self.states.pop(app_id, None)
+
+    def state(self, app_id: int) -> Optional[AuctionState]:
+        """ Latest state of a watched app """
+        with self.lock:
+            return self.states.get(app_id)
+
+    def _subscribe(self, subscription: Subscription, app_ids: Iterable[int]) -> Subscription:
+        """ Registers a subscription and queues the current state of its apps """
+        with self.lock:
+            self.subscriptions.append(subscription)
+            current = [(app_id, state) for app_id, state in self.states.items() if subscription.wants(app_id)]
+        for app_id, state in current:
+            subscription.deliver(StateChange(self.last_round or 0, app_id, state))
+        self.watch(*app_ids)
+        return subscription
+
+    def subscribe(self, *app_ids: int) -> Subscription:
+        """ Iterator of the changes of app_ids, which are watched, or of every watched app """
+        return self._subscribe(Subscription(self, set(app_ids) if app_ids else None), app_ids)
+
+    def subscribe_async(self, *app_ids: int) -> AsyncSubscription:
+        """ Same as subscribe for async for, call it from the consuming loop """
+        return self._subscribe(AsyncSubscription(self, set(app_ids) if app_ids else None), app_ids)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """ Removes a subscription """
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def process_block(self, block: Dict[str, Any]) -> List[StateChange]:
+        """ Applies the calls a block makes to watched apps and publishes their new state """
+        round_number = block["rnd"]
+        self.last_timestamp = block.get("ts", self.last_timestamp)
+        with self.lock:
+            states = dict(self.states)
+        updated: Dict[int, Optional[AuctionState]] = dict()
+        refetch: Set[int] = set()
+
+        for entry in block.get("txns") or []:
+            txn = entry.get("txn", {})
+            fields = txn.get("txn", txn)
+            app_id = fields.get("apid")
+            if fields.get("type") != "appl" or app_id not in states:
+                continue
+            if fields.get("apan") == transaction.OnComplete.DeleteApplicationOC:
+                updated[app_id] = None
+                refetch.discard(app_id)
+                continue
+            delta = (entry.get("dt") or {}).get("gd")
+            state = updated.get(app_id, states[app_id])
+            if not delta or app_id in refetch or state is None:
+                refetch.add(app_id)
+                continue
+            new_state = self.decoder.apply_delta(state, delta)
+            if new_state is None:
+                refetch.add(app_id)
+            else:
+                updated[app_id] = new_state
+
+        # a call without delta may still have changed the state, e.g. on create
+        updated.update(self._fetch(refetch))
+        with self.lock:
+            for app_id, state in updated.items():
+                if state is None:
+                    self.states.pop(app_id, None)
+                elif app_id in self.states:
+                    self.states[app_id] = state
+        changes = [StateChange(round_number, app_id, state) for app_id, state in updated.items()]
+        self._publish(changes)
+        return changes
+
+    def _advance(self, last_round: int) -> int:
+        """ Processes the rounds after the last one seen up to last_round """
+        with self.round_lock:
+            if self.last_round is None:
+                self.last_round = last_round
+                return 0
+            first_round = self.last_round + 1
+            for round_number in range(first_round, last_round + 1):
+                with self.lock:
+                    watching = bool(self.states)
+                if watching:
+                    self.process_block(self.client.block_info(round_number)["block"])
+                self.last_round = round_number
+            return max(0, last_round + 1 - first_round)
+
+    def poll(self) -> int:
+        """ Processes every round up to the latest one, returns how many there were """
+        return self._advance(self.client.status()["last-round"])
+
+    def start(self) -> None:
+        """ Follows new blocks on a thread until stop is called """
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.stopping.clear()
+            self.thread = Thread(target=self._follow, name="block-follower", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """ Stops the thread after the block it is waiting for """
+        self.stopping.set()
+
+    def close(self) -> None:
+        """ Stops following and ends every subscription """
+        self.stop()
+        with self.lock:
+            subscriptions, self.subscriptions = self.subscriptions, []
+        for subscription in subscriptions:
+            subscription.deliver(_CLOSED)
+
+    def _follow(self) -> None:
+        """ Block follower loop """
+        try:
+            if self.last_round is None:
+                self._advance(self.client.status()["last-round"])
+            while not self.stopping.is_set():
+                last_round = self.client.status_after_block(self.last_round)["last-round"]
+                get_params_provider(self.client).observe_round(last_round)
+                self._advance(last_round)
+        except ReferenceError:
+            # the client is gone, nothing is left to follow
+            self.close()
+        except Exception as exception:
+            rprint(f"[red bold] Block follower stopped: {exception}")
+            self.close()
+        finally:
+            with self.lock:
+                self.thread = None
+
+
+_followers: "WeakKeyDictionary[AlgodClient, BlockFollower]" = WeakKeyDictionary()
+_followers_lock = Lock()
+
+
+def get_block_follower(client: AlgodClient) -> BlockFollower:
+    """ Returns the block follower shared by everything using this client """
+    follower = _followers.get(client)
+    if follower is None:
+        with _followers_lock:
+            follower = _followers.get(client)
+            if follower is None:
+                follower = _followers[client] = BlockFollower(client)
+    return follower
@@ -0,0 +1,183 @@
+""" Module with a confirmation waiter shared by all callers of a client """
+
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary, ref
+
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_Transaction import Transaction
+from source.classes.class_ParamsProvider import get_params_provider
+from source.utils.utils_weak import dereference
+
+DEFAULT_TIMEOUT_ROUNDS = 10
+
+
+class PendingEntry:
+    """ A caller waiting for a transaction id """
+
+    __slots__ = ("future", "timeout", "rounds_left")
+
+    def __init__(self, future: Future, timeout: int) -> None:
+        self.future = future
+        self.timeout = timeout
+        self.rounds_left = timeout
+
+
+class ConfirmationWaiter:
+    """ Follows blocks on one thread and resolves every pending transaction id
+
+        Each round costs one status_after_block for all callers plus one
+        pending_transaction_info per distinct transaction id still waiting,
+        sent as one pipelined batch by a PooledAlgodClient. The thread
+        starts with the first waiter and stops once nothing is pending.
+    """
+
+    def __init__(self, client: AlgodClient) -> None:
+        """ Constructor for the waiter """
+        # weak, the shared waiter of a client must not keep it alive
+        self.client_ref = ref(client)
+        self.lock = Lock()
+        self.waiting: Dict[str, List[PendingEntry]] = dict()
+        self.last_round: Optional[int] = None
+        self.thread: Optional[Thread] = None
+
+    @property
+    def client(self) -> AlgodClient:
+        """ The client, ReferenceError once it was garbage collected """
+        return dereference(self.client_ref)
+
+    def submit(self, transaction_id: str, timeout: int = DEFAULT_TIMEOUT_ROUNDS) -> "Future[Transaction]":
+        """ Returns a future that resolves once the transaction is confirmed
+
+            The future fails with the pool error if the transaction is
+            rejected, or after timeout rounds without a confirmation.
+            Callbacks can be attached with add_done_callback.
+        """
+        future: "Future[Transaction]" = Future()
+        if timeout <= 0:
+            future.set_exception(Exception(f"Transaction with ID: {transaction_id} not confirmed after {timeout} rounds"))
+            return future
+
+        with self.lock:
+            self.waiting.setdefault(transaction_id, []).append(PendingEntry(future, timeout))
+            if self.thread is None:
+                self.thread = Thread(target=self._follow, name="confirmation-waiter", daemon=True)
+                self.thread.start()
+        return future
+
+    def wait(self, transaction_id: str, timeout: int = DEFAULT_TIMEOUT_ROUNDS) -> Transaction:
+        """ Blocks until the transaction is confirmed """
+        return self.submit(transaction_id, timeout).result()
+
+    def wait_all(self, transaction_ids: List[str], timeout: int = DEFAULT_TIMEOUT_ROUNDS) -> List[Transaction]:
+        """ Blocks until every transaction is confirmed, results keep the input order """
+        futures = [self.submit(transaction_id, timeout) for transaction_id in transaction_ids]
+        return [future.result() for future in futures]
+
+    def _resolve(self, transaction_id: str, result: Optional[Transaction] = None, exception: Optional[BaseException] = None) -> None:
+        """ Completes every future waiting for a transaction id """
+        with self.lock:
+            entries = self.waiting.pop(transaction_id, [])
+        for entry in entries:
+            if exception is not None:
+                entry.future.set_exception(exception)
+            else:
+                entry.future.set_result(result)
+
+    def _poll(self, transaction_ids: List[str]) -> None:
+        """ Checks the pool status of each waiting transaction once, in one pipelined batch when the client can """
+        responses: Optional[List[Any]] = None
+        if len(transaction_ids) > 1 and hasattr(self.client, "pending_transaction_infos"):
+            try:
+                responses = self.client.pending_transaction_infos(transaction_ids)
+            except Exception:
+                # the batch as a whole failed, which says nothing about any one transaction
+                responses = None
+        if responses is None:
+            responses = []
+            for transaction_id in transaction_ids:
+                try:
+                    responses.append(self.client.pending_transaction_info(transaction_id))
+                except Exception as exception:
+                    responses.append(exception)
+
+        for transaction_id, pending_trans in zip(transaction_ids, responses):
+            if isinstance(pending_trans, Exception):
+                self._resolve(transaction_id, exception=pending_trans)
+                continue
+
+            if pending_trans.get("confirmed-round", 0) > 0:
+                self._resolve(transaction_id, result=Transaction(pending_trans))
+            elif pending_trans["pool-error"]:
+                error = pending_trans["pool-error"]
+                self._resolve(transaction_id, exception=Exception(f"Pool Error: {error}"))
+
+    def _expire(self, transaction_ids: List[str]) -> None:
+        """ Fails the callers that ran out of rounds """
+        expired: List[Tuple[str, PendingEntry]] = []
+        with self.lock:
+            for transaction_id in transaction_ids:
+                entries = self.waiting.get(transaction_id)
+                if entries is None:
+                    continue
+                for entry in entries:
+                    entry.rounds_left -= 1
+                    if entry.rounds_left <= 0:
+                        expired.append((transaction_id, entry))
+                remaining = [entry for entry in entries if entry.rounds_left > 0]
+                if remaining:
+                    self.waiting[transaction_id] = remaining
+                else:
+                    del self.waiting[transaction_id]
+        for transaction_id, entry in expired:
+            entry.future.set_exception(Exception(
+                f"Transaction with ID: {transaction_id} not confirmed after {entry.timeout} rounds"
+            ))
+
+    def _follow(self) -> None:
+        """ Block follower loop """
+        try:
+            if self.last_round is None:
+                self.last_round = self.client.status()["last-round"]
+
+            while True:
+                with self.lock:
+                    transaction_ids = list(self.waiting)
+                if transaction_ids:
+                    self._poll(transaction_ids)
+                    self._expire(transaction_ids)
+
+                with self.lock:
+                    if not self.waiting:
+                        self.thread = None
+                        self.last_round = None
+                        return
+
+                client_status = self.client.status_after_block(self.last_round)
+                self.last_round = client_status["last-round"]
+                get_params_provider(self.client).observe_round(self.last_round)
+        except Exception as exception:
+            with self.lock:
+                entries = [entry for pending in self.waiting.values() for entry in pending]
+                self.waiting = dict()
+                self.thread = None
+                self.last_round = None
+            for entry in entries:
+                entry.future.set_exception(exception)
+
+
+_waiters: "WeakKeyDictionary[AlgodClient, ConfirmationWaiter]" = WeakKeyDictionary()
+_waiters_lock = Lock()
+
+
+def get_confirmation_waiter(client: AlgodClient) -> ConfirmationWaiter:
+    """ Returns the confirmation waiter shared by everything using this client """
+    waiter = _waiters.get(client)
+    if waiter is None:
+        with _waiters_lock:
+            waiter = _waiters.get(client)
+            if waiter is None:
+                waiter = _waiters[client] = ConfirmationWaiter(client)
+    return waiter
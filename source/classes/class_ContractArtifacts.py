@@ -0,0 +1,140 @@
+""" Module with contract artifacts built ahead of time, read without PyTeal """
+
+import json
+import os
+from base64 import b64decode, b64encode
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from source.utils.utils_console import rprint
+
+# bump when the layout of the manifest changes
+ARTIFACT_FORMAT = 2
+MANIFEST_NAME = "manifest.json"
+# directory written by build_artifacts.py, artifacts are only used when it is set
+DEFAULT_ARTIFACT_DIR = os.environ.get("AUCTION_ARTIFACTS")
+# source of every approval program, hashed rather than imported
+CONTRACTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "contracts.py")
+
+_loaded: Dict[str, Optional["ContractArtifacts"]] = dict()
+_lock = Lock()
+
+
+def contracts_source() -> bytes:
+    """ Contents of source/contracts.py """
+    with open(CONTRACTS_PATH, "rb") as contract_file:
+        return contract_file.read()
+
+
+class ContractArtifacts:
+    """ Approval and clear bytecode of every contract, with the interface clients use
+
+        manifest.json holds the programs by contract and compiler, as the
+        bytecode of SimulatedAlgodClient is not algod's, next to the
+        global state keys, schemas and call arguments of the contracts and
+        the hash of the contracts.py they were built from. The generated
+        TEAL is written alongside for reading.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """ Constructor for the artifacts of directory, empty until load or add """
+        self.directory = directory
+        self.manifest: Dict[str, Any] = {"format": ARTIFACT_FORMAT, "source": None, "interface": {}, "programs": {}}
+
+    @property
+    def path(self) -> str:
+        """ Path of the manifest """
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def load(self) -> bool:
+        """ Reads the manifest, False when it is missing or of another format """
+        try:
+            with open(self.path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(manifest, dict) or manifest.get("format") != ARTIFACT_FORMAT:
+            return False
+        self.manifest = manifest
+        return True
+
+    def is_current(self) -> bool:
+        """ True when the artifacts were built from the contracts.py on disk """
+        return self.manifest.get("source") == sha256(contracts_source()).hexdigest()
+
+    def contracts(self) -> List[str]:
+        """ Names of the approval programs held """
+        return list(self.manifest["programs"])
+
+    def programs(self, contract: str, compiler: str) -> Optional[Tuple[bytes, bytes]]:
+        """ Approval and clear bytecode of a contract for a compiler, None when not built """
+        programs = self.manifest["programs"].get(contract, {}).get(compiler)
+        if programs is None:
+            return None
+        return b64decode(programs["approval"]), b64decode(programs["clear"])
+
+    def interface(self) -> Dict[str, Any]:
+        """ Schemas, global state keys and call arguments of the contracts """
+        return self.manifest["interface"]
+
+    def state_keys(self) -> Dict[str, str]:
+        """ Type of every global state key, uint64 or address """
+        return self.manifest["interface"].get("global_state", {})
+
+    def add(
+        self,
+        contract: str,
+        compiler: str,
+        approval: bytes,
+        clear: bytes,
+        approval_teal: str,
+        clear_teal: str) -> None:
+        """ Records the programs of a contract compiled by compiler """
+        self.manifest["programs"].setdefault(contract, {})[compiler] = {
+            "approval": b64encode(approval).decode(),
+            "clear": b64encode(clear).decode(),
+            "approval_teal": f"{contract}.approval.teal",
+            "clear_teal": "clear.teal",
+        }
+        self._write(f"{contract}.approval.teal", approval_teal)
+        self._write("clear.teal", clear_teal)
+
+    def save(self, interface: Dict[str, Any], **details: Any) -> None:
+        """ Writes the manifest, details such as the TEAL version are recorded as they are """
+        self.manifest.update(details)
+        self.manifest["source"] = sha256(contracts_source()).hexdigest()
+        self.manifest["interface"] = interface
+        self._write(MANIFEST_NAME, json.dumps(self.manifest, indent=2, sort_keys=True))
+
+    def _write(self, name: str, text: str) -> None:
+        """ Writes a file of the artifact directory atomically """
+        path = os.path.join(self.directory, name)
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as artifact_file:
+            artifact_file.write(text)
+        os.replace(temporary, path)
+
+
+def load_artifacts(directory: Optional[str] = DEFAULT_ARTIFACT_DIR) -> Optional[ContractArtifacts]:
+    """ Artifacts of directory, read once per process
+
+        None when no directory is given, when it holds no manifest, or when
+        contracts.py changed since the artifacts were built.
+    """
+    if directory is None:
+        return None
+    if directory in _loaded:
+        return _loaded[directory]
+
+    artifacts: Optional[ContractArtifacts] = ContractArtifacts(directory)
+    if not artifacts.load():
+        rprint(f"[yellow] No contract artifacts in {directory}, run build_artifacts.py")
+        artifacts = None
+    elif not artifacts.is_current():
+        rprint(f"[yellow] Contract artifacts in {directory} are older than contracts.py, rebuild them")
+        artifacts = None
+    with _lock:
+        _loaded[directory] = artifacts
+    return artifacts
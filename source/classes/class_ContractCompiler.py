@@ -1,32 +1,264 @@
 """ Module that keeps compiled contracts """
 
+import json
+import os
 from base64 import b64decode
-from typing import Tuple
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from algosdk.v2client.algod import AlgodClient
-from pyteal import compileTeal, Mode, Expr
 
-from source.contracts import approval_program, clear_state_program
+from source.classes.class_ContractArtifacts import ContractArtifacts, contracts_source, load_artifacts
+
+TEAL_VERSION = 5
+# bump when the layout or meaning of cached programs changes
+CACHE_FORMAT = 3
+# approval program variant from contracts.APPROVAL_PROGRAMS
+DEFAULT_CONTRACT = os.environ.get("AUCTION_CONTRACT", "baseline")
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AUCTION_TEAL_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "algorand-auction", "teal"),
+)
+
+# process wide caches shared by every CompiledContracts instance
+_teal_sources: Dict[Tuple[str, str], Tuple[str, str]] = dict()
+_compiled: Dict[Tuple[str, str, str], Tuple[bytes, bytes]] = dict()
+_fingerprint: Optional[str] = None
+_lock = Lock()
+
+
+def pyteal_version() -> str:
+    """ Installed PyTeal version, part of every cache key """
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("pyteal")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def source_fingerprint() -> str:
+    """ Hash of the contract source, the TEAL version and the PyTeal version
+
+        It lets a new process find its programs on disk without building the
+        PyTeal AST. Computed once per process.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        _fingerprint = sha256(contracts_source() + f"|{TEAL_VERSION}|{pyteal_version()}|{CACHE_FORMAT}".encode()).hexdigest()
+    return _fingerprint
+
+
+def contract_names() -> List[str]:
+    """ Names of the approval programs, from the artifacts when they are loaded """
+    artifacts = load_artifacts()
+    if artifacts is not None:
+        return artifacts.contracts()
+    from source.contracts import APPROVAL_PROGRAMS
+    return list(APPROVAL_PROGRAMS)
+
+
+def compiler_name(client: Any) -> str:
+    """ Name programs compiled by client are kept under
+
+        Adapters and instrumentation are looked through, so the simulator's
+        pseudo bytecode is never handed to algod and every algod client,
+        pooled or not, shares its programs.
+    """
+    from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+    seen = set()
+    while id(client) not in seen:
+        seen.add(id(client))
+        inner = vars(client).get("wrapped", vars(client).get("client")) if hasattr(client, "__dict__") else None
+        if inner is None:
+            break
+        client = inner
+    return "simulator" if isinstance(client, SimulatedAlgodClient) else "algod"
+
+
+def teal_key(teal: str) -> str:
+    """ Content address of a generated TEAL program """
+    return sha256(f"{teal}|{TEAL_VERSION}|{pyteal_version()}|{CACHE_FORMAT}".encode()).hexdigest()
 
 
 class CompiledContracts:
-    """ Class that keeps compiled contracts """
-    
-    def __init__(self,client: AlgodClient):
+    """ Class that keeps compiled contracts
+
+        Bytecode is cached in memory for the process and on disk under
+        cache_dir, content addressed by the generated TEAL. Pass
+        cache_dir=None to keep the cache in memory only. contract names
+        the approval program, one of contracts.APPROVAL_PROGRAMS.
+
+        Programs found in artifacts, those of AUCTION_ARTIFACTS by default,
+        are used before any cache. PyTeal and contracts.py are only
+        imported once TEAL has to be generated.
+    """
+
+    def __init__(
+        self,
+        client: AlgodClient,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        contract: str = DEFAULT_CONTRACT,
+        artifacts: Optional[ContractArtifacts] = None):
         self.client = client
+        self.cache_dir = cache_dir
+        self.contract = contract
+        self.compiler = compiler_name(client)
+        self.artifacts = artifacts if artifacts is not None else load_artifacts()
         self.approval_program = None
         self.clear_state_program = None
-    
+        # only known contracts are ever built, so a built one needs no check against contracts.py
+        if not self.is_built():
+            from source.contracts import APPROVAL_PROGRAMS
+            if contract not in APPROVAL_PROGRAMS:
+                raise ValueError(f"unknown contract {contract}, expected one of {', '.join(APPROVAL_PROGRAMS)}")
+
+    def is_built(self) -> bool:
+        """ True when the artifacts or the disk cache hold this contract """
+        if self.artifacts is not None and self.contract in self.artifacts.contracts():
+            return True
+        return self.cache_dir is not None and os.path.exists(
+            os.path.join(self.cache_dir, "sources", f"{source_fingerprint()}.{self.contract}.json"))
+
     def get_compiled_contracts(self)-> Tuple[bytes, bytes]:
         """ Get compiled contracts"""
 
         if self.approval_program is None or self.clear_state_program is None:
-            self.approval_program = self.compile_contracts(approval_program())
-            self.clear_state_program = self.compile_contracts(clear_state_program())
-        
+            cached = self.get_artifact_contracts() or self.get_cached_contracts()
+            if cached is None:
+                approval_teal, clear_teal = self.get_teal()
+                cached = self.store(
+                    b64decode(self.client.compile(approval_teal)["result"]),
+                    b64decode(self.client.compile(clear_teal)["result"]),
+                )
+            self.approval_program, self.clear_state_program = cached
+
+        return self.approval_program, self.clear_state_program
+
+    async def get_compiled_contracts_async(self) -> Tuple[bytes, bytes]:
+        """ Same as get_compiled_contracts for clients whose compile is a coroutine """
+        if self.approval_program is None or self.clear_state_program is None:
+            cached = self.get_artifact_contracts() or self.get_cached_contracts()
+            if cached is None:
+                approval_teal, clear_teal = self.get_teal()
+                approval = await self.client.compile(approval_teal)
+                clear = await self.client.compile(clear_teal)
+                cached = self.store(b64decode(approval["result"]), b64decode(clear["result"]))
+            self.approval_program, self.clear_state_program = cached
+
         return self.approval_program, self.clear_state_program
 
-    def compile_contracts(self,contract: Expr) -> bytes:
+    def compile_contracts(self,contract: Any) -> bytes:
         """ Compiles contracts and returns them """
-        teal = compileTeal(contract, mode=Mode.Application, version=5)
+        from pyteal import compileTeal, Mode
+        teal = compileTeal(contract, mode=Mode.Application, version=TEAL_VERSION)
         response = self.client.compile(teal)
-        return b64decode(response["result"])
\ No newline at end of file
+        return b64decode(response["result"])
+
+    def get_teal(self) -> Tuple[str, str]:
+        """ Generates approval and clear TEAL once per process """
+        key = (source_fingerprint(), self.contract)
+        teal = _teal_sources.get(key)
+        if teal is None:
+            from pyteal import compileTeal, Mode
+            from source.contracts import APPROVAL_PROGRAMS, clear_state_program
+            teal = (
+                compileTeal(APPROVAL_PROGRAMS[self.contract](), mode=Mode.Application, version=TEAL_VERSION),
+                compileTeal(clear_state_program(), mode=Mode.Application, version=TEAL_VERSION),
+            )
+            with _lock:
+                _teal_sources[key] = teal
+        return teal
+
+    def get_artifact_contracts(self) -> Optional[Tuple[bytes, bytes]]:
+        """ Programs built ahead of time for this contract and compiler, if any """
+        if self.artifacts is None:
+            return None
+        return self.artifacts.programs(self.contract, self.compiler)
+
+    def get_cached_contracts(self) -> Optional[Tuple[bytes, bytes]]:
+        """ Looks the programs up in memory, then on disk """
+        fingerprint = source_fingerprint()
+        cached = _compiled.get((self.compiler, fingerprint, self.contract))
+        if cached is not None or self.cache_dir is None:
+            return cached
+
+        index = self._read_json(os.path.join(self.cache_dir, "sources", f"{fingerprint}.{self.contract}.json"))
+        if index is None:
+            return None
+        approval = self._read_bytes(index["approval"])
+        clear = self._read_bytes(index["clear"])
+        if approval is None or clear is None:
+            return None
+
+        with _lock:
+            _compiled[(self.compiler, fingerprint, self.contract)] = (approval, clear)
+        return approval, clear
+
+    def store(self, approval: bytes, clear: bytes) -> Tuple[bytes, bytes]:
+        """ Records freshly compiled programs in memory and on disk """
+        fingerprint = source_fingerprint()
+        with _lock:
+            _compiled[(self.compiler, fingerprint, self.contract)] = (approval, clear)
+
+        if self.cache_dir is not None:
+            approval_teal, clear_teal = self.get_teal()
+            index = {"approval": teal_key(approval_teal), "clear": teal_key(clear_teal)}
+            try:
+                self._write(os.path.join(self.cache_dir, "programs", f"{index['approval']}.{self.compiler}.bin"), approval)
+                self._write(os.path.join(self.cache_dir, "programs", f"{index['clear']}.{self.compiler}.bin"), clear)
+                self._write(os.path.join(self.cache_dir, "programs", f"{index['approval']}.teal"), approval_teal.encode())
+                self._write(os.path.join(self.cache_dir, "programs", f"{index['clear']}.teal"), clear_teal.encode())
+                self._write(os.path.join(self.cache_dir, "sources", f"{fingerprint}.{self.contract}.json"), json.dumps(index).encode())
+            except OSError:
+                # the on-disk cache is an optimisation, a read-only home must not break compiling
+                pass
+        return approval, clear
+
+    def _read_bytes(self, key: str) -> Optional[bytes]:
+        """ Reads compiled bytecode by TEAL content address """
+        return self._read_file(os.path.join(self.cache_dir, "programs", f"{key}.{self.compiler}.bin"))
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as cache_file:
+                return cache_file.read()
+        except OSError:
+            return None
+
+    @classmethod
+    def _read_json(cls, path: str) -> Optional[Dict[str, Any]]:
+        data = cls._read_file(path)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        """ Writes a cache file atomically """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as cache_file:
+            cache_file.write(data)
+        os.replace(temporary, path)
+
+
+def build_artifacts(clients: Iterable[AlgodClient], directory: str) -> ContractArtifacts:
+    """ Compiles every contract with each client and writes them to directory with their interface """
+    from source.contracts import APPROVAL_PROGRAMS, CONTRACT_INTERFACE
+
+    artifacts = ContractArtifacts(directory)
+    for client in clients:
+        for contract in APPROVAL_PROGRAMS:
+            contracts = CompiledContracts(client, contract=contract, artifacts=artifacts)
+            approval_teal, clear_teal = contracts.get_teal()
+            approval, clear = contracts.get_cached_contracts() or contracts.store(
+                b64decode(client.compile(approval_teal)["result"]),
+                b64decode(client.compile(clear_teal)["result"]),
+            )
+            artifacts.add(contract, contracts.compiler, approval, clear, approval_teal, clear_teal)
+    artifacts.save(CONTRACT_INTERFACE, teal_version=TEAL_VERSION, pyteal=pyteal_version())
+    return artifacts
@@ -0,0 +1,192 @@
+""" Module that closes auctions once their end time has passed """
+
+import heapq
+from itertools import count
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from algosdk import constants, error
+from algosdk.future import transaction
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_Auction import Auction
+from source.classes.class_UserAccount import UserAccount
+from source.classes.class_BlockFollower import get_block_follower
+from source.classes.class_BatchSigner import sign_transactions
+from source.classes.class_ConfirmationWaiter import get_confirmation_waiter
+from source.classes.class_ParamsProvider import suggested_params
+from source.utils.utils_auction import build_close_transaction
+from source.utils.utils_console import rprint
+
+# closes of an auction tried before it is given up
+MAX_CLOSE_ATTEMPTS = 3
+
+
+class DeadlineScheduler:
+    """ Closes every scheduled auction in the first round whose block is past its end time
+
+        Open auctions wait in a heap keyed by end_time. Each tick reads the
+        latest block timestamp from the shared BlockFollower, which also
+        keeps the seller and highest bidder of each auction current, and
+        closes everything due: the delete transactions go out in groups of
+        up to group_size, every confirmation of the tick is awaited
+        together. A group that is rejected is resent one close at a time,
+        so one auction closed by hand does not hold back the others.
+
+        start ticks on a thread after every block. SimulatedAlgodClient
+        produces a block on every wait, so against it call tick after
+        moving its clock instead.
+    """
+
+    def __init__(self, client: AlgodClient, closer: UserAccount, group_size: int = constants.tx_group_limit) -> None:
+        """ Constructor for the scheduler, closer must be the seller or creator of the auctions """
+        self.client = client
+        self.closer = closer
+        self.group_size = group_size
+        self.follower = get_block_follower(client)
+        self.waiter = get_confirmation_waiter(client)
+        self.lock = Lock()
+        self.deadlines: List[Tuple[int, int, Auction]] = []
+        self.order = count()
+        self.attempts: Dict[int, int] = dict()
+        self.thread: Optional[Thread] = None
+        self.stopping = Event()
+        self.scheduled = Event()
+
+    def schedule(self, auctions: Iterable[Auction]) -> None:
+        """ Queues auctions to be closed after their end time """
+        auctions = [auction for auction in auctions if auction.app_id is not None]
+        with self.lock:
+            for auction in auctions:
+                heapq.heappush(self.deadlines, (auction.end_time, next(self.order), auction))
+        self.follower.watch(*(auction.app_id for auction in auctions))
+        self.scheduled.set()
+
+    def pending(self) -> int:
+        """ Number of auctions waiting for their deadline """
+        with self.lock:
+            return len(self.deadlines)
+
+    def next_deadline(self) -> Optional[int]:
+        """ Earliest end time still waiting, None when nothing is scheduled """
+        with self.lock:
+            return self.deadlines[0][0] if self.deadlines else None
+
+    def due(self, timestamp: int) -> List[Auction]:
+        """ Takes the auctions whose end time is at or before timestamp off the heap """
+        auctions = []
+        with self.lock:
+            while self.deadlines and self.deadlines[0][0] <= timestamp:
+                auctions.append(heapq.heappop(self.deadlines)[2])
+        return auctions
+
+    def latest_timestamp(self) -> int:
+        """ Timestamp of the latest block, read by the follower when it can be """
+        self.follower.poll()
+        timestamp = self.follower.last_timestamp
+        if timestamp is None:
+            last_round = self.client.status()["last-round"]
+            timestamp = self.client.block_info(last_round)["block"]["ts"]
+        return timestamp
+
+    def tick(self) -> List[Auction]:
+        """ Closes the auctions due at the latest block, returns those confirmed closed """
+        if self.next_deadline() is None:
+            return []
+        auctions = self.due(self.latest_timestamp())
+        return self.close(auctions) if auctions else []
+
+    def _retry(self, auction: Auction, reason: str) -> None:
+        """ Puts an auction back for the next tick, unless it ran out of attempts """
+        attempts = self.attempts.get(auction.app_id, 0) + 1
+        if attempts >= MAX_CLOSE_ATTEMPTS:
+            rprint(f"[red bold] Auction {auction.app_id} was not closed after {attempts} attempts: {reason}")
+            self.attempts.pop(auction.app_id, None)
+            return
+        self.attempts[auction.app_id] = attempts
+        with self.lock:
+            heapq.heappush(self.deadlines, (auction.end_time, next(self.order), auction))
+
+    def _send(self, closes: List[Tuple[Auction, transaction.ApplicationDeleteTxn]], signed: List[transaction.SignedTransaction]) -> List[Tuple[Auction, str]]:
+        """ Sends a signed group of closes, or each close alone once the group is rejected """
+        if len(closes) > 1:
+            try:
+                self.client.send_transactions(signed)
+                return [(auction, signed_close.get_txid()) for (auction, _), signed_close in zip(closes, signed)]
+            except error.AlgodHTTPError:
+                for _, close in closes:
+                    close.group = None
+                signed = [close.sign(self.closer.get_private_key()) for _, close in closes]
+
+        sent = []
+        for (auction, _), signed_close in zip(closes, signed):
+            try:
+                self.client.send_transaction(signed_close)
+            except error.AlgodHTTPError as exception:
+                if "does not exist" not in str(exception):
+                    self._retry(auction, str(exception))
+                continue
+            sent.append((auction, signed_close.get_txid()))
+        return sent
+
+    def close(self, auctions: List[Auction]) -> List[Auction]:
+        """ Closes auctions in groups and waits for all their confirmations together """
+        states = {auction.app_id: self.follower.state(auction.app_id) for auction in auctions}
+        params = suggested_params(self.client)
+        closes = []
+        for auction in auctions:
+            state = states[auction.app_id]
+            # an auction the follower saw deleted was closed by someone else
+            if state is not None:
+                closes.append((auction, build_close_transaction(auction, self.closer.get_address(), state, params)))
+
+        groups = [closes[start:start + self.group_size] for start in range(0, len(closes), self.group_size)]
+        for group in groups:
+            if len(group) > 1:
+                transaction.assign_group_id([close for _, close in group])
+        signed = iter(sign_transactions([(close, self.closer.get_private_key()) for _, close in closes]))
+        sent = []
+        for group in groups:
+            sent.extend(self._send(group, [next(signed) for _ in group]))
+
+        futures = [(auction, self.waiter.submit(transaction_id)) for auction, transaction_id in sent]
+        closed = []
+        for auction, future in futures:
+            try:
+                future.result()
+            except Exception as exception:
+                self._retry(auction, str(exception))
+                continue
+            self.attempts.pop(auction.app_id, None)
+            closed.append(auction)
+        return closed
+
+    def start(self) -> None:
+        """ Ticks on a thread after every block until stop is called """
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.stopping.clear()
+            self.thread = Thread(target=self._run, name="deadline-scheduler", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """ Stops the thread after the block it is waiting for """
+        self.stopping.set()
+        self.scheduled.set()
+
+    def _run(self) -> None:
+        """ Scheduler loop, idle without scheduled auctions """
+        try:
+            while not self.stopping.is_set():
+                if self.next_deadline() is None:
+                    self.scheduled.wait()
+                    self.scheduled.clear()
+                    continue
+                self.tick()
+                self.client.status_after_block(self.follower.last_round)
+        except Exception as exception:
+            rprint(f"[red bold] Deadline scheduler stopped: {exception}")
+        finally:
+            with self.lock:
+                self.thread = None
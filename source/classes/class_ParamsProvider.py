@@ -0,0 +1,107 @@
+""" Module with a shared, round scoped cache of suggested params """
+
+from threading import Lock
+from time import monotonic
+from typing import Optional
+from weakref import WeakKeyDictionary, ref
+
+from algosdk.future import transaction
+from algosdk.v2client.algod import AlgodClient
+
+from source.utils.utils_weak import dereference
+
+DEFAULT_PARAMS_TTL = 30.0
+
+
+class ParamsProvider:
+    """ Fetches suggested params once and reuses them until they expire
+
+        The cached params are rebased onto every round the confirmation waiter
+        observes, so first/last valid follow the chain without another
+        suggested_params request. A fresh request is only made when the ttl
+        runs out, which picks up fee changes.
+    """
+
+    def __init__(self, client: AlgodClient, ttl: float = DEFAULT_PARAMS_TTL) -> None:
+        """ Constructor for the params provider """
+        # weak, the shared provider of a client must not keep it alive
+        self.client_ref = ref(client)
+        self.ttl = ttl
+        self.params: Optional[transaction.SuggestedParams] = None
+        self.fetched_at = 0.0
+        self.lock = Lock()
+
+    @property
+    def client(self) -> AlgodClient:
+        """ The client, ReferenceError once it was garbage collected """
+        return dereference(self.client_ref)
+
+    def get(self) -> transaction.SuggestedParams:
+        """ Returns cached params, fetching them when missing or expired """
+        params = self.params
+        if params is not None and monotonic() - self.fetched_at < self.ttl:
+            return params
+
+        with self.lock:
+            if self.params is None or monotonic() - self.fetched_at >= self.ttl:
+                self.params = self.client.suggested_params()
+                self.fetched_at = monotonic()
+            return self.params
+
+    async def get_async(self) -> transaction.SuggestedParams:
+        """ Same as get for clients whose suggested_params is a coroutine """
+        params = self.params
+        if params is not None and monotonic() - self.fetched_at < self.ttl:
+            return params
+
+        params = await self.client.suggested_params()
+        with self.lock:
+            self.params = params
+            self.fetched_at = monotonic()
+        return params
+
+    def observe_round(self, last_round: int) -> None:
+        """ Moves the validity window of the cached params to a newer round """
+        params = self.params
+        if params is None or last_round <= params.first:
+            return
+
+        with self.lock:
+            params = self.params
+            if params is None or last_round <= params.first:
+                return
+            self.params = transaction.SuggestedParams(
+                params.fee,
+                last_round,
+                last_round + (params.last - params.first),
+                params.gh,
+                params.gen,
+                params.flat_fee,
+                params.consensus_version,
+                params.min_fee,
+            )
+
+    def invalidate(self) -> None:
+        """ Drops the cached params so the next call fetches new ones """
+        with self.lock:
+            self.params = None
+
+
+_providers: "WeakKeyDictionary[AlgodClient, ParamsProvider]" = WeakKeyDictionary()
+_providers_lock = Lock()
+
+
+def get_params_provider(client: AlgodClient) -> ParamsProvider:
+    """ Returns the params provider shared by everything using this client """
+    provider = _providers.get(client)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(client)
+            if provider is None:
+                provider = _providers[client] = ParamsProvider(client)
+    return provider
+
+
+def suggested_params(client: AlgodClient) -> transaction.SuggestedParams:
+    """ Returns the shared suggested params of a client """
+    return get_params_provider(client).get()
@@ -0,0 +1,345 @@
+""" Module with a pooled keep-alive HTTP/1.1 transport for the algod and kmd clients """
+
+import json
+import select
+import socket
+import ssl
+from threading import BoundedSemaphore, Lock
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlencode, urlparse
+
+from algosdk import constants, error
+from algosdk.kmd import KMDClient
+from algosdk.v2client.algod import AlgodClient
+
+DEFAULT_MAX_CONNECTIONS = 8
+# requests written back to back on one connection before their responses are read
+PIPELINE_DEPTH = 16
+API_VERSION_PATH_PREFIX = "/v2"
+# requests that may be sent again, or pipelined, without changing anything twice
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+# method, path with query, headers and body
+Request = Tuple[str, str, Dict[str, str], bytes]
+# status code, lower case headers and body
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def read_response(reader: BinaryIO, method: str) -> Tuple[int, Dict[str, str], bytes, bool]:
+    """ Reads one HTTP/1.1 response, with whether the connection may be used again """
+    status_line = reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed by the server")
+    version, code = status_line.split()[:2]
+    code = int(code)
+
+    headers: Dict[str, str] = dict()
+    while True:
+        line = reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == b"HTTP/1.1" else connection == "keep-alive"
+    if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+        return code, headers, b"", keep_alive
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int(reader.readline().split(b";")[0], 16)
+            if size == 0:
+                while reader.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(reader.read(size))
+            reader.readline()
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        length = int(headers["content-length"])
+        body = reader.read(length)
+        if len(body) < length:
+            raise ConnectionResetError("connection closed in the middle of a response")
+    else:
+        # the body runs until the server closes the connection
+        return code, headers, reader.read(), False
+    return code, headers, body, keep_alive
+
+
+class _Connection:
+    """ A socket with its buffered reader """
+
+    __slots__ = ("sock", "reader", "used")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self.used = False
+
+    def is_stale(self) -> bool:
+        """ True when the server closed the connection, or sent something unasked, while it was idle """
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        return bool(readable)
+
+    def close(self) -> None:
+        """ Closes the reader and the socket """
+        self.reader.close()
+        self.sock.close()
+
+
+class PooledTransport:
+    """ HTTP/1.1 connections to one server, kept alive and shared between threads
+
+        At most max_connections are open at once and a request waits for
+        one to come free; idle connections are reused newest first. An
+        idle connection the server closed is replaced before use. Requests
+        lost when the server drops a reused connection, or one that already
+        answered part of a pipeline, are sent again on a new connection if
+        they were not sent yet or are idempotent. pipeline writes up to
+        depth idempotent requests back to back on one connection and reads
+        the responses in order, so a batch costs one round trip per depth
+        requests instead of one per request.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: Optional[float] = None,
+        depth: int = PIPELINE_DEPTH) -> None:
+        """ Constructor for the transport, no connection is opened before the first request """
+        parsed = urlparse(address)
+        self.host = parsed.hostname
+        self.tls = parsed.scheme == "https"
+        self.port = parsed.port or (443 if self.tls else 80)
+        self.base_path = parsed.path.rstrip("/")
+        self.host_header = f"{self.host}:{self.port}"
+        self.timeout = timeout
+        self.depth = depth
+        self.semaphore = BoundedSemaphore(max_connections)
+        self.idle: List[_Connection] = []
+        self.lock = Lock()
+        # connections opened so far, compared with requests sent it tells how well they are reused
+        self.opened = 0
+
+    def _connect(self) -> _Connection:
+        """ Opens a new connection """
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        with self.lock:
+            self.opened += 1
+        return _Connection(sock)
+
+    def _acquire(self) -> _Connection:
+        """ Returns the newest live idle connection, or a new one """
+        while True:
+            with self.lock:
+                connection = self.idle.pop() if self.idle else None
+            if connection is None:
+                return self._connect()
+            if not connection.is_stale():
+                return connection
+            connection.close()
+
+    def _release(self, connection: _Connection, reusable: bool) -> None:
+        """ Hands a connection back to the pool, or closes it """
+        if reusable:
+            with self.lock:
+                self.idle.append(connection)
+        else:
+            connection.close()
+
+    def _encode(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> bytes:
+        """ Request line, headers and body of one request """
+        lines = [f"{method} {self.base_path}{path} HTTP/1.1", f"Host: {self.host_header}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    def _exchange(self, requests: Sequence[Request]) -> List[Response]:
+        """ Sends requests on one connection and reads their responses in order """
+        responses: List[Response] = []
+        remaining = list(requests)
+        fresh = False
+        with self.semaphore:
+            while remaining:
+                connection = self._connect() if fresh else self._acquire()
+                reused, sent, reusable, answered = connection.used, False, False, len(responses)
+                try:
+                    connection.sock.sendall(b"".join(self._encode(*request) for request in remaining))
+                    sent = True
+                    connection.used = True
+                    keep_alive = True
+                    while remaining and keep_alive:
+                        code, headers, body, keep_alive = read_response(connection.reader, remaining[0][0])
+                        responses.append((code, headers, body))
+                        remaining.pop(0)
+                    reusable = keep_alive
+                except ConnectionError:
+                    # a new connection failing before any response is a real error, and so is
+                    # losing a request that may have changed something
+                    idempotent = all(request[0] in IDEMPOTENT_METHODS for request in remaining)
+                    if (not reused and len(responses) == answered) or (sent and not idempotent):
+                        raise
+                    fresh = True
+                finally:
+                    self._release(connection, reusable)
+        return responses
+
+    def request(self, method: str, path: str, headers: Dict[str, str], body: bytes = b"") -> Response:
+        """ Sends one request and returns its response """
+        return self._exchange([(method, path, headers, body)])[0]
+
+    def pipeline(self, requests: Sequence[Request]) -> List[Response]:
+        """ Sends idempotent requests depth at a time per connection, responses keep the input order """
+        if any(request[0] not in IDEMPOTENT_METHODS for request in requests):
+            raise ValueError(f"only {', '.join(sorted(IDEMPOTENT_METHODS))} requests can be pipelined")
+        responses: List[Response] = []
+        for start in range(0, len(requests), self.depth):
+            responses.extend(self._exchange(requests[start:start + self.depth]))
+        return responses
+
+    def close(self) -> None:
+        """ Closes every idle connection """
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class PooledAlgodClient(AlgodClient):
+    """ AlgodClient sending its requests over a PooledTransport
+
+        Every call of AlgodClient works unchanged. account_infos and
+        pending_transaction_infos fetch many accounts or transactions in
+        pipelined batches.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: Optional[float] = None) -> None:
+        """ Constructor for the client """
+        super().__init__(algod_token, algod_address, headers)
+        self.transport = PooledTransport(algod_address, max_connections, timeout)
+
+    def _prepare(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None) -> Request:
+        """ Request algod_request would send, as AlgodClient builds it """
+        header = dict(self.headers) if self.headers else dict()
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = API_VERSION_PATH_PREFIX + requrl
+        if params:
+            requrl = requrl + "?" + urlencode(params)
+        return method, requrl, header, data or b""
+
+    @staticmethod
+    def _decode(response: Response, response_format: str = "json") -> Any:
+        """ Body of a response, raising the errors AlgodClient raises """
+        code, _, payload = response
+        if code >= 400:
+            message = payload.decode("utf-8")
+            try:
+                message = json.loads(message)["message"]
+            finally:
+                raise error.AlgodHTTPError(message, code)
+        if response_format == "json":
+            try:
+                return json.loads(payload)
+            except Exception as exception:
+                raise error.AlgodResponseError("Failed to parse JSON response from algod") from exception
+        return payload
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: str = "json") -> Any:
+        """ Executes a request and returns the decoded body """
+        return self._decode(self.transport.request(*self._prepare(method, requrl, params, data, headers)), response_format)
+
+    def algod_requests(self, requests: Sequence[Tuple[str, Optional[Dict[str, Any]]]]) -> List[Union[Any, Exception]]:
+        """ GETs of (requrl, params) pipelined, each decoded or replaced by the error algod_request would raise """
+        results: List[Union[Any, Exception]] = []
+        for response in self.transport.pipeline([self._prepare("GET", requrl, params) for requrl, params in requests]):
+            try:
+                results.append(self._decode(response))
+            except (error.AlgodHTTPError, error.AlgodResponseError) as exception:
+                results.append(exception)
+        return results
+
+    def account_infos(self, addresses: Sequence[str]) -> List[Dict[str, Any]]:
+        """ account_info of every address, raising the first error """
+        results = self.algod_requests([(f"/accounts/{address}", None) for address in addresses])
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def pending_transaction_infos(self, transaction_ids: Sequence[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """ pending_transaction_info of every transaction, or the error it raised """
+        return self.algod_requests([(f"/transactions/pending/{transaction_id}", {"format": "json"}) for transaction_id in transaction_ids])
+
+    def close(self) -> None:
+        """ Closes the idle connections """
+        self.transport.close()
+
+
+class PooledKMDClient(KMDClient):
+    """ KMDClient sending its requests over a PooledTransport """
+
+    def __init__(
+        self,
+        kmd_token: str,
+        kmd_address: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: Optional[float] = None) -> None:
+        """ Constructor for the client """
+        super().__init__(kmd_token, kmd_address)
+        self.transport = PooledTransport(kmd_address, max_connections, timeout)
+
+    def kmd_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None) -> Any:
+        """ Executes a request and returns the decoded body """
+        header = dict() if requrl in constants.no_auth else {constants.kmd_auth_header: self.kmd_token}
+        if requrl not in constants.unversioned_paths:
+            requrl = API_VERSION_PATH_PREFIX + requrl
+        if params:
+            requrl = requrl + "?" + urlencode(params)
+        body = json.dumps(data, indent=2).encode("utf-8") if data else b""
+
+        code, _, payload = self.transport.request(method, requrl, header, body)
+        if code >= 400:
+            message = payload.decode("utf-8")
+            try:
+                message = json.loads(message)["message"]
+            except Exception:
+                pass
+            raise error.KMDHTTPError(message)
+        return json.loads(payload.decode("utf-8"))
+
+    def close(self) -> None:
+        """ Closes the idle connections """
+        self.transport.close()
@@ -0,0 +1,268 @@
+""" Module that records every algod and kmd request a client makes """
+
+import json
+import sys
+from base64 import b64decode
+from bisect import bisect_left
+from functools import wraps
+from inspect import iscoroutinefunction
+from threading import Lock
+from time import perf_counter, time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from algosdk import encoding
+from algosdk.kmd import KMDClient
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_PooledTransport import PooledAlgodClient
+
+RPC_METHODS = frozenset(
+    name
+    for client_class in (AlgodClient, KMDClient, PooledAlgodClient)
+    for name in dir(client_class)
+    if not name.startswith("_") and name not in ("algod_request", "algod_requests", "kmd_request", "close")
+)
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+CALLER_CLASSES = ("Auction", "AsyncAuction", "AuctionHouse", "UserAccount", "UserAccounts")
+# methods sending one request per item of their first argument, pipelined on one connection
+PIPELINED_METHODS = frozenset(("account_infos", "pending_transaction_infos"))
+
+
+class RPCRecord(NamedTuple):
+    """ One call made through an instrumented client, of requests HTTP requests """
+    client: str
+    method: str
+    caller: str
+    started: float
+    latency_ms: float
+    request_bytes: int
+    response_bytes: int
+    error: Optional[str]
+    requests: int = 1
+
+
+def payload_size(value: Any) -> int:
+    """ Encoded size of a request argument or response """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    if hasattr(value, "dictify"):
+        return len(b64decode(encoding.msgpack_encode(value)))
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def request_count(method: str, args: tuple, kwargs: dict) -> int:
+    """ Number of requests a call sends, one per item for the pipelined methods """
+    if method not in PIPELINED_METHODS:
+        return 1
+    items = args[0] if args else next(iter(kwargs.values()), ())
+    return len(items)
+
+
+def find_caller(depth: int = 2) -> str:
+    """ Auction/UserAccount method that caused the request
+
+        Falls back to the nearest method of any class in source, e.g. a
+        ConfirmationWaiter polling on its own thread.
+    """
+    frame = sys._getframe(depth)
+    fallback = None
+    while frame is not None:
+        owner = frame.f_locals.get("self")
+        if owner is not None and type(owner).__module__.startswith("source."):
+            name = f"{type(owner).__name__}.{frame.f_code.co_name}"
+            if type(owner).__name__ in CALLER_CLASSES:
+                return name
+            if fallback is None and not isinstance(owner, InstrumentedClient):
+                fallback = name
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class MemorySink:
+    """ Keeps records in memory and summarises them """
+
+    def __init__(self) -> None:
+        self.records: List[RPCRecord] = []
+        self.lock = Lock()
+
+    def write(self, record: RPCRecord) -> None:
+        """ Stores a record """
+        with self.lock:
+            self.records.append(record)
+
+    def clear(self) -> List[RPCRecord]:
+        """ Returns the records so far and starts again """
+        with self.lock:
+            records, self.records = self.records, []
+        return records
+
+    def count(self) -> int:
+        """ Number of requests recorded, each pipelined one included """
+        with self.lock:
+            return sum(record.requests for record in self.records)
+
+    def summary(self, key: str = "method") -> Dict[str, Dict[str, Any]]:
+        """ Requests, calls, latency histogram and bytes grouped by method, caller or client
+
+            count is the number of requests, calls the number of method
+            calls: a pipelined call is one call of many requests, its
+            latency is that of the whole pipeline.
+        """
+        with self.lock:
+            records = list(self.records)
+
+        summary: Dict[str, Dict[str, Any]] = dict()
+        for record in records:
+            entry = summary.setdefault(getattr(record, key), {
+                "count": 0,
+                "calls": 0,
+                "errors": 0,
+                "latency_ms": 0.0,
+                "histogram": [0] * len(LATENCY_BUCKETS_MS),
+                "request_bytes": 0,
+                "response_bytes": 0,
+            })
+            entry["count"] += record.requests
+            entry["calls"] += 1
+            entry["errors"] += record.error is not None
+            entry["latency_ms"] += record.latency_ms
+            entry["histogram"][bisect_left(LATENCY_BUCKETS_MS, record.latency_ms)] += 1
+            entry["request_bytes"] += record.request_bytes
+            entry["response_bytes"] += record.response_bytes
+        return summary
+
+
+class JSONLinesSink:
+    """ Appends one JSON object per request to a file """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = Lock()
+
+    def write(self, record: RPCRecord) -> None:
+        """ Appends a record """
+        line = json.dumps(record._asdict()) + "\n"
+        with self.lock, open(self.path, "a") as log_file:
+            log_file.write(line)
+
+
+class RPCScope(MemorySink):
+    """ A MemorySink attached to a client for the length of a with block """
+
+    def __init__(self, client: "InstrumentedClient") -> None:
+        super().__init__()
+        self.client = client
+
+    def __enter__(self) -> "RPCScope":
+        self.client.add_sink(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.client.remove_sink(self)
+
+
+class InstrumentedClient:
+    """ Wraps an algod or kmd client and records every request
+
+        Any client with the AlgodClient or KMDClient method names can be
+        wrapped, including the async and simulated clients. Other
+        attributes are passed through unrecorded.
+    """
+
+    def __init__(self, client: Any, *sinks: Any, name: Optional[str] = None) -> None:
+        self.wrapped = client
+        self.name = name or type(client).__name__
+        self.sinks: List[Any] = list(sinks)
+        self.methods: Dict[str, Any] = dict()
+
+    def add_sink(self, sink: Any) -> None:
+        """ Starts sending records to sink """
+        self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink: Any) -> None:
+        """ Stops sending records to sink """
+        self.sinks = [s for s in self.sinks if s is not sink]
+
+    def scope(self) -> RPCScope:
+        """ Records the requests made inside a with block
+
+            Requests from every thread using this client are included,
+            e.g. the confirmation polling of a bid.
+        """
+        return RPCScope(self)
+
+    def _record(self, method: str, caller: str, started: float, elapsed: float,
+                args: tuple, kwargs: dict, response: Any, exception: Optional[BaseException]) -> None:
+        """ Sends a record to every sink """
+        record = RPCRecord(
+            client=self.name,
+            method=method,
+            caller=caller,
+            started=started,
+            latency_ms=elapsed * 1000,
+            request_bytes=payload_size(list(args) + list(kwargs.values())),
+            response_bytes=payload_size(response),
+            error=None if exception is None else f"{type(exception).__name__}: {exception}",
+            requests=request_count(method, args, kwargs),
+        )
+        for sink in self.sinks:
+            sink.write(record)
+
+    def _instrument(self, name: str, method: Any) -> Any:
+        """ Returns method wrapped with timing and recording """
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def call_async(*args, **kwargs):
+                caller, started, start = find_caller(), time(), perf_counter()
+                response, exception = None, None
+                try:
+                    response = await method(*args, **kwargs)
+                    return response
+                except BaseException as raised:
+                    exception = raised
+                    raise
+                finally:
+                    self._record(name, caller, started, perf_counter() - start, args, kwargs, response, exception)
+            return call_async
+
+        @wraps(method)
+        def call(*args, **kwargs):
+            caller, started, start = find_caller(), time(), perf_counter()
+            response, exception = None, None
+            try:
+                response = method(*args, **kwargs)
+                return response
+            except BaseException as raised:
+                exception = raised
+                raise
+            finally:
+                self._record(name, caller, started, perf_counter() - start, args, kwargs, response, exception)
+        return call
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.wrapped, name)
+        if name not in RPC_METHODS or not callable(attribute):
+            return attribute
+        method = self.methods.get(name)
+        if method is None:
+            method = self.methods[name] = self._instrument(name, attribute)
+        return method
+
+
+def instrument(client: Any, *sinks: Any, name: Optional[str] = None) -> InstrumentedClient:
+    """ Wraps client so every request is sent to sinks """
+    if isinstance(client, InstrumentedClient):
+        for sink in sinks:
+            client.add_sink(sink)
+        return client
+    return InstrumentedClient(client, *sinks, name=name)
@@ -0,0 +1,320 @@
+""" Module that plays auction scenarios described in JSON or TOML files """
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from time import perf_counter, sleep, time
+from typing import Any, Callable, Dict, List, Optional
+
+from algosdk import account
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_Auction import Auction
+from source.classes.class_ContractCompiler import DEFAULT_CONTRACT
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.classes.class_UserAccount import UserAccount
+from source.classes.class_UserAccounts import UserAccounts
+from source.utils.utils_balances import get_balance_snapshot
+from source.utils.utils_console import quiet
+
+ACTIONS = ("create", "fund", "opt_in", "bid", "wait", "close", "check")
+# microalgos every actor of a simulated scenario starts with
+DEFAULT_FUNDING = 100_000_000
+DEFAULT_AUCTION = {
+    "artist": "artist",
+    "auctioneer": "auctioneer",
+    "starts_in": 10,
+    "duration": 120,
+    "reserve": 1_000_000,
+    "min_bid_increment": 100_000,
+    "contract": DEFAULT_CONTRACT,
+}
+# longest a wait on a live network may take beyond the time it waits for
+WAIT_GRACE_SECONDS = 60
+# name of the auction's escrow in check and balance steps
+ESCROW = "escrow"
+
+# called with the scenario and each step result as soon as the step is done
+StepListener = Callable[[Dict[str, Any], Dict[str, Any]], None]
+
+
+def scenario_problems(scenario: Dict[str, Any]) -> List[str]:
+    """ Everything that would stop a scenario from running, empty when it is well formed """
+    problems = []
+    actors = scenario.get("actors", [])
+    auction = {**DEFAULT_AUCTION, **scenario.get("auction", {})}
+    for role in ("artist", "auctioneer"):
+        if auction[role] not in actors:
+            problems.append(f"auction {role} {auction[role]!r} is not an actor")
+    for number, step in enumerate(scenario.get("steps", [])):
+        if step.get("action") not in ACTIONS:
+            problems.append(f"step {number}: unknown action {step.get('action')!r}, expected one of {', '.join(ACTIONS)}")
+        elif step["action"] in ("opt_in", "bid", "close") and step.get("actor") not in actors:
+            problems.append(f"step {number}: {step['action']} needs an actor, got {step.get('actor')!r}")
+        elif step["action"] == "bid" and not isinstance(step.get("amount"), int):
+            problems.append(f"step {number}: bid needs an integer amount")
+        elif step["action"] == "wait" and step.get("until") not in ("start", "end") and not isinstance(step.get("seconds"), int):
+            problems.append(f"step {number}: wait needs until start or end, or seconds")
+    return problems
+
+
+def load_scenarios(path: str) -> List[Dict[str, Any]]:
+    """ Scenarios of a JSON or TOML file, holding one scenario or a list of them under scenarios
+
+        Raises ValueError naming every malformed step.
+    """
+    if path.endswith(".toml"):
+        import toml
+        # plain dicts, the inline tables of toml cannot be sent to worker processes
+        spec = json.loads(json.dumps(toml.load(path)))
+    else:
+        with open(path) as scenario_file:
+            spec = json.load(scenario_file)
+
+    scenarios = spec["scenarios"] if "scenarios" in spec else [spec]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    problems = []
+    for number, scenario in enumerate(scenarios):
+        scenario.setdefault("name", stem if len(scenarios) == 1 else f"{stem}[{number}]")
+        problems.extend(f"{scenario['name']}: {problem}" for problem in scenario_problems(scenario))
+    if problems:
+        raise ValueError("; ".join(problems))
+    return scenarios
+
+
+class ScenarioRun:
+    """ One play of a scenario: its actors, its auction and the result of each step """
+
+    def __init__(self, scenario: Dict[str, Any], client: Any, users: Optional[UserAccounts]) -> None:
+        """ Constructor for the run, actors are funded by start """
+        self.scenario = scenario
+        self.client = client
+        self.users = users
+        self.settings = {**DEFAULT_AUCTION, **scenario.get("auction", {})}
+        self.actors: Dict[str, UserAccount] = dict()
+        self.auction: Optional[Auction] = None
+
+    def start(self) -> None:
+        """ Creates the actors, out of thin air on the simulator and from the account pool otherwise """
+        actors = self.scenario["actors"]
+        for name in actors:
+            if self.users is not None:
+                self.actors[name] = self.users.initialize_user_account(self.client)
+                continue
+            funding = actors[name].get("funding", DEFAULT_FUNDING) if isinstance(actors, dict) else DEFAULT_FUNDING
+            private_key, address = account.generate_account()
+            self.client.fund_account(address, funding)
+            self.actors[name] = UserAccount(private_key)
+
+    def now(self) -> int:
+        """ Timestamp of the ledger, that of the latest block on a live network """
+        if hasattr(self.client, "advance_time"):
+            return self.client.now()
+        last_round = self.client.status()["last-round"]
+        return self.client.block_info(last_round)["block"]["ts"]
+
+    def step(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        """ Plays a step, its result says whether it went as expected """
+        started = perf_counter()
+        result: Dict[str, Any] = {"action": step["action"], "actor": step.get("actor"), "expect": step.get("expect", True)}
+        try:
+            result["ok"], result["detail"] = getattr(self, f"_{step['action']}")(step)
+        except Exception as exception:
+            result["ok"], result["detail"] = False, f"{type(exception).__name__}: {exception}"
+        if step.get("balances"):
+            result["balances"] = self.balances()
+        result["passed"] = result["ok"] == result["expect"]
+        result["ms"] = (perf_counter() - started) * 1000
+        if "say" in step:
+            result["say"] = step["say"]
+        return result
+
+    def balances(self) -> Dict[str, Dict[str, int]]:
+        """ Algos and NFT of every actor and of the escrow, fetched together """
+        app_ids = [self.auction.app_id] if self.auction is not None and self.auction.app_id is not None else []
+        snapshot = get_balance_snapshot(self.client, [actor.get_address() for actor in self.actors.values()], app_ids)
+        # no NFT is held before the auction is created
+        nft_id = self.auction.nft_id if self.auction is not None else -1
+        balances = {
+            name: {"algos": snapshot.balance(actor.get_address()), "nft": snapshot.balance(actor.get_address(), nft_id)}
+            for name, actor in self.actors.items()
+        }
+        if app_ids:
+            balances[ESCROW] = {"algos": snapshot.app_balance(app_ids[0]), "nft": snapshot.app_balance(app_ids[0], nft_id)}
+        return balances
+
+    def _create(self, step: Dict[str, Any]) -> Any:
+        """ The artist mints the NFT and the auctioneer creates, and unless fund is false funds, the auction """
+        artist = self.actors[self.settings["artist"]]
+        start_time = self.now() + self.settings["starts_in"]
+        self.auction = Auction(
+            self.client,
+            artist,
+            self.actors[self.settings["auctioneer"]],
+            artist.create_asset(self.client),
+            start_time=start_time,
+            end_time=start_time + self.settings["duration"],
+            reserve=self.settings["reserve"],
+            min_bid_increment=self.settings["min_bid_increment"],
+            contract=self.settings["contract"],
+        )
+        self.auction.app_id = self.auction.create_application()
+        if step.get("fund", True):
+            self.auction.fund(self.auction.app_id)
+        return True, f"auction {self.auction.app_id} for NFT {self.auction.nft_id}"
+
+    def _fund(self, step: Dict[str, Any]) -> Any:
+        """ Funds an auction created with fund false """
+        self.auction.fund(self.auction.app_id)
+        return True, ""
+
+    def _opt_in(self, step: Dict[str, Any]) -> Any:
+        """ The actor opts in to the NFT """
+        self.auction.opt_in(self.actors[step["actor"]])
+        return True, ""
+
+    def _bid(self, step: Dict[str, Any]) -> Any:
+        """ The actor bids amount, opting in to the NFT in the same group with opt_in """
+        placed = self.auction.place_bid(self.actors[step["actor"]], step["amount"], with_opt_in=step.get("opt_in", False))
+        if placed:
+            return True, f"bid {step['amount']}"
+        validator = self.auction.bid_validator
+        reason = validator.check(step["amount"]) if validator.state is not None else None
+        return False, validator.message(reason) if reason is not None else "rejected"
+
+    def _close(self, step: Dict[str, Any]) -> Any:
+        """ The actor closes the auction """
+        return bool(self.auction.close(self.actors[step["actor"]])), ""
+
+    def _wait(self, step: Dict[str, Any]) -> Any:
+        """ Lets the ledger reach the start or end of the auction, or move on seconds """
+        if "until" in step:
+            target = self.auction.start_time if step["until"] == "start" else self.auction.end_time
+        else:
+            target = self.now() + step["seconds"]
+        if hasattr(self.client, "advance_time"):
+            self.client.advance_time(max(0, target - self.client.now()))
+            return True, ""
+
+        deadline = time() + max(0, target - self.now()) + WAIT_GRACE_SECONDS
+        while self.now() < target:
+            if time() > deadline:
+                return False, f"no block reached {target}"
+            sleep(1)
+        return True, ""
+
+    def _check(self, step: Dict[str, Any]) -> Any:
+        """ Compares the ledger with nft, algos_min, highest_bidder, highest_bid and closed """
+        failures = []
+        if "nft" in step or "algos_min" in step:
+            balances = self.balances()
+            for name, amount in step.get("nft", {}).items():
+                if balances[name]["nft"] != amount:
+                    failures.append(f"{name} holds {balances[name]['nft']} NFT, expected {amount}")
+            for name, amount in step.get("algos_min", {}).items():
+                if balances[name]["algos"] < amount:
+                    failures.append(f"{name} holds {balances[name]['algos']} microalgos, expected at least {amount}")
+
+        if "closed" in step or "highest_bidder" in step or "highest_bid" in step:
+            try:
+                state = self.auction.refresh_state().state
+            except Exception as exception:
+                if "does not exist" not in str(exception):
+                    raise
+                state = None
+            if "closed" in step and (state is None) != step["closed"]:
+                failures.append("auction is open" if step["closed"] else "auction is closed")
+            if state is not None and "highest_bidder" in step:
+                expected = step["highest_bidder"]
+                if state.bid_account != (self.actors[expected].get_address() if expected is not None else None):
+                    bidder = next((name for name, actor in self.actors.items() if actor.get_address() == state.bid_account), state.bid_account)
+                    failures.append(f"highest bidder is {bidder}, expected {expected}")
+            if state is not None and "highest_bid" in step and state.bid_amount != step["highest_bid"]:
+                failures.append(f"highest bid is {state.bid_amount}, expected {step['highest_bid']}")
+        return not failures, "; ".join(failures)
+
+
+def _run_in_process(scenarios: List[Dict[str, Any]], concurrency: int, quiet: bool) -> List[Dict[str, Any]]:
+    """ Runs scenarios on the simulator in a worker process """
+    return ScenarioRunner(concurrency=concurrency, quiet=quiet).run_all(scenarios)
+
+
+class ScenarioRunner:
+    """ Plays scenarios against the auction classes and returns their results, printing nothing
+
+        Without a client every scenario gets a SimulatedAlgodClient of its
+        own, so scenarios cannot see each other's accounts or clock. With
+        one, e.g. the sandbox, they share it and take their actors from a
+        UserAccounts pool. concurrency scenarios run at once on threads,
+        and simulated runs can also be spread over processes. Rendering is
+        left to listener, called after every step, and to the caller of
+        run_all; with quiet the messages the auction classes print while a
+        scenario plays are dropped, other threads keep printing.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AlgodClient] = None,
+        kmd_client: Any = None,
+        concurrency: int = 8,
+        processes: int = 1,
+        quiet: bool = True,
+        listener: Optional[StepListener] = None) -> None:
+        """ Constructor for the runner """
+        self.client = client
+        self.users = UserAccounts(kmd_client) if client is not None else None
+        self.concurrency = concurrency
+        self.processes = processes
+        self.quiet = quiet
+        self.listener = listener
+
+    def run(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """ Plays one scenario, steps after the first failing one are skipped """
+        with quiet() if self.quiet else nullcontext():
+            return self._run(scenario)
+
+    def _run(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """ Plays one scenario, with the output of the auction classes already muted or not """
+        started = perf_counter()
+        run = ScenarioRun(scenario, self.client if self.client is not None else SimulatedAlgodClient(), self.users)
+        result: Dict[str, Any] = {"name": scenario["name"], "steps": [], "planned": len(scenario.get("steps", [])), "error": None}
+        try:
+            run.start()
+        except Exception as exception:
+            result["error"] = f"actors: {type(exception).__name__}: {exception}"
+
+        for number, step in enumerate(scenario.get("steps", [])):
+            if result["error"] is not None:
+                break
+            step_result = run.step(step)
+            step_result["step"] = number
+            result["steps"].append(step_result)
+            if self.listener is not None:
+                self.listener(scenario, step_result)
+            if not step_result["passed"]:
+                result["error"] = f"step {number} ({step['action']}): {step_result['detail'] or 'not as expected'}"
+
+        result["app_id"] = run.auction.app_id if run.auction is not None else None
+        result["passed"] = result["error"] is None
+        result["seconds"] = perf_counter() - started
+        return result
+
+    def run_all(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ Plays scenarios concurrently, results keep the input order """
+        if self.processes > 1 and self.client is None and len(scenarios) > 1:
+            return self._run_in_processes(scenarios)
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            return list(executor.map(self.run, scenarios))
+
+    def _run_in_processes(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ Splits simulated scenarios over worker processes, listener hears each one once it is done """
+        size = -(-len(scenarios) // self.processes)
+        chunks = [scenarios[start:start + size] for start in range(0, len(scenarios), size)]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            results = [result for chunk in executor.map(_run_in_process, chunks, [self.concurrency] * len(chunks), [self.quiet] * len(chunks)) for result in chunk]
+        if self.listener is not None:
+            for scenario, result in zip(scenarios, results):
+                for step_result in result["steps"]:
+                    self.listener(scenario, step_result)
+        return results
@@ -0,0 +1,732 @@
+""" Module with an in-process ledger that stands in for AlgodClient """
+
+import copy
+from base64 import b64decode, b64encode
+from threading import RLock
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from algosdk import constants, encoding, error
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+MIN_TXN_FEE = 1000
+MIN_BALANCE = 100_000
+ASSET_MIN_BALANCE = 100_000
+APP_MIN_BALANCE = 100_000
+SCHEMA_UINT_MIN_BALANCE = 28_500
+SCHEMA_BYTES_MIN_BALANCE = 50_000
+MAX_GROUP_SIZE = 16
+MAX_VALIDITY_WINDOW = 1000
+
+GENESIS_ID = "simnet-v1"
+GENESIS_HASH = b64encode(encoding.checksum(GENESIS_ID.encode())).decode()
+CONSENSUS_VERSION = "simulated"
+ZERO_ADDRESS = encoding.encode_address(bytes(32))
+
+# dictify() keys that hold addresses; everything else in bytes is base64 encoded
+ADDRESS_KEYS = {"snd", "rcv", "close", "arcv", "aclose", "asnd", "rekey", "fadd", "m", "r", "f", "c"}
+
+
+class LogicReject(Exception):
+    """ Raised when a transaction is rejected while it is being evaluated """
+
+
+def has_valid_signature(signed: Any, signer: str) -> bool:
+    """ True when signed is a SignedTransaction carrying signer's ed25519 signature of its transaction """
+    if not isinstance(signed, transaction.SignedTransaction) or not signed.signature:
+        return False
+    message = constants.txid_prefix + b64decode(encoding.msgpack_encode(signed.transaction))
+    try:
+        VerifyKey(encoding.decode_address(signer)).verify(message, b64decode(signed.signature))
+    except (BadSignatureError, ValueError):
+        return False
+    return True
+
+
+def expected_group_id(group: List[transaction.Transaction]) -> bytes:
+    """ Group id of transactions, computed over them without their group field as algod does """
+    ungrouped = []
+    for txn in group:
+        txn = copy.copy(txn)
+        txn.group = None
+        ungrouped.append(txn)
+    return transaction.calculate_group_id(ungrouped)
+
+
+def to_json(value: Any, key: str = "") -> Any:
+    """ Converts a msgpack style dictionary into the JSON shape algod returns """
+    if isinstance(value, dict):
+        return {k: to_json(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_json(v, key) for v in value]
+    if isinstance(value, bytes):
+        if key in ADDRESS_KEYS or key == "apat":
+            return encoding.encode_address(value)
+        return b64encode(value).decode()
+    return value
+
+
+def encode_state(state: Dict[bytes, Any]) -> List[Dict[str, Any]]:
+    """ Encodes a global state dictionary the way application_info does """
+    encoded: List[Dict[str, Any]] = []
+    for key, value in state.items():
+        if isinstance(value, int):
+            encoded_value = {"type": 2, "uint": value, "bytes": ""}
+        else:
+            encoded_value = {"type": 1, "uint": 0, "bytes": b64encode(value).decode()}
+        encoded.append({"key": b64encode(key).decode(), "value": encoded_value})
+    return encoded
+
+
+def state_delta(before: Dict[bytes, Any], after: Dict[bytes, Any]) -> List[Dict[str, Any]]:
+    """ Computes the global-state-delta of a transaction """
+    delta: List[Dict[str, Any]] = []
+    for key, value in after.items():
+        if before.get(key) == value and key in before:
+            continue
+        if isinstance(value, int):
+            entry = {"action": 2, "uint": value}
+        else:
+            entry = {"action": 1, "bytes": b64encode(value).decode()}
+        delta.append({"key": b64encode(key).decode(), "value": entry})
+    for key in before:
+        if key not in after:
+            delta.append({"key": b64encode(key).decode(), "value": {"action": 3}})
+    return delta
+
+
+def json_string(raw: bytes) -> str:
+    """ raw the way algod's JSON encoder writes a string, each byte that is not valid UTF-8 replaced """
+    decoded, start = [], 0
+    while True:
+        try:
+            decoded.append(raw[start:].decode())
+            return "".join(decoded)
+        except UnicodeDecodeError as exception:
+            decoded.append(raw[start:start + exception.start].decode())
+            decoded.append("\ufffd")
+            start += exception.start + 1
+
+
+def block_delta(delta: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """ Converts a global-state-delta to the mapping a JSON block holds, keyed and valued by raw strings """
+    converted: Dict[str, Dict[str, Any]] = {}
+    for entry in delta:
+        value = entry["value"]
+        block_value: Dict[str, Any] = {"at": value["action"]}
+        # empty values are left out, as algod does
+        if value.get("bytes"):
+            block_value["bs"] = json_string(b64decode(value["bytes"]))
+        if value.get("uint"):
+            block_value["ui"] = value["uint"]
+        converted[json_string(b64decode(entry["key"]))] = block_value
+    return converted
+
+
+class GroupContext:
+    """ Copy-on-write view of the ledger used to evaluate one atomic group """
+
+    def __init__(self, ledger: "SimulatedAlgodClient", timestamp: int) -> None:
+        self.ledger = ledger
+        self.timestamp = timestamp
+        self.round = ledger.last_round + 1
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.closed: Set[str] = set()
+        self.apps: Dict[int, Dict[str, Any]] = {}
+        self.deleted_apps: Set[int] = set()
+        self.assets: Dict[int, Dict[str, Any]] = {}
+        self.next_index = ledger.next_index
+        self.inner_txns: List[Dict[str, Any]] = []
+        # opcode budget the group's application calls still share, set by the first one run
+        self.budget_left: Optional[int] = None
+
+    def account(self, address: str) -> Dict[str, Any]:
+        """ Returns a writable copy of an account """
+        acct = self.accounts.get(address)
+        if acct is None:
+            base = self.ledger.accounts.get(address)
+            if base is None:
+                acct = {"amount": 0, "assets": {}, "extra_mbr": 0}
+            else:
+                acct = {"amount": base["amount"], "assets": dict(base["assets"]), "extra_mbr": base["extra_mbr"]}
+            self.accounts[address] = acct
+            self.closed.discard(address)
+        return acct
+
+    def app(self, app_id: int) -> Dict[str, Any]:
+        """ Returns a writable copy of an application """
+        app = self.apps.get(app_id)
+        if app is None:
+            base = self.ledger.apps.get(app_id)
+            if base is None or app_id in self.deleted_apps:
+                raise LogicReject("application does not exist")
+            app = dict(base)
+            app["global"] = dict(base["global"])
+            self.apps[app_id] = app
+        elif app_id in self.deleted_apps:
+            raise LogicReject("application does not exist")
+        return app
+
+    def asset(self, asset_id: int) -> Dict[str, Any]:
+        """ Returns the parameters of an asset """
+        params = self.assets.get(asset_id) or self.ledger.assets.get(asset_id)
+        if params is None:
+            raise LogicReject(f"asset {asset_id} does not exist")
+        return params
+
+    def new_index(self) -> int:
+        """ Allocates an id for a new asset or application """
+        index = self.next_index
+        self.next_index += 1
+        return index
+
+    def pay(self, sender: str, receiver: Optional[str], amount: int, close_to: Optional[str] = None) -> int:
+        """ Moves algos; returns the closing amount """
+        source = self.account(sender)
+        if amount:
+            if source["amount"] < amount:
+                raise LogicReject(f"overspend (account {sender}, balance {source['amount']}, amount {amount})")
+            source["amount"] -= amount
+            self.account(receiver)["amount"] += amount
+        closing_amount = 0
+        if close_to:
+            if source["assets"]:
+                raise LogicReject(f"cannot close account {sender} with active assets")
+            closing_amount = source["amount"]
+            self.account(close_to)["amount"] += closing_amount
+            source["amount"] = 0
+            self.closed.add(sender)
+        return closing_amount
+
+    def asset_transfer(
+        self,
+        sender: str,
+        receiver: Optional[str],
+        asset_id: int,
+        amount: int,
+        close_to: Optional[str] = None) -> None:
+        """ Moves units of an asset, handles opt ins and close outs """
+        self.asset(asset_id)
+        source = self.account(sender)
+
+        if receiver == sender and amount == 0 and not close_to:
+            source["assets"].setdefault(asset_id, 0)
+            return
+        if asset_id not in source["assets"]:
+            raise LogicReject(f"asset {asset_id} missing from {sender}")
+
+        if amount:
+            target = self.account(receiver)
+            if asset_id not in target["assets"]:
+                raise LogicReject(f"asset {asset_id} missing from {receiver}")
+            if source["assets"][asset_id] < amount:
+                raise LogicReject(f"underflow on subtracting {amount} from sender amount {source['assets'][asset_id]}")
+            source["assets"][asset_id] -= amount
+            target["assets"][asset_id] += amount
+
+        if close_to:
+            target = self.account(close_to)
+            if asset_id not in target["assets"]:
+                raise LogicReject(f"asset {asset_id} missing from {close_to}")
+            target["assets"][asset_id] += source["assets"].pop(asset_id)
+
+    def charge_fee(self, sender: str, fee: int) -> None:
+        """ Takes the transaction fee from the sender """
+        if fee < MIN_TXN_FEE:
+            raise LogicReject(f"transaction had fee {fee}, which is less than the minimum {MIN_TXN_FEE}")
+        source = self.account(sender)
+        if source["amount"] < fee:
+            raise LogicReject(f"overspend (account {sender}, balance {source['amount']}, fee {fee})")
+        source["amount"] -= fee
+
+    def check_min_balances(self) -> None:
+        """ Ensures every touched account still holds its minimum balance """
+        for address, acct in self.accounts.items():
+            if address in self.closed:
+                continue
+            required = min_balance(acct)
+            if acct["amount"] < required:
+                raise LogicReject(f"account {address} balance {acct['amount']} below min {required}")
+
+    def inner_pay(self, app_address: str, receiver: Optional[str], amount: int, close_to: Optional[str] = None) -> None:
+        """ Executes an inner payment issued by an application """
+        self.charge_fee(app_address, MIN_TXN_FEE)
+        self.pay(app_address, receiver, amount, close_to)
+        fields: Dict[str, Any] = {"type": "pay", "snd": app_address, "fee": MIN_TXN_FEE}
+        if amount:
+            fields["amt"] = amount
+            fields["rcv"] = receiver
+        if close_to:
+            fields["close"] = close_to
+        self.inner_txns.append({"txn": {"txn": fields}})
+
+    def inner_asset_transfer(
+        self,
+        app_address: str,
+        asset_id: int,
+        receiver: Optional[str] = None,
+        amount: int = 0,
+        close_to: Optional[str] = None) -> None:
+        """ Executes an inner asset transfer issued by an application """
+        self.charge_fee(app_address, MIN_TXN_FEE)
+        self.asset_transfer(app_address, receiver, asset_id, amount, close_to)
+        fields: Dict[str, Any] = {"type": "axfer", "snd": app_address, "xaid": asset_id, "fee": MIN_TXN_FEE}
+        if receiver:
+            fields["arcv"] = receiver
+        if amount:
+            fields["aamt"] = amount
+        if close_to:
+            fields["aclose"] = close_to
+        self.inner_txns.append({"txn": {"txn": fields}})
+
+    def commit(self) -> None:
+        """ Writes the group's changes back to the ledger """
+        ledger = self.ledger
+        for address, acct in self.accounts.items():
+            if address in self.closed:
+                ledger.accounts.pop(address, None)
+            else:
+                ledger.accounts[address] = acct
+        for app_id, app in self.apps.items():
+            ledger.apps[app_id] = app
+        for app_id in self.deleted_apps:
+            ledger.apps.pop(app_id, None)
+        ledger.assets.update(self.assets)
+        ledger.next_index = self.next_index
+
+
+def min_balance(acct: Dict[str, Any]) -> int:
+    """ Minimum balance of an account in microalgos """
+    return MIN_BALANCE + ASSET_MIN_BALANCE * len(acct["assets"]) + acct["extra_mbr"]
+
+
+class SimulatedAlgodClient:
+    """ In-memory ledger that answers the AlgodClient calls this project makes
+
+        Submitted groups are evaluated straight away against the ledger, the
+        same way algod checks them before they enter the transaction pool, and
+        are confirmed in the next block. Blocks are produced on demand by
+        status_after_block, so waiting for a confirmation never sleeps.
+        Application calls execute the approval program's TEAL with
+        TealEvaluator. Programs this client did not compile fall back to a
+        native model of contracts.approval_program, as does everything
+        when execute_teal is False.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time, execute_teal: bool = True) -> None:
+        """ Constructor for the simulated client """
+        self.clock = clock
+        self.execute_teal = execute_teal
+        self.time_offset = 0
+        self.last_round = 1
+        self.next_index = 1
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.apps: Dict[int, Dict[str, Any]] = {}
+        self.assets: Dict[int, Dict[str, Any]] = {}
+        self.evaluators: Dict[bytes, Any] = {}
+        # opcode cost of every committed application call run as TEAL, by transaction id
+        self.app_call_costs: Dict[str, int] = {}
+        self.blocks: Dict[int, Dict[str, Any]] = {1: {"rnd": 1, "ts": self.now(), "txns": []}}
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+        self.pending: List[str] = []
+        self.app_addresses: Dict[int, str] = {}
+        self.lock = RLock()
+
+    # ledger controls
+
+    def now(self) -> int:
+        """ Returns the ledger's current timestamp """
+        return int(self.clock()) + self.time_offset
+
+    def advance_time(self, seconds: int) -> None:
+        """ Moves the ledger clock forward without sleeping
+
+            A block is produced at the new time, as a live network would
+            have done in the meantime.
+        """
+        with self.lock:
+            self.time_offset += seconds
+            self.produce_block()
+
+    def fund_account(self, address: str, amount: int) -> None:
+        """ Credits an account out of thin air, used to seed genesis accounts """
+        acct = self.accounts.setdefault(address, {"amount": 0, "assets": {}, "extra_mbr": 0})
+        acct["amount"] += amount
+
+    def application_address(self, app_id: int) -> str:
+        """ Returns the cached escrow address of an application """
+        address = self.app_addresses.get(app_id)
+        if address is None:
+            address = self.app_addresses[app_id] = get_application_address(app_id)
+        return address
+
+    def produce_block(self) -> int:
+        """ Confirms every pending transaction in a new block """
+        with self.lock:
+            self.last_round += 1
+            txns = []
+            for txid in self.pending:
+                info = self.transactions[txid]
+                info["confirmed-round"] = self.last_round
+                txns.append(txid)
+            self.pending = []
+            self.blocks[self.last_round] = {"rnd": self.last_round, "ts": self.now(), "txns": txns}
+            return self.last_round
+
+    # AlgodClient interface
+
+    def suggested_params(self, **kwargs) -> transaction.SuggestedParams:
+        """ Returns suggested parameters for the next round """
+        return transaction.SuggestedParams(
+            0,
+            self.last_round,
+            self.last_round + MAX_VALIDITY_WINDOW,
+            GENESIS_HASH,
+            GENESIS_ID,
+            False,
+            CONSENSUS_VERSION,
+            MIN_TXN_FEE,
+        )
+
+    def status(self, **kwargs) -> Dict[str, Any]:
+        """ Returns the node status """
+        return {
+            "last-round": self.last_round,
+            "last-version": CONSENSUS_VERSION,
+            "time-since-last-round": 0,
+            "catchup-time": 0,
+        }
+
+    def status_after_block(self, block_num: Optional[int] = None, round_num: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """ Produces blocks until the requested round has passed """
+        target = block_num if block_num is not None else round_num
+        if target is None:
+            raise error.UnderspecifiedRoundError
+        with self.lock:
+            while self.last_round <= target:
+                self.produce_block()
+            return self.status()
+
+    def block_info(self, block: Optional[int] = None, response_format: str = "json", round_num: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """ Returns a block with its transactions """
+        rnd = block if block is not None else round_num
+        if rnd is None:
+            raise error.UnderspecifiedRoundError
+        stored = self.blocks.get(rnd)
+        if stored is None:
+            raise error.AlgodHTTPError(f"failed to retrieve information from the ledger: round {rnd} not found", 404)
+        txns = []
+        for txid in stored["txns"]:
+            info = self.transactions[txid]
+            entry = {"txn": to_json(info["signed"].transaction.dictify()), "hgi": True}
+            if "application-index" in info:
+                entry["apid"] = info["application-index"]
+            if "asset-index" in info:
+                entry["caid"] = info["asset-index"]
+            if info.get("global-state-delta"):
+                entry["dt"] = {"gd": block_delta(info["global-state-delta"]), "itx": info.get("inner-txns", [])}
+            txns.append(entry)
+        return {"block": {"rnd": rnd, "ts": stored["ts"], "gen": GENESIS_ID, "gh": GENESIS_HASH, "txns": txns}}
+
+    def account_info(self, address: str, **kwargs) -> Dict[str, Any]:
+        """ Returns the balance and asset holdings of an account """
+        acct = self.accounts.get(address)
+        if acct is None:
+            return {"address": address, "amount": 0, "min-balance": 0, "assets": [], "round": self.last_round}
+        return {
+            "address": address,
+            "amount": acct["amount"],
+            "min-balance": min_balance(acct),
+            "assets": [
+                {"asset-id": asset_id, "amount": amount, "is-frozen": False}
+                for asset_id, amount in acct["assets"].items()
+            ],
+            "round": self.last_round,
+        }
+
+    def application_info(self, application_id: int, **kwargs) -> Dict[str, Any]:
+        """ Returns the parameters and global state of an application """
+        app = self.apps.get(application_id)
+        if app is None:
+            raise error.AlgodHTTPError("application does not exist", 404)
+        return {
+            "id": application_id,
+            "params": {
+                "creator": app["creator"],
+                "approval-program": b64encode(app["approval"]).decode(),
+                "clear-state-program": b64encode(app["clear"]).decode(),
+                "global-state": encode_state(app["global"]),
+                "global-state-schema": app["global-schema"],
+                "local-state-schema": app["local-schema"],
+            },
+        }
+
+    def asset_info(self, asset_id: int, **kwargs) -> Dict[str, Any]:
+        """ Returns the parameters of an asset """
+        params = self.assets.get(asset_id)
+        if params is None:
+            raise error.AlgodHTTPError("asset does not exist", 404)
+        return {"index": asset_id, "params": dict(params)}
+
+    def compile(self, source: str, **kwargs) -> Dict[str, str]:
+        """ Stands in for TEAL compilation
+
+            The "bytecode" is the version byte followed by the source, so
+            programs stay executable when they come from the compiled
+            contract cache.
+        """
+        version = 1
+        for line in source.splitlines():
+            if line.startswith("#pragma version"):
+                version = int(line.split()[-1])
+                break
+        program = bytes([version]) + source.encode()
+        return {
+            "hash": encoding.encode_address(encoding.checksum(b"Program" + program)),
+            "result": b64encode(program).decode(),
+        }
+
+    def send_transaction(self, txn: transaction.SignedTransaction, **kwargs) -> str:
+        """ Submits a single signed transaction """
+        return self.send_transactions([txn])
+
+    def send_transactions(self, txns: List[transaction.SignedTransaction], **kwargs) -> str:
+        """ Evaluates a signed group and adds it to the pool """
+        if not txns or len(txns) > MAX_GROUP_SIZE:
+            raise error.AlgodHTTPError(f"group size {len(txns)} is not between 1 and {MAX_GROUP_SIZE}", 400)
+        txids = [signed.get_txid() for signed in txns]
+        group = [signed.transaction for signed in txns]
+        with self.lock:
+            try:
+                self._check_group(txns, txids)
+                context = GroupContext(self, self.now())
+                results = [self._apply(context, group, index) for index in range(len(group))]
+                context.check_min_balances()
+            except LogicReject as exception:
+                raise error.AlgodHTTPError(f"TransactionPool.Remember: transaction {txids[0]}: {exception}", 400) from None
+            context.commit()
+
+            for txid, signed, result in zip(txids, txns, results):
+                if "cost" in result:
+                    self.app_call_costs[txid] = result.pop("cost")
+                result["signed"] = signed
+                self.transactions[txid] = result
+                self.pending.append(txid)
+        return txids[0]
+
+    def pending_transaction_info(self, transaction_id: str, response_format: str = "json", **kwargs) -> Dict[str, Any]:
+        """ Returns the pool status or confirmation of a transaction """
+        info = self.transactions.get(transaction_id)
+        if info is None:
+            raise error.AlgodHTTPError("txn does not exist", 404)
+        response = {key: value for key, value in info.items() if key != "signed"}
+        response["txn"] = to_json(info["signed"].dictify())
+        return response
+
+    # evaluation
+
+    def _check_group(self, txns: List[transaction.SignedTransaction], txids: List[str]) -> None:
+        """ Performs the well-formedness and signature checks algod does before evaluation
+
+            Every transaction must be signed by its sender, the simulator
+            has no rekeying, and a group must be sent whole: the group
+            field of each transaction has to be the id of exactly the
+            transactions submitted.
+        """
+        next_round = self.last_round + 1
+        group = [signed.transaction for signed in txns]
+        group_id = group[0].group
+        if group_id is None and len(group) > 1:
+            raise LogicReject("transactionGroup: incomplete group: transactions are not grouped")
+        if group_id is not None and (
+                any(txn.group != group_id for txn in group) or group_id != expected_group_id(group)):
+            raise LogicReject("transactionGroup: incomplete group")
+        for signed, txn, txid in zip(txns, group, txids):
+            if txid in self.transactions:
+                raise LogicReject("transaction already in ledger")
+            signer = signed.authorizing_address if isinstance(signed, transaction.SignedTransaction) and signed.authorizing_address else txn.sender
+            if signer != txn.sender:
+                raise LogicReject(f"should have been authorized by {txn.sender} but was actually authorized by {signer}")
+            if not has_valid_signature(signed, signer):
+                raise LogicReject("At least one signature didn't pass verification")
+            if txn.genesis_hash != GENESIS_HASH:
+                raise LogicReject("genesis hash mismatch")
+            if txn.first_valid_round > next_round:
+                raise LogicReject(f"txn first valid {txn.first_valid_round} is in the future")
+            if txn.last_valid_round < next_round:
+                raise LogicReject(f"txn dead: round {next_round} outside of {txn.first_valid_round}--{txn.last_valid_round}")
+
+    def _apply(self, context: GroupContext, group: List[transaction.Transaction], index: int) -> Dict[str, Any]:
+        """ Applies one transaction of a group and returns its pending info """
+        txn = group[index]
+        result: Dict[str, Any] = {"pool-error": "", "confirmed-round": 0}
+        context.charge_fee(txn.sender, txn.fee)
+
+        if isinstance(txn, transaction.PaymentTxn):
+            closing_amount = context.pay(txn.sender, txn.receiver, txn.amt, txn.close_remainder_to)
+            if txn.close_remainder_to:
+                result["closing-amount"] = closing_amount
+        elif isinstance(txn, transaction.AssetTransferTxn):
+            context.asset_transfer(txn.sender, txn.receiver, txn.index, txn.amount, txn.close_assets_to)
+        elif isinstance(txn, transaction.AssetConfigTxn) and not txn.index:
+            asset_id = context.new_index()
+            context.assets[asset_id] = {
+                "creator": txn.sender,
+                "total": txn.total,
+                "decimals": txn.decimals,
+                "default-frozen": txn.default_frozen,
+                "unit-name": txn.unit_name,
+                "name": txn.asset_name,
+                "url": txn.url,
+                "manager": txn.manager,
+                "reserve": txn.reserve,
+                "freeze": txn.freeze,
+                "clawback": txn.clawback,
+            }
+            context.account(txn.sender)["assets"][asset_id] = txn.total
+            result["asset-index"] = asset_id
+        elif isinstance(txn, transaction.ApplicationCallTxn):
+            context.inner_txns = []
+            app_id = txn.index
+            if not app_id:
+                app_id = self._create_application(context, txn)
+                result["application-index"] = app_id
+            before = dict(context.app(app_id)["global"])
+            evaluator = self.approval_evaluator(context.app(app_id)["approval"])
+            if evaluator is None:
+                self.evaluate_application_call(context, group, index, app_id)
+            else:
+                outcome = evaluator.evaluate(context, group, index, app_id, self.application_address(app_id))
+                if not outcome.passed:
+                    raise LogicReject(outcome.error)
+                result["cost"] = outcome.cost
+                if txn.on_complete == transaction.OnComplete.DeleteApplicationOC:
+                    self._delete_application(context, app_id)
+            if app_id not in context.deleted_apps:
+                delta = state_delta(before, context.app(app_id)["global"])
+                if delta:
+                    result["global-state-delta"] = delta
+            if context.inner_txns:
+                result["inner-txns"] = context.inner_txns
+        else:
+            raise LogicReject(f"transaction type {txn.type} is not supported by the simulator")
+        return result
+
+    def _create_application(self, context: GroupContext, txn: transaction.ApplicationCallTxn) -> int:
+        """ Registers a new application and charges its creator's minimum balance """
+        app_id = context.new_index()
+        global_schema = txn.global_schema or transaction.StateSchema(0, 0)
+        local_schema = txn.local_schema or transaction.StateSchema(0, 0)
+        context.apps[app_id] = {
+            "creator": txn.sender,
+            "approval": txn.approval_program,
+            "clear": txn.clear_program,
+            "global": {},
+            "global-schema": {"num-uint": global_schema.num_uints or 0, "num-byte-slice": global_schema.num_byte_slices or 0},
+            "local-schema": {"num-uint": local_schema.num_uints or 0, "num-byte-slice": local_schema.num_byte_slices or 0},
+        }
+        context.apps[app_id]["min-balance"] = (
+            APP_MIN_BALANCE
+            + SCHEMA_UINT_MIN_BALANCE * (global_schema.num_uints or 0)
+            + SCHEMA_BYTES_MIN_BALANCE * (global_schema.num_byte_slices or 0)
+        )
+        context.account(txn.sender)["extra_mbr"] += context.apps[app_id]["min-balance"]
+        return app_id
+
+    def approval_evaluator(self, program: bytes) -> Optional[Any]:
+        """ TealEvaluator for a program compiled by this client, None otherwise """
+        if not self.execute_teal or not program[1:].startswith(b"#pragma version"):
+            return None
+        evaluator = self.evaluators.get(program)
+        if evaluator is None:
+            from source.classes.class_TealEvaluator import TealEvaluator
+            evaluator = self.evaluators[program] = TealEvaluator(program[1:].decode())
+        return evaluator
+
+    def _delete_application(self, context: GroupContext, app_id: int) -> None:
+        """ Removes an application and releases its creator's minimum balance """
+        app = context.app(app_id)
+        context.account(app["creator"])["extra_mbr"] -= app["min-balance"]
+        context.deleted_apps.add(app_id)
+        context.apps.pop(app_id, None)
+
+    def evaluate_application_call(self, context: GroupContext, group: List[transaction.Transaction], index: int, app_id: int) -> None:
+        """ Native model of contracts.approval_program, raises LogicReject on failure """
+        txn = group[index]
+        app = context.app(app_id)
+        state = app["global"]
+        app_address = self.application_address(app_id)
+        now = context.timestamp
+        args = txn.app_args or []
+
+        def require(condition: bool, reason: str = "assert failed") -> None:
+            if not condition:
+                raise LogicReject(f"logic eval error: {reason}")
+
+        def available(address: str) -> str:
+            require(address == txn.sender or address == app_address or address in (txn.accounts or []),
+                    f"invalid Account reference {address}")
+            return address
+
+        def transfer_nft(asset_id: int, receiver: str) -> None:
+            if asset_id in context.account(app_address)["assets"]:
+                context.inner_asset_transfer(app_address, asset_id, close_to=available(receiver))
+
+        def settle_balances(seller: str) -> None:
+            if context.account(app_address)["amount"] != 0:
+                context.inner_pay(app_address, None, 0, close_to=available(seller))
+
+        if txn.index == 0 or txn.index is None:
+            require(len(args) >= 7, "invalid ApplicationArgs index")
+            require(int.from_bytes(args[2], "big") < int.from_bytes(args[3], "big"))
+            state[b"seller"] = args[0]
+            state[b"nft_id"] = int.from_bytes(args[1], "big")
+            state[b"start"] = int.from_bytes(args[2], "big")
+            state[b"end"] = int.from_bytes(args[3], "big")
+            state[b"reserve_amount"] = int.from_bytes(args[4], "big")
+            state[b"min_bid_inc"] = int.from_bytes(args[5], "big")
+            state[b"creator"] = args[6]
+            state[b"bid_account"] = bytes(32)
+            return
+
+        if txn.on_complete == transaction.OnComplete.NoOpOC:
+            require(len(args) >= 1, "invalid ApplicationArgs index")
+            nft_id = state.get(b"nft_id", 0)
+            if args[0] == b"fund":
+                require(now < state.get(b"start", 0))
+                require(nft_id in (txn.foreign_assets or []), f"invalid Asset reference {nft_id}")
+                context.inner_asset_transfer(app_address, nft_id, receiver=app_address)
+                return
+            if args[0] == b"bid":
+                require(index >= 1, "gtxn index out of range")
+                payment = group[index - 1]
+                require(state.get(b"start", 0) <= now < state.get(b"end", 0))
+                require(payment.sender == txn.sender)
+                require(isinstance(payment, transaction.PaymentTxn))
+                require(payment.receiver == app_address)
+                require(payment.amt >= MIN_TXN_FEE)
+                if state[b"bid_account"] != bytes(32):
+                    require(payment.amt >= state[b"bid_amount"] + state[b"min_bid_inc"])
+                    previous_bidder = available(encoding.encode_address(state[b"bid_account"]))
+                    context.inner_pay(app_address, previous_bidder, state[b"bid_amount"] - MIN_TXN_FEE)
+                state[b"bid_amount"] = payment.amt
+                state[b"bid_account"] = encoding.decode_address(payment.sender)
+                return
+            raise LogicReject("logic eval error: err opcode executed")
+
+        if txn.on_complete == transaction.OnComplete.DeleteApplicationOC:
+            seller = encoding.encode_address(state[b"seller"])
+            require(txn.sender == seller or txn.sender == app["creator"])
+            nft_id = state[b"nft_id"]
+            if now >= state[b"start"] and state[b"bid_account"] != bytes(32):
+                transfer_nft(nft_id, encoding.encode_address(state[b"bid_account"]))
+            else:
+                transfer_nft(nft_id, seller)
+            settle_balances(seller)
+            self._delete_application(context, app_id)
+            return
+
+        raise LogicReject("logic eval error: transaction rejected by ApprovalProgram")
@@ -0,0 +1,72 @@
+""" Module with an in-process key store that stands in for KMDClient """
+
+from secrets import token_hex
+from typing import Dict, List
+
+from algosdk import account, error
+
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+
+SIMULATED_WALLET_NAME = "unencrypted-default-wallet"
+SIMULATED_WALLET_ID = "simulated-wallet"
+GENESIS_ACCOUNT_COUNT = 3
+GENESIS_ACCOUNT_BALANCE = 4_000_000_000_000_000
+
+
+class SimulatedKMDClient:
+    """ Key store holding the genesis accounts of a SimulatedAlgodClient """
+
+    def __init__(
+        self,
+        algod_client: SimulatedAlgodClient,
+        account_count: int = GENESIS_ACCOUNT_COUNT,
+        balance: int = GENESIS_ACCOUNT_BALANCE) -> None:
+        """ Generates and funds the genesis accounts """
+        self.algod_client = algod_client
+        self.keys: Dict[str, str] = dict()
+        self.handles: Dict[str, str] = dict()
+
+        for _ in range(account_count):
+            private_key, address = account.generate_account()
+            self.keys[address] = private_key
+            algod_client.fund_account(address, balance)
+
+    def _check_handle(self, handle: str) -> None:
+        """ Raises like kmd does for unknown or released handles """
+        if handle not in self.handles:
+            raise error.KMDHTTPError("wallet handle does not exist")
+
+    def list_wallets(self) -> List[Dict[str, str]]:
+        """ Lists the single simulated wallet """
+        return [{"id": SIMULATED_WALLET_ID, "name": SIMULATED_WALLET_NAME}]
+
+    def init_wallet_handle(self, id: str, password: str) -> str:
+        """ Opens a wallet handle """
+        if id != SIMULATED_WALLET_ID:
+            raise error.KMDHTTPError("wallet not found")
+        handle = token_hex(16)
+        self.handles[handle] = id
+        return handle
+
+    def renew_wallet_handle(self, handle: str) -> Dict[str, str]:
+        """ Renews a wallet handle """
+        self._check_handle(handle)
+        return {"wallet": {"id": SIMULATED_WALLET_ID, "name": SIMULATED_WALLET_NAME}, "expires_seconds": 60}
+
+    def release_wallet_handle(self, handle: str) -> bool:
+        """ Releases a wallet handle """
+        self._check_handle(handle)
+        del self.handles[handle]
+        return True
+
+    def list_keys(self, handle: str) -> List[str]:
+        """ Lists the addresses of the genesis accounts """
+        self._check_handle(handle)
+        return list(self.keys)
+
+    def export_key(self, handle: str, password: str, address: str) -> str:
+        """ Returns the private key of a genesis account """
+        self._check_handle(handle)
+        if address not in self.keys:
+            raise error.KMDHTTPError("key does not exist in this wallet")
+        return self.keys[address]
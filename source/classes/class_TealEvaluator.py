@@ -0,0 +1,1278 @@
+""" Module that executes TEAL approval programs in process """
+
+from ast import literal_eval
+from base64 import b32decode, b64decode
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from algosdk import encoding
+from algosdk.future import transaction
+
+from source.classes.class_SimulatedAlgodClient import (
+    MAX_VALIDITY_WINDOW,
+    MIN_BALANCE,
+    MIN_TXN_FEE,
+    GroupContext,
+    LogicReject,
+    min_balance,
+    state_delta,
+)
+
+MAX_TEAL_VERSION = 5
+APP_CALL_BUDGET = 700
+MAX_UINT64 = 2 ** 64 - 1
+MAX_KEY_LENGTH = 64
+MAX_KEY_VALUE_LENGTH = 128
+ZERO_ADDRESS_BYTES = bytes(32)
+
+NAMED_INTS = {
+    "NoOp": 0, "OptIn": 1, "CloseOut": 2, "ClearState": 3, "UpdateApplication": 4, "DeleteApplication": 5,
+    "unknown": 0, "pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6,
+}
+TYPE_ENUMS = {"pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6}
+INNER_TYPES = {1: "pay", 4: "axfer"}
+
+
+class TealError(Exception):
+    """ Raised by an opcode that fails """
+
+
+class ProgramReturn(Exception):
+    """ Raised by return and at the end of the program to stop the run """
+
+
+class EvalResult(NamedTuple):
+    """ Outcome of one application call """
+    passed: bool
+    error: Optional[str]
+    cost: int
+    global_delta: List[Dict[str, Any]]
+    inner_txns: List[Dict[str, Any]]
+
+
+@lru_cache(maxsize=4096)
+def address_bytes(address: Optional[str]) -> bytes:
+    """ Public key of an address, zero address for None """
+    return encoding.decode_address(address) if address else ZERO_ADDRESS_BYTES
+
+
+@lru_cache(maxsize=4096)
+def address_string(public_key: bytes) -> str:
+    """ Address of a public key """
+    return encoding.encode_address(public_key)
+
+
+def _txid_bytes(txn: transaction.Transaction) -> bytes:
+    """ Raw 32 byte transaction id """
+    txid = txn.get_txid()
+    return b32decode(txid + "=" * (-len(txid) % 8))
+
+
+def _on_completion(txn: transaction.Transaction) -> int:
+    """ OnCompletion of an application call as an integer """
+    on_complete = getattr(txn, "on_complete", 0)
+    return on_complete.value if isinstance(on_complete, transaction.OnComplete) else int(on_complete or 0)
+
+
+def _array(values: Callable[[transaction.Transaction, "Evaluation"], List[Any]]) -> Callable:
+    """ Getter for an element of an array field """
+    def get(txn: transaction.Transaction, ev: "Evaluation", index: int) -> Any:
+        items = values(txn, ev)
+        if index >= len(items):
+            raise TealError(f"invalid array index {index}")
+        return items[index]
+    return get
+
+
+TXN_FIELDS: Dict[str, Callable[[transaction.Transaction, "Evaluation"], Any]] = {
+    "Sender": lambda txn, ev: address_bytes(txn.sender),
+    "Fee": lambda txn, ev: txn.fee,
+    "FirstValid": lambda txn, ev: txn.first_valid_round,
+    "LastValid": lambda txn, ev: txn.last_valid_round,
+    "Note": lambda txn, ev: txn.note or b"",
+    "Lease": lambda txn, ev: txn.lease or ZERO_ADDRESS_BYTES,
+    "RekeyTo": lambda txn, ev: address_bytes(txn.rekey_to),
+    "Type": lambda txn, ev: txn.type.encode(),
+    "TypeEnum": lambda txn, ev: TYPE_ENUMS.get(txn.type, 0),
+    "TxID": lambda txn, ev: _txid_bytes(txn),
+    "GroupIndex": lambda txn, ev: ev.index if txn is ev.txn else ev.group_index(txn),
+    "Receiver": lambda txn, ev: address_bytes(getattr(txn, "receiver", None)) if txn.type == "pay" else ZERO_ADDRESS_BYTES,
+    "Amount": lambda txn, ev: getattr(txn, "amt", 0) or 0,
+    "CloseRemainderTo": lambda txn, ev: address_bytes(getattr(txn, "close_remainder_to", None)),
+    "XferAsset": lambda txn, ev: (getattr(txn, "index", 0) or 0) if txn.type == "axfer" else 0,
+    "AssetAmount": lambda txn, ev: (getattr(txn, "amount", 0) or 0) if txn.type == "axfer" else 0,
+    "AssetSender": lambda txn, ev: address_bytes(getattr(txn, "revocation_target", None)),
+    "AssetReceiver": lambda txn, ev: address_bytes(getattr(txn, "receiver", None)) if txn.type == "axfer" else ZERO_ADDRESS_BYTES,
+    "AssetCloseTo": lambda txn, ev: address_bytes(getattr(txn, "close_assets_to", None)),
+    "ApplicationID": lambda txn, ev: (getattr(txn, "index", 0) or 0) if txn.type == "appl" else 0,
+    "OnCompletion": lambda txn, ev: _on_completion(txn),
+    "NumAppArgs": lambda txn, ev: len(getattr(txn, "app_args", None) or []),
+    "NumAccounts": lambda txn, ev: len(getattr(txn, "accounts", None) or []),
+    "NumAssets": lambda txn, ev: len(getattr(txn, "foreign_assets", None) or []),
+    "NumApplications": lambda txn, ev: len(getattr(txn, "foreign_apps", None) or []),
+}
+TXN_ARRAY_FIELDS: Dict[str, Callable[[transaction.Transaction, "Evaluation", int], Any]] = {
+    "ApplicationArgs": _array(lambda txn, ev: getattr(txn, "app_args", None) or []),
+    "Accounts": _array(lambda txn, ev: [address_bytes(txn.sender)] + [address_bytes(a) for a in getattr(txn, "accounts", None) or []]),
+    "Assets": _array(lambda txn, ev: getattr(txn, "foreign_assets", None) or []),
+    "Applications": _array(lambda txn, ev: [ev.app_id] + list(getattr(txn, "foreign_apps", None) or [])),
+}
+GLOBAL_FIELDS: Dict[str, Callable[["Evaluation"], Any]] = {
+    "MinTxnFee": lambda ev: MIN_TXN_FEE,
+    "MinBalance": lambda ev: MIN_BALANCE,
+    "MaxTxnLife": lambda ev: MAX_VALIDITY_WINDOW,
+    "ZeroAddress": lambda ev: ZERO_ADDRESS_BYTES,
+    "GroupSize": lambda ev: len(ev.group),
+    "LogicSigVersion": lambda ev: MAX_TEAL_VERSION,
+    "Round": lambda ev: ev.context.round,
+    "LatestTimestamp": lambda ev: ev.context.timestamp,
+    "CurrentApplicationID": lambda ev: ev.app_id,
+    "CreatorAddress": lambda ev: address_bytes(ev.app["creator"]),
+    "CurrentApplicationAddress": lambda ev: ev.app_address_bytes,
+    "GroupID": lambda ev: ev.txn.group or ZERO_ADDRESS_BYTES,
+}
+INNER_FIELDS = {
+    "TypeEnum": int, "Type": bytes, "Sender": bytes, "Fee": int, "Note": bytes,
+    "Receiver": bytes, "Amount": int, "CloseRemainderTo": bytes,
+    "XferAsset": int, "AssetAmount": int, "AssetReceiver": bytes, "AssetCloseTo": bytes,
+}
+
+
+class Evaluation:
+    """ Machine state of one program run """
+    __slots__ = (
+        "stack", "scratch", "frames", "context", "group", "index", "txn",
+        "app_id", "app", "app_address", "app_address_bytes", "inner",
+    )
+
+    def __init__(self, context: GroupContext, group: List[transaction.Transaction], index: int, app_id: int, app_address: str) -> None:
+        self.stack: List[Any] = []
+        self.scratch: List[Any] = [0] * 256
+        self.frames: List[int] = []
+        self.context = context
+        self.group = group
+        self.index = index
+        self.txn = group[index]
+        self.app_id = app_id
+        self.app = context.app(app_id)
+        self.app_address = app_address
+        self.app_address_bytes = address_bytes(app_address)
+        self.inner: Optional[Dict[str, Any]] = None
+
+    def group_index(self, txn: transaction.Transaction) -> int:
+        """ Position of txn in the group """
+        for position, member in enumerate(self.group):
+            if member is txn:
+                return position
+        raise TealError("transaction is not in the group")
+
+    def account(self, reference: Any) -> str:
+        """ Resolves an account reference the way v5 does """
+        txn = self.txn
+        if type(reference) is int:
+            if reference == 0:
+                return txn.sender
+            accounts = txn.accounts or []
+            if reference > len(accounts):
+                raise TealError(f"invalid Account reference {reference}")
+            return accounts[reference - 1]
+        if len(reference) != 32:
+            raise TealError(f"invalid Account reference {reference!r}")
+        address = address_string(reference)
+        if address != txn.sender and address != self.app_address and address not in (txn.accounts or []):
+            raise TealError(f"invalid Account reference {address}")
+        return address
+
+    def asset(self, reference: Any) -> int:
+        """ Resolves an asset reference the way v5 does """
+        if type(reference) is not int:
+            raise TealError("asset reference wanted uint64")
+        assets = self.txn.foreign_assets or []
+        if reference in assets:
+            return reference
+        if reference < len(assets):
+            return assets[reference]
+        raise TealError(f"invalid Asset reference {reference}")
+
+
+def _uint(value: Any, op: str) -> int:
+    """ Checks an operand is a uint64 """
+    if type(value) is not int:
+        raise TealError(f"{op} arg wanted uint64 but got []byte")
+    return value
+
+
+def _bytes(value: Any, op: str) -> bytes:
+    """ Checks an operand is a byte slice """
+    if type(value) is not bytes:
+        raise TealError(f"{op} arg wanted []byte but got uint64")
+    return value
+
+
+# opcode handlers return None to continue with the next op or the index to jump to
+
+def op_push(ev: Evaluation, value: Any) -> None:
+    ev.stack.append(value)
+
+
+def _operands(stack: List[Any], name: str) -> Tuple[int, int]:
+    """ Pops the two uint64 operands of a binary op """
+    b = stack.pop()
+    a = stack.pop()
+    if type(a) is not int or type(b) is not int:
+        raise TealError(f"{name} arg wanted uint64 but got []byte")
+    return a, b
+
+
+def op_add(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "+")
+    if a + b > MAX_UINT64:
+        raise TealError("+ overflowed")
+    ev.stack.append(a + b)
+
+
+def op_subtract(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "-")
+    if b > a:
+        raise TealError("- would result negative")
+    ev.stack.append(a - b)
+
+
+def op_multiply(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "*")
+    if a * b > MAX_UINT64:
+        raise TealError("* overflowed")
+    ev.stack.append(a * b)
+
+
+def op_divide(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "/")
+    if b == 0:
+        raise TealError("/ 0")
+    ev.stack.append(a // b)
+
+
+def op_modulo(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "%")
+    if b == 0:
+        raise TealError("% 0")
+    ev.stack.append(a % b)
+
+
+def op_less(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "<")
+    ev.stack.append(1 if a < b else 0)
+
+
+def op_greater(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, ">")
+    ev.stack.append(1 if a > b else 0)
+
+
+def op_less_equal(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "<=")
+    ev.stack.append(1 if a <= b else 0)
+
+
+def op_greater_equal(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, ">=")
+    ev.stack.append(1 if a >= b else 0)
+
+
+def op_and(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "&&")
+    ev.stack.append(1 if a and b else 0)
+
+
+def op_or(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "||")
+    ev.stack.append(1 if a or b else 0)
+
+
+def op_bitwise_and(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "&")
+    ev.stack.append(a & b)
+
+
+def op_bitwise_or(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "|")
+    ev.stack.append(a | b)
+
+
+def op_bitwise_xor(ev: Evaluation, _: Any) -> None:
+    a, b = _operands(ev.stack, "^")
+    ev.stack.append(a ^ b)
+
+
+def op_equal(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    b = stack.pop()
+    a = stack.pop()
+    if type(a) is not type(b):
+        raise TealError("cannot compare (uint64 to []byte)")
+    stack.append(1 if a == b else 0)
+
+
+def op_not_equal(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    b = stack.pop()
+    a = stack.pop()
+    if type(a) is not type(b):
+        raise TealError("cannot compare (uint64 to []byte)")
+    stack.append(1 if a != b else 0)
+
+
+def op_not(ev: Evaluation, _: Any) -> None:
+    ev.stack.append(1 if _uint(ev.stack.pop(), "!") == 0 else 0)
+
+
+def op_len(ev: Evaluation, _: Any) -> None:
+    ev.stack.append(len(_bytes(ev.stack.pop(), "len")))
+
+
+def op_itob(ev: Evaluation, _: Any) -> None:
+    ev.stack.append(_uint(ev.stack.pop(), "itob").to_bytes(8, "big"))
+
+
+def op_btoi(ev: Evaluation, _: Any) -> None:
+    value = _bytes(ev.stack.pop(), "btoi")
+    if len(value) > 8:
+        raise TealError(f"btoi arg too long, got [{len(value)}]bytes")
+    ev.stack.append(int.from_bytes(value, "big"))
+
+
+def op_concat(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    b = _bytes(stack.pop(), "concat")
+    a = _bytes(stack.pop(), "concat")
+    if len(a) + len(b) > 4096:
+        raise TealError("concat produced a too big byte array")
+    stack.append(a + b)
+
+
+def op_substring(ev: Evaluation, bounds: Tuple[int, int]) -> None:
+    value = _bytes(ev.stack.pop(), "substring")
+    start, end = bounds
+    if end < start or end > len(value):
+        raise TealError("substring range beyond length of string")
+    ev.stack.append(value[start:end])
+
+
+def op_substring3(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    end = _uint(stack.pop(), "substring3")
+    start = _uint(stack.pop(), "substring3")
+    value = _bytes(stack.pop(), "substring3")
+    if end < start or end > len(value):
+        raise TealError("substring range beyond length of string")
+    stack.append(value[start:end])
+
+
+def op_extract(ev: Evaluation, bounds: Tuple[int, int]) -> None:
+    value = _bytes(ev.stack.pop(), "extract")
+    start, length = bounds
+    end = len(value) if length == 0 else start + length
+    if start > len(value) or end > len(value):
+        raise TealError("extract range beyond length of string")
+    ev.stack.append(value[start:end])
+
+
+def op_pop(ev: Evaluation, _: Any) -> None:
+    ev.stack.pop()
+
+
+def op_dup(ev: Evaluation, _: Any) -> None:
+    ev.stack.append(ev.stack[-1])
+
+
+def op_dup2(ev: Evaluation, _: Any) -> None:
+    ev.stack.extend(ev.stack[-2:])
+
+
+def op_swap(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    stack[-1], stack[-2] = stack[-2], stack[-1]
+
+
+def op_select(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    condition = _uint(stack.pop(), "select")
+    b = stack.pop()
+    a = stack.pop()
+    stack.append(b if condition else a)
+
+
+def op_dig(ev: Evaluation, depth: int) -> None:
+    ev.stack.append(ev.stack[-1 - depth])
+
+
+def op_cover(ev: Evaluation, depth: int) -> None:
+    stack = ev.stack
+    stack.insert(len(stack) - 1 - depth, stack.pop())
+
+
+def op_uncover(ev: Evaluation, depth: int) -> None:
+    stack = ev.stack
+    stack.append(stack.pop(len(stack) - 1 - depth))
+
+
+def op_load(ev: Evaluation, slot: int) -> None:
+    ev.stack.append(ev.scratch[slot])
+
+
+def op_store(ev: Evaluation, slot: int) -> None:
+    ev.scratch[slot] = ev.stack.pop()
+
+
+def op_err(ev: Evaluation, _: Any) -> None:
+    raise TealError("err opcode executed")
+
+
+def op_assert(ev: Evaluation, _: Any) -> None:
+    if not _uint(ev.stack.pop(), "assert"):
+        raise TealError("assert failed")
+
+
+def op_return(ev: Evaluation, _: Any) -> None:
+    raise ProgramReturn(ev.stack.pop())
+
+
+def op_end(ev: Evaluation, _: Any) -> None:
+    if len(ev.stack) != 1:
+        raise TealError(f"stack len is {len(ev.stack)} instead of 1")
+    raise ProgramReturn(ev.stack[0])
+
+
+def op_branch(ev: Evaluation, target: int) -> int:
+    return target
+
+
+def op_bz(ev: Evaluation, target: int) -> Optional[int]:
+    return target if _uint(ev.stack.pop(), "bz") == 0 else None
+
+
+def op_bnz(ev: Evaluation, target: int) -> Optional[int]:
+    return target if _uint(ev.stack.pop(), "bnz") != 0 else None
+
+
+def op_callsub(ev: Evaluation, target: Tuple[int, int]) -> int:
+    label, return_to = target
+    ev.frames.append(return_to)
+    return label
+
+
+def op_retsub(ev: Evaluation, _: Any) -> int:
+    if not ev.frames:
+        raise TealError("retsub with empty callstack")
+    return ev.frames.pop()
+
+
+def op_txn(ev: Evaluation, field: Callable) -> None:
+    ev.stack.append(field(ev.txn, ev))
+
+
+def op_txna(ev: Evaluation, field: Tuple[Callable, int]) -> None:
+    getter, index = field
+    ev.stack.append(getter(ev.txn, ev, index))
+
+
+def _group_member(ev: Evaluation, position: int) -> transaction.Transaction:
+    if position >= len(ev.group):
+        raise TealError(f"gtxn lookup TxnGroup[{position}] but it only has {len(ev.group)}")
+    return ev.group[position]
+
+
+def op_gtxn(ev: Evaluation, field: Tuple[int, Callable]) -> None:
+    position, getter = field
+    ev.stack.append(getter(_group_member(ev, position), ev))
+
+
+def op_gtxns(ev: Evaluation, field: Callable) -> None:
+    ev.stack.append(field(_group_member(ev, _uint(ev.stack.pop(), "gtxns")), ev))
+
+
+def op_gtxna(ev: Evaluation, field: Tuple[int, Callable, int]) -> None:
+    position, getter, index = field
+    ev.stack.append(getter(_group_member(ev, position), ev, index))
+
+
+def op_gtxnsa(ev: Evaluation, field: Tuple[Callable, int]) -> None:
+    getter, index = field
+    ev.stack.append(getter(_group_member(ev, _uint(ev.stack.pop(), "gtxnsa")), ev, index))
+
+
+def op_global(ev: Evaluation, field: Callable) -> None:
+    ev.stack.append(field(ev))
+
+
+def op_app_global_get(ev: Evaluation, _: Any) -> None:
+    key = _bytes(ev.stack.pop(), "app_global_get")
+    ev.stack.append(ev.app["global"].get(key, 0))
+
+
+def op_app_global_get_ex(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    key = _bytes(stack.pop(), "app_global_get_ex")
+    reference = _uint(stack.pop(), "app_global_get_ex")
+    applications = [ev.app_id] + list(ev.txn.foreign_apps or [])
+    if reference < len(applications):
+        app_id = applications[reference]
+    elif reference in applications:
+        app_id = reference
+    else:
+        raise TealError(f"invalid App reference {reference}")
+    try:
+        state = ev.app["global"] if app_id == ev.app_id else ev.context.app(app_id)["global"]
+    except LogicReject:
+        state = {}
+    if key in state:
+        stack.extend((state[key], 1))
+    else:
+        stack.extend((0, 0))
+
+
+def op_app_global_put(ev: Evaluation, _: Any) -> None:
+    stack = ev.stack
+    value = stack.pop()
+    key = _bytes(stack.pop(), "app_global_put")
+    if len(key) > MAX_KEY_LENGTH:
+        raise TealError(f"key too long: length was {len(key)}, maximum is {MAX_KEY_LENGTH}")
+    if type(value) is bytes and len(key) + len(value) > MAX_KEY_VALUE_LENGTH:
+        raise TealError(f"key/value total too long for key {key!r}")
+    ev.app["global"][key] = value
+
+
+def op_app_global_del(ev: Evaluation, _: Any) -> None:
+    ev.app["global"].pop(_bytes(ev.stack.pop(), "app_global_del"), None)
+
+
+def op_balance(ev: Evaluation, _: Any) -> None:
+    ev.stack.append(ev.context.account(ev.account(ev.stack.pop()))["amount"])
+
+
+def op_min_balance(ev: Evaluation, _: Any) -> None:
+    ev.stack.append(min_balance(ev.context.account(ev.account(ev.stack.pop()))))
+
+
+def op_asset_holding_get(ev: Evaluation, field: str) -> None:
+    stack = ev.stack
+    asset_id = ev.asset(stack.pop())
+    holdings = ev.context.account(ev.account(stack.pop()))["assets"]
+    if asset_id in holdings:
+        stack.extend((holdings[asset_id] if field == "AssetBalance" else 0, 1))
+    else:
+        stack.extend((0, 0))
+
+
+def op_itxn_begin(ev: Evaluation, _: Any) -> None:
+    if ev.inner is not None:
+        raise TealError("itxn_begin without itxn_submit")
+    ev.inner = {"Sender": ev.app_address_bytes, "Fee": MIN_TXN_FEE}
+
+
+def op_itxn_field(ev: Evaluation, field: str) -> None:
+    if ev.inner is None:
+        raise TealError("itxn_field without itxn_begin")
+    value = ev.stack.pop()
+    if type(value) is not INNER_FIELDS[field]:
+        raise TealError(f"itxn_field {field} got the wrong type")
+    if field == "TypeEnum":
+        if value not in INNER_TYPES:
+            raise TealError(f"{value} is not a valid type for itxn_field")
+        ev.inner["Type"] = INNER_TYPES[value].encode()
+    elif field == "Type" and value not in (b"pay", b"axfer"):
+        raise TealError(f"{value!r} is not a valid type for itxn_field")
+    elif field == "Sender" and value != ev.app_address_bytes:
+        raise TealError("unauthorized inner transaction sender")
+    elif field in ("Receiver", "CloseRemainderTo", "AssetReceiver", "AssetCloseTo"):
+        ev.account(value)
+    elif field == "XferAsset":
+        ev.asset(value)
+    ev.inner[field] = value
+
+
+def op_itxn_submit(ev: Evaluation, _: Any) -> None:
+    inner = ev.inner
+    if inner is None:
+        raise TealError("itxn_submit without itxn_begin")
+    ev.inner = None
+
+    def address(field: str) -> Optional[str]:
+        value = inner.get(field)
+        return address_string(value) if value and value != ZERO_ADDRESS_BYTES else None
+
+    txn_type = inner.get("Type", b"").decode()
+    if txn_type == "pay":
+        ev.context.inner_pay(ev.app_address, address("Receiver"), inner.get("Amount", 0), address("CloseRemainderTo"))
+    elif txn_type == "axfer":
+        ev.context.inner_asset_transfer(
+            ev.app_address,
+            inner.get("XferAsset", 0),
+            receiver=address("AssetReceiver"),
+            amount=inner.get("AssetAmount", 0),
+            close_to=address("AssetCloseTo"),
+        )
+    else:
+        raise TealError("inner transaction type is not set")
+
+
+OPCODES: Dict[str, Callable] = {
+    "+": op_add,
+    "-": op_subtract,
+    "*": op_multiply,
+    "/": op_divide,
+    "%": op_modulo,
+    "<": op_less,
+    ">": op_greater,
+    "<=": op_less_equal,
+    ">=": op_greater_equal,
+    "&&": op_and,
+    "||": op_or,
+    "&": op_bitwise_and,
+    "|": op_bitwise_or,
+    "^": op_bitwise_xor,
+    "==": op_equal,
+    "!=": op_not_equal,
+    "!": op_not,
+    "len": op_len,
+    "itob": op_itob,
+    "btoi": op_btoi,
+    "concat": op_concat,
+    "substring3": op_substring3,
+    "pop": op_pop,
+    "dup": op_dup,
+    "dup2": op_dup2,
+    "swap": op_swap,
+    "select": op_select,
+    "err": op_err,
+    "assert": op_assert,
+    "retsub": op_retsub,
+    "app_global_get": op_app_global_get,
+    "app_global_get_ex": op_app_global_get_ex,
+    "app_global_put": op_app_global_put,
+    "app_global_del": op_app_global_del,
+    "balance": op_balance,
+    "min_balance": op_min_balance,
+    "itxn_begin": op_itxn_begin,
+    "itxn_submit": op_itxn_submit,
+}
+
+
+class TealProgram(NamedTuple):
+    """ Assembled program: ops with decoded immediates and their source lines """
+    version: int
+    ops: List[Tuple[Callable, Any, int]]
+    lines: List[int]
+    labels: Dict[str, int]
+
+
+def _strip_comment(line: str) -> str:
+    """ Removes a trailing // comment that is not inside a string """
+    quoted = False
+    for position, character in enumerate(line):
+        if character == '"' and (position == 0 or line[position - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and line.startswith("//", position):
+            return line[:position].strip()
+    return line
+
+
+def _parse_int(token: str) -> int:
+    """ Integer immediate: decimal, hex, octal or a named constant """
+    if token in NAMED_INTS:
+        return NAMED_INTS[token]
+    if token.startswith(("0x", "0X")):
+        return int(token, 16)
+    if len(token) > 1 and token.startswith("0"):
+        return int(token, 8)
+    return int(token)
+
+
+def _parse_bytes(text: str) -> bytes:
+    """ Byte immediate: "string", 0x hex, base64/b64 or base32/b32 """
+    if text.startswith('"'):
+        return literal_eval("b" + text)
+    if text.startswith(("0x", "0X")):
+        return bytes.fromhex(text[2:])
+    encoding_name, _, value = text.partition(" ")
+    if text.startswith(("b64(", "base64(")):
+        return b64decode(text[text.index("(") + 1:-1])
+    if encoding_name in ("b64", "base64"):
+        return b64decode(value)
+    if text.startswith(("b32(", "base32(")):
+        value = text[text.index("(") + 1:-1]
+        return b32decode(value + "=" * (-len(value) % 8))
+    if encoding_name in ("b32", "base32"):
+        return b32decode(value + "=" * (-len(value) % 8))
+    raise ValueError(f"cannot parse byte immediate {text}")
+
+
+def _txn_field(name: str) -> Callable:
+    """ Getter of a scalar transaction field """
+    if name not in TXN_FIELDS:
+        raise ValueError(f"unsupported txn field {name}")
+    return TXN_FIELDS[name]
+
+
+def _txn_array_field(name: str) -> Callable:
+    """ Getter of an array transaction field """
+    if name not in TXN_ARRAY_FIELDS:
+        raise ValueError(f"unsupported txn array field {name}")
+    return TXN_ARRAY_FIELDS[name]
+
+
+def op_global_value(ev: Evaluation, key: bytes) -> None:
+    ev.stack.append(ev.app["global"].get(key, 0))
+
+
+def op_gtxns_back(ev: Evaluation, field: Tuple[int, Callable]) -> None:
+    offset, getter = field
+    if offset > ev.index:
+        raise TealError("- would result negative")
+    ev.stack.append(getter(ev.group[ev.index - offset], ev))
+
+
+def op_equal_value(ev: Evaluation, value: Any) -> None:
+    a = ev.stack.pop()
+    if type(a) is not type(value):
+        raise TealError("cannot compare (uint64 to []byte)")
+    ev.stack.append(1 if a == value else 0)
+
+
+def op_not_equal_value(ev: Evaluation, value: Any) -> None:
+    a = ev.stack.pop()
+    if type(a) is not type(value):
+        raise TealError("cannot compare (uint64 to []byte)")
+    ev.stack.append(1 if a != value else 0)
+
+
+def _fuse(ops: List[Tuple[Callable, Any]], position: int, targets: set) -> Optional[Tuple[Tuple[Callable, Any], int, int]]:
+    """ Superinstruction for the PyTeal idiom starting at position, with its length
+
+        The last element is the offset of the op in the idiom that can
+        fail, whose line the superinstruction reports.
+    """
+
+    def window(length: int) -> Optional[List[Tuple[Callable, Any]]]:
+        if position + length > len(ops) or any(position + i in targets for i in range(1, length)):
+            return None
+        return ops[position:position + length]
+
+    first = ops[position]
+    if first[0] is op_txn and first[1] is TXN_FIELDS["GroupIndex"]:
+        sequence = window(4)
+        if (sequence and sequence[1][0] is op_push and type(sequence[1][1]) is int
+                and sequence[2][0] is op_subtract and sequence[3][0] is op_gtxns):
+            return (op_gtxns_back, (sequence[1][1], sequence[3][1])), 4, 2
+    if first[0] is op_push:
+        sequence = window(2)
+        if sequence and sequence[1][0] is op_app_global_get and type(first[1]) is bytes:
+            return (op_global_value, first[1]), 2, 1
+        if sequence and sequence[1][0] is op_equal:
+            return (op_equal_value, first[1]), 2, 1
+        if sequence and sequence[1][0] is op_not_equal:
+            return (op_not_equal_value, first[1]), 2, 1
+    return None
+
+
+@lru_cache(maxsize=64)
+def assemble(teal: str, fuse: bool = True) -> TealProgram:
+    """ Parses TEAL source into ops ready to run, memoised per source
+
+        With fuse, common PyTeal sequences run as one superinstruction that
+        still costs as many ops as it replaces.
+    """
+    version = 1
+    parsed: List[Tuple[str, str, int]] = []
+    labels: Dict[str, int] = {}
+    for line_number, raw in enumerate(teal.splitlines(), start=1):
+        line = raw.strip()
+        if line.startswith("#pragma version"):
+            version = int(line.split()[-1])
+            continue
+        line = _strip_comment(line)
+        if not line:
+            continue
+        if line.endswith(":") and " " not in line:
+            labels[line[:-1]] = len(parsed)
+            continue
+        opcode, _, immediate = line.partition(" ")
+        parsed.append((opcode, immediate.strip(), line_number))
+
+    if version > MAX_TEAL_VERSION:
+        raise ValueError(f"TEAL version {version} is not supported, maximum is {MAX_TEAL_VERSION}")
+
+    def target(label: str) -> int:
+        if label not in labels:
+            raise ValueError(f"reference to undefined label {label}")
+        return labels[label]
+
+    ops: List[Tuple[Callable, Any]] = []
+    lines: List[int] = []
+    for position, (opcode, immediate, line_number) in enumerate(parsed):
+        args = immediate.split()
+        if opcode in ("int", "pushint"):
+            op = (op_push, _parse_int(immediate))
+        elif opcode in ("byte", "pushbytes"):
+            op = (op_push, _parse_bytes(immediate))
+        elif opcode == "addr":
+            op = (op_push, encoding.decode_address(immediate))
+        elif opcode == "b":
+            op = (op_branch, target(immediate))
+        elif opcode == "bz":
+            op = (op_bz, target(immediate))
+        elif opcode == "bnz":
+            op = (op_bnz, target(immediate))
+        elif opcode == "callsub":
+            op = (op_callsub, (target(immediate), position + 1))
+        elif opcode == "return":
+            op = (op_return, None)
+        elif opcode in ("load", "store"):
+            op = (op_load if opcode == "load" else op_store, int(immediate))
+        elif opcode in ("dig", "cover", "uncover"):
+            op = ({"dig": op_dig, "cover": op_cover, "uncover": op_uncover}[opcode], int(immediate))
+        elif opcode == "substring":
+            op = (op_substring, (int(args[0]), int(args[1])))
+        elif opcode == "extract":
+            op = (op_extract, (int(args[0]), int(args[1])))
+        elif opcode == "txn" and len(args) == 2:
+            op = (op_txna, (_txn_array_field(args[0]), int(args[1])))
+        elif opcode == "txn":
+            op = (op_txn, _txn_field(immediate))
+        elif opcode == "txna":
+            op = (op_txna, (_txn_array_field(args[0]), int(args[1])))
+        elif opcode == "gtxn" and len(args) == 3:
+            op = (op_gtxna, (int(args[0]), _txn_array_field(args[1]), int(args[2])))
+        elif opcode == "gtxn":
+            op = (op_gtxn, (int(args[0]), _txn_field(args[1])))
+        elif opcode == "gtxna":
+            op = (op_gtxna, (int(args[0]), _txn_array_field(args[1]), int(args[2])))
+        elif opcode == "gtxns" and len(args) == 2:
+            op = (op_gtxnsa, (_txn_array_field(args[0]), int(args[1])))
+        elif opcode == "gtxns":
+            op = (op_gtxns, _txn_field(immediate))
+        elif opcode == "gtxnsa":
+            op = (op_gtxnsa, (_txn_array_field(args[0]), int(args[1])))
+        elif opcode == "global":
+            if immediate not in GLOBAL_FIELDS:
+                raise ValueError(f"unsupported global field {immediate}")
+            op = (op_global, GLOBAL_FIELDS[immediate])
+        elif opcode == "asset_holding_get":
+            if immediate not in ("AssetBalance", "AssetFrozen"):
+                raise ValueError(f"unsupported asset_holding_get field {immediate}")
+            op = (op_asset_holding_get, immediate)
+        elif opcode == "itxn_field":
+            if immediate not in INNER_FIELDS:
+                raise ValueError(f"unsupported itxn_field {immediate}")
+            op = (op_itxn_field, immediate)
+        elif opcode in OPCODES:
+            op = (OPCODES[opcode], None)
+        else:
+            raise ValueError(f"line {line_number}: unsupported opcode {opcode}")
+        ops.append(op)
+        lines.append(line_number)
+
+    # jump targets and callsub return addresses must start an op
+    targets = set(labels.values()) | {position + 1 for position, op in enumerate(ops) if op[0] is op_callsub}
+    fused: List[Tuple[Callable, Any, int]] = []
+    fused_lines: List[int] = []
+    new_positions: Dict[int, int] = {}
+    position = 0
+    while position < len(ops):
+        new_positions[position] = len(fused)
+        replacement = _fuse(ops, position, targets) if fuse else None
+        op, length, failing = replacement if replacement is not None else (ops[position], 1, 0)
+        fused.append((op[0], op[1], length))
+        fused_lines.append(lines[position + failing])
+        position += length
+    new_positions[len(ops)] = len(fused)
+
+    def relocate(op: Tuple[Callable, Any, int]) -> Tuple[Callable, Any, int]:
+        handler, immediate, weight = op
+        if handler in (op_branch, op_bz, op_bnz):
+            return handler, new_positions[immediate], weight
+        if handler is op_callsub:
+            return handler, (new_positions[immediate[0]], new_positions[immediate[1]]), weight
+        return op
+
+    ops = [relocate(op) for op in fused]
+    lines = fused_lines
+    labels = {label: new_positions[position] for label, position in labels.items()}
+    ops.append((op_end, None, 0))
+    lines.append(lines[-1] if lines else 0)
+
+    return TealProgram(version, ops, lines, labels)
+
+
+# bytes of immediates after the opcode byte, the txn family depends on the form used
+IMMEDIATE_BYTES = {
+    "global": 1, "load": 1, "store": 1, "gtxnsa": 2, "txna": 2, "gtxna": 3,
+    "b": 2, "bz": 2, "bnz": 2, "callsub": 2, "substring": 2, "extract": 2,
+    "dig": 1, "cover": 1, "uncover": 1, "arg": 1, "intc": 1, "bytec": 1,
+    "asset_holding_get": 1, "asset_params_get": 1, "app_params_get": 1,
+    "itxn_field": 1, "itxn": 1, "itxna": 2, "gload": 2, "gloads": 1, "gaid": 1,
+}
+
+
+def _varuint_size(value: int) -> int:
+    """ Bytes of value as a varuint """
+    return max(1, (value.bit_length() + 6) // 7)
+
+
+def bytecode_layout(teal: str) -> Tuple[int, Dict[int, int]]:
+    """ Estimated assembled size: bytes of the header and of each source line
+
+        Follows the v5 assembler: int, byte and addr constants are put in
+        intcblock and bytecblock, most used first, and referenced with
+        intc_0..3 or bytec_0..3 (1 byte) or intc i or bytec i (2 bytes).
+        The header is the version and both constant blocks.
+    """
+    sizes: Dict[int, int] = {}
+    constants: Dict[type, Dict[Any, List[int]]] = {int: {}, bytes: {}}
+    for line_number, raw in enumerate(teal.splitlines(), start=1):
+        line = _strip_comment(raw.strip())
+        if not line or line.startswith("#pragma") or (line.endswith(":") and " " not in line):
+            continue
+        opcode, _, immediate = line.partition(" ")
+        immediate = immediate.strip()
+        if opcode == "int":
+            constants[int].setdefault(_parse_int(immediate), []).append(line_number)
+        elif opcode in ("byte", "addr"):
+            value = encoding.decode_address(immediate) if opcode == "addr" else _parse_bytes(immediate)
+            constants[bytes].setdefault(value, []).append(line_number)
+        elif opcode == "pushint":
+            sizes[line_number] = 1 + _varuint_size(_parse_int(immediate))
+        elif opcode == "pushbytes":
+            length = len(_parse_bytes(immediate))
+            sizes[line_number] = 1 + _varuint_size(length) + length
+        elif opcode in ("txn", "gtxn", "gtxns"):
+            sizes[line_number] = 1 + len(immediate.split())
+        else:
+            sizes[line_number] = 1 + IMMEDIATE_BYTES.get(opcode, 0)
+
+    header = 1
+    for kind, uses in constants.items():
+        if not uses:
+            continue
+        ordered = sorted(uses, key=lambda value: -len(uses[value]))
+        for index, value in enumerate(ordered):
+            for line_number in uses[value]:
+                sizes[line_number] = 1 if index < 4 else 2
+        header += 1 + _varuint_size(len(ordered))
+        if kind is int:
+            header += sum(_varuint_size(value) for value in ordered)
+        else:
+            header += sum(_varuint_size(len(value)) + len(value) for value in ordered)
+    return header, sizes
+
+
+def bytecode_size(teal: str) -> int:
+    """ Estimated size in bytes of the assembled program """
+    header, sizes = bytecode_layout(teal)
+    return header + sum(sizes.values())
+
+
+# uint64 ops compiled inline, with the expression of their result
+_UINT_BINARY: Dict[Callable, Tuple[str, str]] = {
+    op_add: ("+", "{a} + {b}"),
+    op_subtract: ("-", "{a} - {b}"),
+    op_less: ("<", "1 if {a} < {b} else 0"),
+    op_greater: (">", "1 if {a} > {b} else 0"),
+    op_less_equal: ("<=", "1 if {a} <= {b} else 0"),
+    op_greater_equal: (">=", "1 if {a} >= {b} else 0"),
+    op_and: ("&&", "1 if {a} and {b} else 0"),
+    op_or: ("||", "1 if {a} or {b} else 0"),
+}
+_TERMINATORS = (op_branch, op_bz, op_bnz, op_callsub, op_retsub, op_return, op_err, op_end)
+
+
+class BasicBlock(NamedTuple):
+    """ Straight line run of ops compiled to one function """
+    start: int
+    end: int
+    weight: int
+    run: Callable
+
+
+class _BlockCompiler:
+    """ Emits the Python source of one basic block
+
+        Operands pushed inside the block stay in local variables with
+        their type when it is known, so most ops neither touch the
+        evaluation stack nor check types at run time. The stack is only
+        brought up to date before an op compiled as a handler call and
+        when the block ends.
+    """
+
+    def __init__(self, program: TealProgram, names: Dict[str, Any]) -> None:
+        self.program = program
+        self.names = names
+        self.body: List[str] = []
+        self.stack: List[Tuple[str, Optional[type]]] = []
+        self.temps = 0
+
+    def constant(self, value: Any) -> str:
+        """ Expression of an immediate, objects are bound in the namespace """
+        if type(value) in (int, bytes):
+            return repr(value)
+        name = f"k{len(self.names)}"
+        self.names[name] = value
+        return name
+
+    def pop(self) -> Tuple[str, Optional[type]]:
+        """ Top operand, taken from the evaluation stack when not local """
+        if self.stack:
+            return self.stack.pop()
+        return self.assign("s.pop()"), None
+
+    def push(self, expression: str, kind: Optional[type] = None) -> None:
+        """ Evaluates expression now and keeps the result as an operand """
+        self.stack.append((self.assign(expression), kind))
+
+    def assign(self, expression: str) -> str:
+        """ Stores expression in a new local """
+        name = f"t{self.temps}"
+        self.temps += 1
+        self.body.append(f"{name} = {expression}")
+        return name
+
+    def flush(self) -> None:
+        """ Moves the local operands onto the evaluation stack """
+        if len(self.stack) == 1:
+            self.body.append(f"s.append({self.stack[0][0]})")
+        elif self.stack:
+            self.body.append(f"s.extend(({', '.join(expression for expression, _ in self.stack)}))")
+        self.stack.clear()
+
+    def expect(self, operand: Tuple[str, Optional[type]], kind: type, message: str) -> str:
+        """ Type check of an operand, left out when its type is known """
+        expression, known = operand
+        if known is None:
+            self.body.append(f"if type({expression}) is not {kind.__name__}: raise TealError({message!r})")
+        elif known is not kind:
+            self.body.append(f"raise TealError({message!r})")
+        return expression
+
+    def op(self, position: int) -> None:
+        """ Emits ops[position] """
+        handler, immediate, _ = self.program.ops[position]
+        self.body.append(f"ln = {self.program.lines[position]}")
+        if handler is op_push:
+            self.stack.append((self.constant(immediate), type(immediate)))
+        elif handler is op_global_value:
+            self.push(f"G.get({self.constant(immediate)}, 0)")
+        elif handler is op_app_global_get:
+            key = self.expect(self.pop(), bytes, "app_global_get arg wanted []byte but got uint64")
+            self.push(f"G.get({key}, 0)")
+        elif handler is op_txn:
+            self.push(f"{self.constant(immediate)}(txn, ev)")
+        elif handler is op_gtxns_back:
+            offset, getter = immediate
+            self.body.append(f"if {offset} > ev.index: raise TealError('- would result negative')")
+            self.push(f"{self.constant(getter)}(ev.group[ev.index - {offset}], ev)")
+        elif handler is op_global:
+            self.push(f"{self.constant(immediate)}(ev)")
+        elif handler is op_load:
+            self.push(f"scratch[{immediate}]")
+        elif handler is op_store:
+            self.body.append(f"scratch[{immediate}] = {self.pop()[0]}")
+        elif handler is op_pop:
+            self.pop()
+        elif handler is op_dup:
+            operand = self.pop()
+            self.stack.extend((operand, operand))
+        elif handler in (op_equal, op_not_equal, op_equal_value, op_not_equal_value):
+            if handler in (op_equal_value, op_not_equal_value):
+                b = (self.constant(immediate), type(immediate))
+            else:
+                b = self.pop()
+            a = self.pop()
+            if a[1] is None and b[1] is None:
+                self.body.append(f"if type({a[0]}) is not type({b[0]}): raise TealError('cannot compare (uint64 to []byte)')")
+            elif a[1] is None or b[1] is None:
+                self.expect(a if a[1] is None else b, a[1] or b[1], "cannot compare (uint64 to []byte)")
+            elif a[1] is not b[1]:
+                self.body.append("raise TealError('cannot compare (uint64 to []byte)')")
+            comparison = "==" if handler in (op_equal, op_equal_value) else "!="
+            self.push(f"1 if {a[0]} {comparison} {b[0]} else 0", int)
+        elif handler is op_not:
+            self.push(f"0 if {self.expect(self.pop(), int, '! arg wanted uint64 but got []byte')} else 1", int)
+        elif handler is op_assert:
+            value = self.expect(self.pop(), int, "assert arg wanted uint64 but got []byte")
+            self.body.append(f"if not {value}: raise TealError('assert failed')")
+        elif handler in _UINT_BINARY:
+            name, expression = _UINT_BINARY[handler]
+            message = f"{name} arg wanted uint64 but got []byte"
+            b = self.expect(self.pop(), int, message)
+            a = self.expect(self.pop(), int, message)
+            if handler is op_subtract:
+                self.body.append(f"if {b} > {a}: raise TealError('- would result negative')")
+            self.push(expression.format(a=a, b=b), int)
+            if handler is op_add:
+                self.body.append(f"if {self.stack[-1][0]} > MAX_UINT64: raise TealError('+ overflowed')")
+        elif handler in (op_bz, op_bnz):
+            condition = self.expect(self.pop(), int, f"{'bz' if handler is op_bz else 'bnz'} arg wanted uint64 but got []byte")
+            self.flush()
+            taken, fallthrough = (immediate, position + 1) if handler is op_bnz else (position + 1, immediate)
+            self.body.append(f"return {taken} if {condition} else {fallthrough}")
+        elif handler is op_branch:
+            self.flush()
+            self.body.append(f"return {immediate}")
+        elif handler is op_callsub:
+            self.flush()
+            self.body.append(f"frames.append({immediate[1]})")
+            self.body.append(f"return {immediate[0]}")
+        elif handler is op_retsub:
+            self.flush()
+            self.body.append("if not frames: raise TealError('retsub with empty callstack')")
+            self.body.append("return frames.pop()")
+        elif handler is op_return:
+            self.body.append(f"raise ProgramReturn({self.pop()[0]})")
+        else:
+            self.flush()
+            self.body.append(f"{self.constant(handler)}(ev, {self.constant(immediate)})")
+
+    def source(self, start: int, end: int) -> str:
+        """ Function running ops[start:end], returns the next position """
+        for position in range(start, end):
+            self.op(position)
+        if self.program.ops[end - 1][0] not in _TERMINATORS:
+            self.flush()
+            self.body.append(f"return {end}")
+        lines = [f"def block_{start}(ev, s, G, scratch, frames, txn):", "    ln = 0", "    try:"]
+        lines.extend(f"        {line}" for line in self.body)
+        lines.extend([
+            "    except (TealError, LogicReject, IndexError) as exception:",
+            "        exception.teal_line = ln",
+            "        raise",
+        ])
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=64)
+def compile_blocks(teal: str, fuse: bool = True) -> Tuple[TealProgram, List[Optional[BasicBlock]]]:
+    """ Compiles the assembled program into one function per basic block
+
+        Blocks are indexed by the position of their first op, every
+        block function returns the position of the block to run next.
+        Each op becomes a few Python statements, so the dispatch cost is
+        paid per block rather than per op. fuse is passed to assemble.
+    """
+    program = assemble(teal, fuse)
+    ops = program.ops
+    leaders = {0}
+    for position, (handler, immediate, _) in enumerate(ops):
+        if handler in _TERMINATORS:
+            leaders.add(position + 1)
+        if handler in (op_branch, op_bz, op_bnz):
+            leaders.add(immediate)
+        elif handler is op_callsub:
+            leaders.update(immediate)
+    starts = sorted(leader for leader in leaders if leader < len(ops))
+
+    names: Dict[str, Any] = {
+        "TealError": TealError, "ProgramReturn": ProgramReturn, "LogicReject": LogicReject, "MAX_UINT64": MAX_UINT64,
+    }
+    bounds = list(zip(starts, starts[1:] + [len(ops)]))
+    source = "\n\n".join(_BlockCompiler(program, names).source(start, end) for start, end in bounds)
+    exec(compile(source, "<teal>", "exec"), names)
+
+    blocks: List[Optional[BasicBlock]] = [None] * len(ops)
+    for start, end in bounds:
+        weight = sum(weight for _, _, weight in ops[start:end])
+        blocks[start] = BasicBlock(start, end, weight, names[f"block_{start}"])
+    return program, blocks
+
+
+class TealEvaluator:
+    """ Runs an approval program against a GroupContext
+
+        The program is assembled and compiled to one Python function per
+        basic block once per TEAL source. evaluate executes one
+        application call of a group the way algod would: global state and
+        inner transactions are applied to the context, which the caller
+        commits or throws away. Every op costs 1, as
+        every opcode supported here does in TEAL v5. The application calls
+        of a group share one budget of APP_CALL_BUDGET per call, kept on
+        the context, so a call only gets what the calls before it left.
+    """
+
+    def __init__(self, teal: str, fuse: bool = True) -> None:
+        """ Constructor for the evaluator, fuse=False runs every op on its own """
+        self.program, self.blocks = compile_blocks(teal, fuse)
+
+    def evaluate(
+        self,
+        context: GroupContext,
+        group: List[transaction.Transaction],
+        index: int,
+        app_id: int,
+        app_address: Optional[str] = None) -> EvalResult:
+        """ Executes the program for group[index] as application app_id """
+        app_address = app_address or context.ledger.application_address(app_id)
+        inner_start = len(context.inner_txns)
+        try:
+            ev = Evaluation(context, group, index, app_id, app_address)
+        except LogicReject as exception:
+            return EvalResult(False, str(exception), 0, [], [])
+        state = ev.app["global"]
+        before = dict(state)
+
+        blocks = self.blocks
+        if context.budget_left is None:
+            context.budget_left = APP_CALL_BUDGET * sum(1 for txn in group if txn.type == "appl")
+        budget = context.budget_left
+        stack, scratch, frames, txn = ev.stack, ev.scratch, ev.frames, ev.txn
+        pc = 0
+        cost = 0
+        passed = False
+        error = None
+        try:
+            # a block is charged before it runs, straight line code cannot run away
+            try:
+                while True:
+                    block = blocks[pc]
+                    cost += block.weight
+                    if cost > budget:
+                        raise TealError(f"dynamic cost budget exceeded: budget {budget}")
+                    pc = block.run(ev, stack, state, scratch, frames, txn)
+            except ProgramReturn as returned:
+                value = returned.args[0]
+            passed = _uint(value, "return") != 0
+            if passed:
+                self._check_schema(ev)
+            else:
+                error = "transaction rejected by ApprovalProgram"
+        except TealError as exception:
+            passed = False
+            error = f"logic eval error: {exception}. line={self._line(exception, pc)}"
+        except IndexError as exception:
+            passed = False
+            error = f"logic eval error: stack underflow. line={self._line(exception, pc)}"
+        except LogicReject as exception:
+            passed = False
+            error = f"logic eval error: {exception}. line={self._line(exception, pc)}"
+        context.budget_left = max(0, budget - cost)
+
+        return EvalResult(
+            passed,
+            error,
+            cost,
+            state_delta(before, ev.app["global"]) if passed else [],
+            context.inner_txns[inner_start:] if passed else [],
+        )
+
+    def _line(self, exception: Exception, pc: int) -> int:
+        """ Source line of the op that failed """
+        return getattr(exception, "teal_line", self.program.lines[pc])
+
+    @staticmethod
+    def _check_schema(ev: Evaluation) -> None:
+        """ Global state must fit the schema declared at creation """
+        schema = ev.app.get("global-schema") or {}
+        uints = sum(1 for value in ev.app["global"].values() if type(value) is int)
+        byte_slices = len(ev.app["global"]) - uints
+        if uints > schema.get("num-uint", 0):
+            raise TealError(f"store integer count {uints} exceeds schema integer count {schema.get('num-uint', 0)}")
+        if byte_slices > schema.get("num-byte-slice", 0):
+            raise TealError(f"store bytes count {byte_slices} exceeds schema bytes count {schema.get('num-byte-slice', 0)}")
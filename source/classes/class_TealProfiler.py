@@ -0,0 +1,289 @@
+""" Module that reports where a TEAL program spends its opcode budget and bytes """
+
+import re
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from source.classes.class_TealEvaluator import (
+    APP_CALL_BUDGET,
+    assemble,
+    bytecode_layout,
+    op_bnz,
+    op_branch,
+    op_bz,
+    op_callsub,
+    op_end,
+    op_err,
+    op_retsub,
+    op_return,
+)
+
+# approval and clear program together, without extra pages
+MAX_APP_TOTAL_PROGRAM_LEN = 2048
+# PyTeal names each subroutine in a comment on its label
+SUBROUTINE_LABEL = re.compile(r"^\s*(\w+):\s*//\s*(\w+)")
+# ops free of side effects, the conditions of a PyTeal Cond are made of them
+CONDITION_OPS = frozenset((
+    "int", "pushint", "byte", "pushbytes", "addr", "txn", "txna", "gtxn", "gtxna", "gtxns", "global", "load",
+    "app_global_get", "==", "!=", "<", ">", "<=", ">=", "&&", "||", "!", "+", "-", "*", "/", "%", "btoi", "itob", "len",
+))
+BINARY_OPS = frozenset(("==", "!=", "<", ">", "<=", ">=", "&&", "||", "+", "-", "*", "/", "%"))
+
+
+class PathCost(NamedTuple):
+    """ Cheapest and dearest path from an op to the end of its region
+
+        max_cost is None when the path can loop. subroutines holds those
+        called on any of the paths.
+    """
+    min_cost: int
+    max_cost: Optional[int]
+    subroutines: FrozenSet[str]
+
+
+def _then(cost: int, name: Optional[str], first: PathCost, rest: PathCost) -> PathCost:
+    """ Cost of running first and then rest, after cost ops of our own """
+    max_cost = None if first.max_cost is None or rest.max_cost is None else cost + first.max_cost + rest.max_cost
+    names = first.subroutines | rest.subroutines | (frozenset((name,)) if name else frozenset())
+    return PathCost(cost + first.min_cost + rest.min_cost, max_cost, names)
+
+
+def _either(cost: int, left: PathCost, right: PathCost) -> PathCost:
+    """ Cost of a branch to left or right, after cost ops of our own """
+    max_cost = None if left.max_cost is None or right.max_cost is None else cost + max(left.max_cost, right.max_cost)
+    return PathCost(cost + min(left.min_cost, right.min_cost), max_cost, left.subroutines | right.subroutines)
+
+
+ZERO = PathCost(0, 0, frozenset())
+
+
+class TealProfiler:
+    """ Static opcode cost and size of a TEAL program
+
+        Every line is attributed to the main program or to the PyTeal
+        subroutine it belongs to. The branches are the arms of the Cond
+        the program starts with, nested Conds included, named after their
+        conditions. Their cost is counted over every path from the start
+        of the program to a return, err or retsub, with each callsub
+        adding the cost of its subroutine.
+    """
+
+    def __init__(self, teal: str) -> None:
+        """ Constructor for the profiler """
+        self.teal = teal
+        self.program = assemble(teal, fuse=False)
+        self.source = teal.splitlines()
+        self.header_bytes, self.line_bytes = bytecode_layout(teal)
+        self.label_at: Dict[int, str] = {}
+        for label, position in sorted(self.program.labels.items(), key=lambda item: item[0]):
+            self.label_at.setdefault(position, label)
+
+        names = {}
+        for raw in self.source:
+            match = SUBROUTINE_LABEL.match(raw)
+            if match:
+                names[match.group(1)] = match.group(2)
+        entries = sorted({op[1][0] for op in self.program.ops if op[0] is op_callsub})
+        self.subroutines: List[Tuple[int, str]] = [
+            (entry, names.get(self.label_at.get(entry, ""), self.label_at.get(entry, f"op{entry}"))) for entry in entries
+        ]
+        self.costs: Dict[int, PathCost] = {}
+        # PyTeal jumps forward, so resolving from the end keeps the recursion shallow
+        for position in reversed(range(len(self.program.ops))):
+            self.path_cost(position)
+
+    def tokens(self, position: int) -> Tuple[str, str]:
+        """ Opcode and immediate of the op at position as written """
+        line = self.source[self.program.lines[position] - 1].split("//")[0].strip()
+        opcode, _, immediate = line.partition(" ")
+        return opcode, immediate.strip()
+
+    def region(self, position: int) -> str:
+        """ Name of the subroutine the op belongs to, main outside them """
+        name = "main"
+        for entry, subroutine in self.subroutines:
+            if entry > position:
+                break
+            name = subroutine
+        return name
+
+    def path_cost(self, position: int) -> PathCost:
+        """ Cost from position to the return, err or retsub that ends its path """
+        if position in self.costs:
+            return self.costs[position]
+        # a position seen again before it is resolved is a loop
+        self.costs[position] = PathCost(0, None, frozenset())
+
+        handler, immediate, weight = self.program.ops[position]
+        if handler in (op_return, op_err, op_retsub, op_end):
+            cost = PathCost(weight, weight, frozenset())
+        elif handler is op_branch:
+            cost = _then(weight, None, ZERO, self.path_cost(immediate))
+        elif handler in (op_bz, op_bnz):
+            cost = _either(weight, self.path_cost(immediate), self.path_cost(position + 1))
+        elif handler is op_callsub:
+            entry, return_to = immediate
+            cost = _then(weight, self.region(entry), self.path_cost(entry), self.path_cost(return_to))
+        else:
+            cost = _then(weight, None, ZERO, self.path_cost(position + 1))
+        self.costs[position] = cost
+        return cost
+
+    def condition(self, start: int, end: int) -> str:
+        """ Readable form of the condition computed by ops[start:end] """
+        stack: List[str] = []
+        opcode = None
+        for position in range(start, end):
+            opcode, immediate = self.tokens(position)
+            arguments = immediate.split()
+            if opcode in ("int", "pushint", "byte", "pushbytes", "addr"):
+                stack.append(immediate)
+            elif opcode in ("txn", "txna") and len(arguments) == 2:
+                stack.append(f"{arguments[0]}[{arguments[1]}]")
+            elif opcode == "txn":
+                stack.append(immediate)
+            elif opcode == "global":
+                stack.append(f"Global.{immediate}")
+            elif opcode == "load":
+                stack.append(f"scratch[{immediate}]")
+            elif opcode == "app_global_get":
+                stack.append(f"App.globalGet({stack.pop()})")
+            elif opcode in BINARY_OPS:
+                right, left = stack.pop(), stack.pop()
+                expression = f"{left} {opcode} {right}"
+                stack.append(f"({expression})" if opcode in ("&&", "||") else expression)
+            elif opcode == "!":
+                stack.append(f"!{stack.pop()}")
+            else:
+                stack.append(f"{opcode}({stack.pop() if stack else immediate})")
+        if not stack:
+            return "?"
+        # the outermost && or || needs no parentheses
+        return stack[-1][1:-1] if opcode in ("&&", "||") else stack[-1]
+
+    def cond_arms(self, start: int) -> Optional[List[Tuple[str, int, int]]]:
+        """ Condition, target and bnz position of each arm of a Cond at start
+
+            None when the ops at start are not a PyTeal Cond: conditions
+            each followed by bnz, then err.
+        """
+        arms: List[Tuple[str, int, int]] = []
+        segment = start
+        for position in range(start, len(self.program.ops)):
+            handler, immediate, _ = self.program.ops[position]
+            opcode, _ = self.tokens(position)
+            if handler is op_bnz and position > segment:
+                arms.append((self.condition(segment, position), immediate, position))
+                segment = position + 1
+            elif handler is op_err:
+                return arms if arms and position == segment else None
+            elif opcode not in CONDITION_OPS or position in self.label_at and position != start and position != segment:
+                return None
+        return None
+
+    def branches(self) -> List[Dict[str, Any]]:
+        """ Cost of every branch of the dispatch, nested Conds expanded """
+        branches: List[Dict[str, Any]] = []
+
+        def expand(start: int, prefix: str, dispatch_cost: int) -> None:
+            for condition, target, position in self.cond_arms(start) or []:
+                name = f"{prefix} / {condition}" if prefix else condition
+                cost_to_arm = dispatch_cost + position - start + 1
+                if self.cond_arms(target):
+                    expand(target, name, cost_to_arm)
+                    continue
+                cost = self.path_cost(target)
+                branches.append({
+                    "branch": name,
+                    "label": self.label_at.get(target),
+                    "dispatch_cost": cost_to_arm,
+                    "min_cost": cost_to_arm + cost.min_cost,
+                    "max_cost": None if cost.max_cost is None else cost_to_arm + cost.max_cost,
+                    "subroutines": sorted(cost.subroutines),
+                })
+
+        if self.cond_arms(0):
+            expand(0, "", 0)
+        else:
+            cost = self.path_cost(0)
+            branches.append({
+                "branch": "program",
+                "label": None,
+                "dispatch_cost": 0,
+                "min_cost": cost.min_cost,
+                "max_cost": cost.max_cost,
+                "subroutines": sorted(cost.subroutines),
+            })
+        return branches
+
+    def lines(self) -> List[Dict[str, Any]]:
+        """ Every op with its source line, region and estimated bytes """
+        return [
+            {
+                "line": line_number,
+                "teal": self.source[line_number - 1].strip(),
+                "subroutine": self.region(position),
+                "bytes": self.line_bytes.get(line_number, 0),
+            }
+            for position, line_number in enumerate(self.program.lines[:-1])
+        ]
+
+    def regions(self) -> List[Dict[str, Any]]:
+        """ Ops, bytes and cost per call of the main program and each subroutine """
+        lines = self.lines()
+        call_sites: Dict[str, int] = {}
+        for handler, immediate, _ in self.program.ops:
+            if handler is op_callsub:
+                name = self.region(immediate[0])
+                call_sites[name] = call_sites.get(name, 0) + 1
+
+        regions = []
+        for entry, name in [(0, "main")] + self.subroutines:
+            cost = self.path_cost(entry)
+            members = [line for line in lines if line["subroutine"] == name]
+            regions.append({
+                "subroutine": name,
+                "label": self.label_at.get(entry) if name != "main" else None,
+                "ops": len(members),
+                "bytes": sum(line["bytes"] for line in members),
+                "min_cost": cost.min_cost if name != "main" else None,
+                "max_cost": cost.max_cost if name != "main" else None,
+                "call_sites": call_sites.get(name, 0),
+            })
+        return regions
+
+    def report(self) -> Dict[str, Any]:
+        """ JSON ready profile of the program """
+        branches = self.branches()
+        worst = [branch["max_cost"] for branch in branches]
+        return {
+            "version": self.program.version,
+            "ops": len(self.program.ops) - 1,
+            "size_bytes": self.header_bytes + sum(self.line_bytes.values()),
+            "header_bytes": self.header_bytes,
+            "budget": APP_CALL_BUDGET,
+            "max_cost": None if None in worst else max(worst, default=0),
+            "branches": branches,
+            "subroutines": self.regions(),
+            "lines": self.lines(),
+        }
+
+
+def profile_regressions(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> List[str]:
+    """ Ways candidate is worse than baseline: more bytes, dearer or missing branches """
+    regressions = []
+    # an estimated size is only compared with an estimated one
+    same_sizes = baseline.get("size_estimated", True) == candidate.get("size_estimated", True)
+    if same_sizes and candidate["size_bytes"] > baseline["size_bytes"]:
+        regressions.append(f"size grew from {baseline['size_bytes']} to {candidate['size_bytes']} bytes")
+    if candidate.get("total_bytes", 0) > MAX_APP_TOTAL_PROGRAM_LEN:
+        regressions.append(f"approval and clear programs take {candidate['total_bytes']} bytes, over {MAX_APP_TOTAL_PROGRAM_LEN}")
+    current = {branch["branch"]: branch for branch in candidate["branches"]}
+    for branch in baseline["branches"]:
+        new = current.get(branch["branch"])
+        if new is None:
+            regressions.append(f"branch {branch['branch']} is gone")
+        elif new["max_cost"] is None and branch["max_cost"] is not None:
+            regressions.append(f"branch {branch['branch']} can now loop")
+        elif new["max_cost"] is not None and branch["max_cost"] is not None and new["max_cost"] > branch["max_cost"]:
+            regressions.append(f"branch {branch['branch']} costs up to {new['max_cost']} ops, was {branch['max_cost']}")
+    return regressions
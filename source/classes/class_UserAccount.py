@@ -1,6 +1,6 @@
 """ Module with user account """
 
-from typing import Any, Dict, List
+from typing import Dict
 from algosdk import account, mnemonic
 from algosdk.v2client.algod import AlgodClient
 from algosdk.future import transaction
@@ -8,6 +8,8 @@ from algosdk.future import transaction
 from random import randint
 
 from source.utils.utils_transactions import async_get_transaction
+from source.classes.class_ParamsProvider import suggested_params
+from source.classes.class_BalanceSnapshot import parse_balance
 
 class UserAccount:
     """User Account Class"""
@@ -36,19 +38,7 @@ class UserAccount:
 
     def get_balance(self, client: AlgodClient) -> Dict[int,int]:
         """ Retrieve account balance """
-        balance: Dict[int,int] = dict()
-
-        account_info = client.account_info(self.get_address())
-
-        balance[0] = account_info["amount"]
-
-        assets: List[Dict[str, Any]] = account_info.get("assets", [])
-        for asset in assets:
-            asset_id = asset["asset-id"]
-            amount = asset["amount"]
-            balance[asset_id] = amount
-        
-        return balance
+        return parse_balance(client.account_info(self.get_address()))
 
     def create_asset(self, client: AlgodClient) -> int:
         """ Lets the user create an asset"""
@@ -68,7 +58,7 @@ class UserAccount:
             asset_name=f"AN{asset_number}",
             url=f"https://www.google.com/search?q={asset_number}",
             note=asset_note,
-            sp=client.suggested_params(),
+            sp=suggested_params(client),
         )
         signed_transaction = asset_transaction.sign(self.get_private_key())
 
@@ -1,51 +1,134 @@
 """ Module containing useraccount and related functions """
 
-from time import clock_settime
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock, Thread
+from typing import List, Optional, Tuple
 from algosdk.future import transaction
 from algosdk.v2client.algod import AlgodClient
+from algosdk.kmd import KMDClient
 
 from source.utils.utils_account import GenesisAccounts
-from source.utils.utils_transactions import async_get_transaction
+from source.classes.class_ParamsProvider import suggested_params
+from source.classes.class_ConfirmationWaiter import get_confirmation_waiter
+from source.classes.class_BatchSigner import sign_transactions
+from source.utils.utils_console import rprint
 from .class_UserAccount import UserAccount
-from algosdk import account, mnemonic
+from algosdk import account
 
 MAX_ACCOUNTS_GENERATED = 8
+MAX_GROUP_SIZE = 16
+FUNDING_AMOUNT = 10000000
+PARALLEL_KEYGEN_THRESHOLD = 1024
+KEYGEN_CHUNK_SIZE = 256
+
+
+def generate_private_keys(count: int) -> List[str]:
+    """ Generates count private keys """
+    return [account.generate_account()[0] for _ in range(count)]
+
+
+def generate_user_accounts(count: int) -> List[UserAccount]:
+    """ Generates accounts, spreading key generation over processes for large counts """
+    if count < PARALLEL_KEYGEN_THRESHOLD:
+        return [UserAccount(key) for key in generate_private_keys(count)]
+
+    chunks = [min(KEYGEN_CHUNK_SIZE, count - start) for start in range(0, count, KEYGEN_CHUNK_SIZE)]
+    with ProcessPoolExecutor() as executor:
+        return [UserAccount(key) for keys in executor.map(generate_private_keys, chunks) for key in keys]
+
 
 class UserAccounts:
-    """User Account Management Class"""
+    """User Account Management Class
+
+        Accounts are handed out from a pool that is provisioned
+        batch_size at a time. When refill_threshold is set, the pool is
+        topped up in the background once it drops below that size.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        kmd_client: Optional[KMDClient] = None,
+        batch_size: int = MAX_ACCOUNTS_GENERATED,
+        refill_threshold: int = 0,
+        funding_amount: int = FUNDING_AMOUNT) -> None:
         """Constructor for user accounts"""
+        self.kmd_client = kmd_client
+        self.batch_size = batch_size
+        self.refill_threshold = refill_threshold
+        self.funding_amount = funding_amount
         self.user_accounts: List[UserAccount] = []
+        self.lock = Lock()
+        self.refill_thread: Optional[Thread] = None
 
-    def initialize_user_account(self, client: AlgodClient) -> None:
+    def initialize_user_account(self, client: AlgodClient) -> UserAccount:
         """Initialize a new user account """
-        if len(self.user_accounts) == 0:
-            self.user_accounts = [ UserAccount(account.generate_account()[0]) for i in range(MAX_ACCOUNTS_GENERATED)]
-
-            genesis_accounts = GenesisAccounts()
-            genesisaccount_list = genesis_accounts.get_genesis_accounts()
-
-            transactions: List[transaction.Transaction] = []
-            
-            
-            for i, a in enumerate(self.user_accounts): 
-                funding_account = genesisaccount_list[i % len(genesisaccount_list) ]
-                transactions.append(transaction.PaymentTxn(
+        with self.lock:
+            refill_thread = self.refill_thread if not self.user_accounts else None
+        if refill_thread is not None:
+            refill_thread.join()
+
+        with self.lock:
+            if len(self.user_accounts) == 0:
+                self.user_accounts = self.provision(client, self.batch_size)
+            user_account = self.user_accounts.pop()
+
+            if len(self.user_accounts) < self.refill_threshold and self.refill_thread is None:
+                self.refill_thread = Thread(target=self._refill, args=(client,), name="account-refill", daemon=True)
+                self.refill_thread.start()
+
+        return user_account
+
+    def provision(self, client: AlgodClient, count: int) -> List[UserAccount]:
+        """ Generates and funds count accounts
+
+            Funding payments are split into atomic groups of at most
+            MAX_GROUP_SIZE and signed in one batch, all groups are
+            submitted back to back and then confirmed together.
+        """
+        user_accounts = generate_user_accounts(count)
+
+        genesis_accounts = GenesisAccounts(self.kmd_client)
+        genesisaccount_list = genesis_accounts.get_genesis_accounts()
+        params = suggested_params(client)
+
+        groups: List[List[Tuple[transaction.Transaction, str]]] = []
+        for start in range(0, count, MAX_GROUP_SIZE):
+            funders = [
+                genesisaccount_list[i % len(genesisaccount_list)]
+                for i in range(start, min(start + MAX_GROUP_SIZE, count))
+            ]
+            transactions = [
+                transaction.PaymentTxn(
                     sender = funding_account.get_address(),
                     receiver = a.get_address(),
-                    amt = 10000000,
-                    sp = client.suggested_params()
-                ))
-
-            signed_transactions = [
-                transaction.sign(genesisaccount_list[i%len(genesisaccount_list)].get_private_key())
-                for i, transaction in enumerate(transaction.assign_group_id(transactions))
+                    amt = self.funding_amount,
+                    sp = params
+                )
+                for funding_account, a in zip(funders, user_accounts[start:start + MAX_GROUP_SIZE])
             ]
+            groups.append([
+                (txn, funding_account.get_private_key())
+                for funding_account, txn in zip(funders, transaction.assign_group_id(transactions))
+            ])
+
+        signed = iter(sign_transactions([pair for group in groups for pair in group]))
+        first_transaction_ids: List[str] = []
+        for group in groups:
+            signed_transactions = [next(signed) for _ in group]
             client.send_transactions(signed_transactions)
+            first_transaction_ids.append(signed_transactions[0].get_txid())
+
+        get_confirmation_waiter(client).wait_all(first_transaction_ids)
+        return user_accounts
 
-            async_get_transaction(client, signed_transactions[0].get_txid())
-    
-        return self.user_accounts.pop()
- 
\ No newline at end of file
+    def _refill(self, client: AlgodClient) -> None:
+        """ Background top up of the pool """
+        try:
+            user_accounts = self.provision(client, self.batch_size)
+            with self.lock:
+                self.user_accounts = user_accounts + self.user_accounts
+        except Exception as exception:
+            rprint(f"[red bold] Refilling the account pool failed: {exception}")
+        finally:
+            with self.lock:
+                self.refill_thread = None
@@ -1,52 +1,164 @@
 """ This module contains util functions for algorand client and account """
-from typing import List
+import os
+from threading import Lock
+from time import monotonic
+from typing import List, Optional
+from weakref import WeakKeyDictionary, ref
+from algosdk import error
 from algosdk.v2client.algod import AlgodClient
 from algosdk.kmd import KMDClient
 from source.classes.class_UserAccount import UserAccount
+from source.classes.class_PooledTransport import DEFAULT_MAX_CONNECTIONS, PooledAlgodClient, PooledKMDClient
+from source.classes.class_RPCInstrumentation import JSONLinesSink, instrument
+from source.utils.utils_weak import dereference
 
 ALGOD_ADDRESS = "http://localhost:4001"
 KMD_ADDRESS = "http://localhost:4002"
 TOKEN = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
 KMD_WALLET_NAME = "unencrypted-default-wallet"
 KMD_WALLET_PASSWORD = ""
+# kmd's default session lifetime, used until a renewal reports the real one
+KMD_HANDLE_LIFETIME = 60
+# when set, every algod and kmd request is appended to this JSON lines file
+RPC_LOG = os.environ.get("AUCTION_RPC_LOG")
+# keep-alive connections per client, 0 opens a new urllib connection per request as the SDK does
+HTTP_POOL_SIZE = int(os.environ.get("AUCTION_HTTP_POOL", DEFAULT_MAX_CONNECTIONS))
 
-def initialize_algod_client() -> AlgodClient:
-    """ Initialize and return an AlgodClient """
-    return AlgodClient(TOKEN, ALGOD_ADDRESS)
+def _with_sinks(client, sinks: tuple, name: str):
+    """ Wraps client in an InstrumentedClient when there is somewhere to record to """
+    if RPC_LOG:
+        sinks = sinks + (JSONLinesSink(RPC_LOG),)
+    return instrument(client, *sinks, name=name) if sinks else client
 
-def initialize_kmd_client() -> KMDClient:
-    """ Initialize a KMD Client"""
-    return KMDClient(TOKEN, KMD_ADDRESS)
+def initialize_algod_client(*sinks) -> AlgodClient:
+    """ Initialize and return an AlgodClient, instrumented when sinks are given """
+    client = PooledAlgodClient(TOKEN, ALGOD_ADDRESS, max_connections=HTTP_POOL_SIZE) if HTTP_POOL_SIZE else AlgodClient(TOKEN, ALGOD_ADDRESS)
+    return _with_sinks(client, sinks, "algod")
+
+def initialize_kmd_client(*sinks) -> KMDClient:
+    """ Initialize a KMD Client, instrumented when sinks are given"""
+    client = PooledKMDClient(TOKEN, KMD_ADDRESS, max_connections=HTTP_POOL_SIZE) if HTTP_POOL_SIZE else KMDClient(TOKEN, KMD_ADDRESS)
+    return _with_sinks(client, sinks, "kmd")
+
+
+class KMDSession:
+    """ A wallet handle that is kept open and renewed before it expires """
+
+    def __init__(
+        self,
+        kmd_client: KMDClient,
+        wallet_name: str = KMD_WALLET_NAME,
+        wallet_password: str = KMD_WALLET_PASSWORD) -> None:
+        """Constructor for the session """
+        # weak, the shared session of a client must not keep it alive
+        self.kmd_client_ref = ref(kmd_client)
+        self.wallet_name = wallet_name
+        self.wallet_password = wallet_password
+        self.wallet_id: Optional[str] = None
+        self.handle: Optional[str] = None
+        self.renew_at = 0.0
+        self.lock = Lock()
+
+    @property
+    def kmd_client(self) -> KMDClient:
+        """ The kmd client, ReferenceError once it was garbage collected """
+        return dereference(self.kmd_client_ref)
+
+    def _open(self) -> str:
+        """ Looks the wallet up once and opens a new handle """
+        if self.wallet_id is None:
+            for wallet in self.kmd_client.list_wallets():
+                if wallet["name"] == self.wallet_name:
+                    self.wallet_id = wallet["id"]
+                    break
+            assert self.wallet_id is not None
+
+        self.handle = self.kmd_client.init_wallet_handle(self.wallet_id, self.wallet_password)
+        self.renew_at = monotonic() + KMD_HANDLE_LIFETIME / 2
+        return self.handle
+
+    def get_handle(self) -> str:
+        """ Returns a live wallet handle, renewing it at half its lifetime """
+        with self.lock:
+            if self.handle is None:
+                return self._open()
+            if monotonic() >= self.renew_at:
+                try:
+                    renewed = self.kmd_client.renew_wallet_handle(self.handle)
+                    lifetime = renewed.get("expires_seconds", KMD_HANDLE_LIFETIME) if isinstance(renewed, dict) else KMD_HANDLE_LIFETIME
+                    self.renew_at = monotonic() + lifetime / 2
+                except error.KMDHTTPError:
+                    return self._open()
+            return self.handle
+
+    def export_keys(self) -> List[str]:
+        """ Exports the private key of every account in the wallet """
+        handle = self.get_handle()
+        return [
+            self.kmd_client.export_key(handle, self.wallet_password, address)
+            for address in self.kmd_client.list_keys(handle)
+        ]
+
+    def release(self) -> None:
+        """ Releases the wallet handle """
+        with self.lock:
+            if self.handle is not None:
+                try:
+                    self.kmd_client.release_wallet_handle(self.handle)
+                finally:
+                    self.handle = None
+
+
+_default_kmd_client: Optional[KMDClient] = None
+_sessions: "WeakKeyDictionary[KMDClient, KMDSession]" = WeakKeyDictionary()
+_genesis_accounts: "WeakKeyDictionary[KMDClient, List[UserAccount]]" = WeakKeyDictionary()
+_genesis_lock = Lock()
+
+
+def get_kmd_session(kmd_client: Optional[KMDClient] = None) -> KMDSession:
+    """ Returns the wallet session shared by everything using this kmd client """
+    global _default_kmd_client
+    with _genesis_lock:
+        if kmd_client is None:
+            if _default_kmd_client is None:
+                _default_kmd_client = initialize_kmd_client()
+            kmd_client = _default_kmd_client
+        session = _sessions.get(kmd_client)
+        if session is None:
+            session = _sessions[kmd_client] = KMDSession(kmd_client)
+        return session
 
 
 class GenesisAccounts:
-    """ A class to maintain genesis accounts"""
-    def __init__(self) -> None:
+    """ A class to maintain genesis accounts
+
+        Keys are exported once per kmd client and shared by every instance
+        in the process.
+    """
+    def __init__(self, kmd_client: Optional[KMDClient] = None) -> None:
         """Constructor for Genesis Accounts """
-        self.genesis_accounts: List(UserAccount) = []
+        self.session = get_kmd_session(kmd_client)
+        self.genesis_accounts: List[UserAccount] = []
 
-    def get_genesis_accounts(self):
+    def get_genesis_accounts(self) -> List[UserAccount]:
         """ Returns genesis accounts """
         if len(self.genesis_accounts) == 0:
-            key_management_daemon = initialize_kmd_client()
+            kmd_client = self.session.kmd_client
+            accounts_KMD = _genesis_accounts.get(kmd_client)
+            if accounts_KMD is None:
+                with _genesis_lock:
+                    accounts_KMD = _genesis_accounts.get(kmd_client)
+                    if accounts_KMD is None:
+                        accounts_KMD = [UserAccount(key) for key in self.session.export_keys()]
+                        _genesis_accounts[kmd_client] = accounts_KMD
+            self.genesis_accounts = accounts_KMD
+        return self.genesis_accounts
 
-            wallet_id = None
-            for wallet in key_management_daemon.list_wallets():
-                if wallet["name"] == KMD_WALLET_NAME:
-                    wallet_id = wallet["id"]
-                    break
-            
-            assert wallet_id is not None
-            
-            wallet_handle = key_management_daemon.init_wallet_handle(wallet_id, KMD_WALLET_PASSWORD)
-
-            try:
-                accounts_KMD = [ 
-                    UserAccount(key_management_daemon.export_key(wallet_handle, KMD_WALLET_PASSWORD, address))
-                    for address in key_management_daemon.list_keys(wallet_handle)
-                ]
-            finally:
-                key_management_daemon.release_wallet_handle(wallet_handle)
-        
-            self.accounts = accounts_KMD
-        return self.accounts
\ No newline at end of file
+    def refresh(self) -> List[UserAccount]:
+        """ Exports the keys again, e.g. after accounts were added to the wallet """
+        kmd_client = self.session.kmd_client
+        accounts_KMD = [UserAccount(key) for key in self.session.export_keys()]
+        with _genesis_lock:
+            _genesis_accounts[kmd_client] = accounts_KMD
+        self.genesis_accounts = accounts_KMD
+        return accounts_KMD
@@ -1,8 +1,17 @@
 """ Python util lib for auction """
 
 from base64 import b64decode
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
+from algosdk import encoding
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from source.classes.class_AuctionState import AuctionState
+from source.classes.class_BatchSigner import sign_transactions
+from source.classes.class_BidTemplate import BidTemplate
+
+MIN_TRANSACTION_COST = 1000
 
 
 def decode_state(state_array: List[Any]) -> Dict[bytes, Union[int, bytes]]:
@@ -26,4 +35,124 @@ def decode_state(state_array: List[Any]) -> Dict[bytes, Union[int, bytes]]:
 
         state[key] = value
 
-    return state
\ No newline at end of file
+    return state
+
+
+def build_create_transaction(
+    auction: Any,
+    approval: bytes,
+    clear: bytes,
+    params: transaction.SuggestedParams) -> transaction.SignedTransaction:
+    """Builds and signs the application create transaction of an auction"""
+    global_schema = transaction.StateSchema(num_uints=7, num_byte_slices=3)
+    local_schema = transaction.StateSchema(num_uints=0, num_byte_slices=0)
+
+    app_args = [
+        encoding.decode_address(auction.artist.get_address()),
+        auction.nft_id.to_bytes(8, "big"),
+        auction.start_time.to_bytes(8, "big"),
+        auction.end_time.to_bytes(8, "big"),
+        auction.reserve.to_bytes(8, "big"),
+        auction.min_bid_increment.to_bytes(8, "big"),
+        encoding.decode_address(auction.auctioneer.get_address()),
+    ]
+
+    auction_transaction = transaction.ApplicationCreateTxn(
+        sender=auction.auctioneer.get_address(),
+        on_complete=transaction.OnComplete.NoOpOC,
+        approval_program=approval,
+        clear_program=clear,
+        global_schema=global_schema,
+        local_schema=local_schema,
+        app_args=app_args,
+        sp=params,
+    )
+    return auction_transaction.sign(auction.auctioneer.get_private_key())
+
+
+def build_fund_transactions(
+    auction: Any,
+    app_id: int,
+    params: transaction.SuggestedParams) -> List[transaction.SignedTransaction]:
+    """Builds and signs the fund, host and NFT transfer group of an auction
+
+        The application call is the second transaction of the group.
+    """
+    escrow_address = get_application_address(app_id)
+    fund_cost = 3*MIN_TRANSACTION_COST + 2*auction.min_bid_increment
+
+    fund_auction_transaction = transaction.PaymentTxn(
+        sender=auction.auctioneer.get_address(),
+        receiver=escrow_address,
+        amt=fund_cost,
+        sp=params
+    )
+
+    hosting_transaction = transaction.ApplicationCallTxn(
+        sender=auction.auctioneer.get_address(),
+        index=app_id,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=[b"fund"],
+        foreign_assets=[auction.nft_id],
+        sp=params
+    )
+
+    nft_fund_transaction = transaction.AssetTransferTxn(
+        sender=auction.artist.get_address(),
+        receiver=escrow_address,
+        index=auction.nft_id,
+        amt=auction.nft_amount,
+        sp=params
+    )
+
+    transaction.assign_group_id([fund_auction_transaction, hosting_transaction, nft_fund_transaction])
+
+    return [
+        fund_auction_transaction.sign(auction.auctioneer.get_private_key()),
+        hosting_transaction.sign(auction.auctioneer.get_private_key()),
+        nft_fund_transaction.sign(auction.artist.get_private_key()),
+    ]
+
+
+def build_bid_transactions(
+    auction: Any,
+    bidder: Any,
+    bid_amount: int,
+    highest_bidder: Optional[str],
+    params: transaction.SuggestedParams,
+    opt_in: bool = False) -> List[transaction.SignedTransaction]:
+    """Builds and signs the payment and application call group of a bid
+
+        With opt_in the bidder's opt in to the NFT leads the group, the
+        contract reads the payment just before the call either way. The
+        group comes from the auction's BidTemplate, made on its first bid.
+    """
+    template = auction.bid_template
+    if template is None or template.app_id != auction.app_id:
+        template = auction.bid_template = BidTemplate(auction.app_id, auction.nft_id)
+
+    group = template.build(bidder.get_address(), bid_amount, highest_bidder, params, opt_in)
+    return sign_transactions([(txn, bidder.get_private_key()) for txn in group])
+
+
+def build_close_transaction(
+    auction: Any,
+    sender: str,
+    state: AuctionState,
+    params: transaction.SuggestedParams) -> transaction.ApplicationDeleteTxn:
+    """Builds the unsigned delete transaction that closes an auction
+
+        The seller and the highest bidder in state are passed as accounts,
+        the contract pays them out.
+    """
+    accounts: List[str] = [state.seller]
+    if state.bid_account is not None:
+        accounts.append(state.bid_account)
+
+    return transaction.ApplicationDeleteTxn(
+        sender=sender,
+        index=auction.app_id,
+        accounts=accounts,
+        foreign_assets=[auction.nft_id],
+        sp=params
+    )
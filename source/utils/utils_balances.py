@@ -0,0 +1,67 @@
+""" Util functions to read the balances of many accounts at once """
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+from algosdk.logic import get_application_address
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_BalanceSnapshot import BalanceSnapshot, parse_balance
+
+MAX_BALANCE_WORKERS = 8
+
+
+def _app_addresses(app_ids: Iterable[int]) -> Dict[int, str]:
+    """ Maps the requested applications to their escrow addresses """
+    return {app_id: get_application_address(app_id) for app_id in app_ids}
+
+
+def _unique(addresses: List[str]) -> List[str]:
+    """ Drops repeated addresses while keeping their order """
+    return list(dict.fromkeys(addresses))
+
+
+def get_balance_snapshot(
+    client: AlgodClient,
+    addresses: Iterable[str] = (),
+    app_ids: Iterable[int] = (),
+    max_workers: int = MAX_BALANCE_WORKERS) -> BalanceSnapshot:
+    """ Reads every account once, pipelined when the client can, else concurrently on a bounded thread pool """
+    app_addresses = _app_addresses(app_ids)
+    targets = _unique(list(addresses) + list(app_addresses.values()))
+
+    if len(targets) > 1 and hasattr(client, "account_infos"):
+        responses = client.account_infos(targets)
+    elif len(targets) <= 1 or max_workers <= 1:
+        responses = [client.account_info(address) for address in targets]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as executor:
+            responses = list(executor.map(client.account_info, targets))
+
+    return _build_snapshot(targets, responses, app_addresses)
+
+
+async def get_balance_snapshot_async(
+    client: Any,
+    addresses: Iterable[str] = (),
+    app_ids: Iterable[int] = (),
+    max_concurrency: int = MAX_BALANCE_WORKERS) -> BalanceSnapshot:
+    """ Same as get_balance_snapshot for async clients """
+    app_addresses = _app_addresses(app_ids)
+    targets = _unique(list(addresses) + list(app_addresses.values()))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(address: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await client.account_info(address)
+
+    responses = await asyncio.gather(*[fetch(address) for address in targets])
+    return _build_snapshot(targets, responses, app_addresses)
+
+
+def _build_snapshot(targets: List[str], responses: List[Dict[str, Any]], app_addresses: Dict[int, str]) -> BalanceSnapshot:
+    """ Assembles the snapshot from account_info responses """
+    balances = {address: parse_balance(response) for address, response in zip(targets, responses)}
+    snapshot_round = max((response.get("round", 0) for response in responses), default=0)
+    return BalanceSnapshot(balances, app_addresses, snapshot_round)
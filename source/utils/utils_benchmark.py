@@ -0,0 +1,439 @@
+""" Util functions for load testing the bid path """
+
+import io
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+from base64 import b64decode
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from itertools import count
+from threading import Lock
+from time import perf_counter, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from algosdk.v2client.algod import AlgodClient
+
+from source.classes.class_AlgodStandIn import AlgodStandIn
+from source.classes.class_Auction import Auction
+from source.classes.class_AuctionHouse import AuctionHouse
+from source.classes.class_ContractCompiler import CompiledContracts
+from source.classes.class_RPCInstrumentation import MemorySink, instrument
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.classes.class_SimulatedKMDClient import SimulatedKMDClient
+from source.classes.class_TealEvaluator import assemble, bytecode_size
+from source.classes.class_TealProfiler import MAX_APP_TOTAL_PROGRAM_LEN, TealProfiler
+from source.classes.class_UserAccount import UserAccount
+from source.classes.class_UserAccounts import UserAccounts
+from source.classes.class_PooledTransport import PooledAlgodClient
+from source.utils.utils_account import TOKEN
+from source.utils.utils_balances import get_balance_snapshot
+
+DEFAULT_RESULTS_DIR = "benchmark_results"
+DEFAULT_RUN = {
+    "auctions": 1,
+    "bidders": 4,
+    "bids_per_bidder": 5,
+    "concurrency": 4,
+    "reserve": 1_000_000,
+    "min_bid_increment": 100_000,
+    "bidder_funding": 1_000_000_000,
+}
+
+
+# application calls measured by measure_contract, in the order they are made
+CONTRACT_PATHS = ("create", "fund", "first_bid", "outbid", "close_before_start", "close_without_bids", "close_with_bids")
+
+# run by measure_startup in a fresh interpreter: imports Auction, creates an auction on the simulator and bids once
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from algosdk import account
+from source.classes.class_Auction import Auction
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.classes.class_UserAccount import UserAccount
+imported = time.perf_counter()
+client = SimulatedAlgodClient()
+accounts = []
+for _ in range(3):
+    private_key, address = account.generate_account()
+    client.fund_account(address, 100_000_000)
+    accounts.append(UserAccount(private_key))
+artist, auctioneer, bidder = accounts
+now = client.now()
+auction = Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now + 10, end_time=now + 100)
+auction.init_auction()
+client.advance_time(11)
+placed = auction.place_bid(bidder, 1_000_000, with_opt_in=True)
+json.dump({
+    "placed": placed,
+    "import_ms": (imported - started) * 1000,
+    "first_bid_ms": (time.perf_counter() - started) * 1000,
+    "pyteal": "pyteal" in sys.modules,
+}, sys.stdout)
+"""
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """ Nearest-rank percentile of a list of samples """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def current_commit() -> Optional[str]:
+    """ Commit the benchmark runs on, None outside a git checkout """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _start_bidding(client: Any, auctions: List[Auction]) -> None:
+    """ Moves past the start time of the auctions """
+    start_time = max(auction.start_time for auction in auctions)
+    if hasattr(client, "advance_time"):
+        client.advance_time(max(0, start_time - client.now() + 1))
+    else:
+        auctions[0].finish_round()
+
+
+def run_bid_benchmark(client: Any, kmd_client: Any, run: Dict[str, Any]) -> Dict[str, Any]:
+    """ Runs one load level and returns its metrics
+
+        Bid amounts come from one increasing sequence per auction, so bids
+        arriving out of order are rejected the way competing bidders are.
+    """
+    run = {**DEFAULT_RUN, **run}
+    rpc_records = MemorySink()
+    instrumented_client = instrument(client, rpc_records, name="algod")
+
+    users = UserAccounts(kmd_client, batch_size=run["bidders"] + 2, funding_amount=run["bidder_funding"])
+    artist = users.initialize_user_account(instrumented_client)
+    auctioneer = users.initialize_user_account(instrumented_client)
+    bidders = [users.initialize_user_account(instrumented_client) for _ in range(run["bidders"])]
+
+    nfts = [artist.create_asset(instrumented_client) for _ in range(run["auctions"])]
+    now = int(client.now()) if hasattr(client, "now") else int(time())
+    house = AuctionHouse(instrumented_client, auctioneer)
+    house.create_auctions([
+        {
+            "artist": artist,
+            "nft_id": nft,
+            "start_time": now + 10,
+            "end_time": now + 3600,
+            "reserve": run["reserve"],
+            "min_bid_increment": run["min_bid_increment"],
+        }
+        for nft in nfts
+    ])
+    auctions = house.auctions
+    _start_bidding(client, auctions)
+
+    sequences = {auction.app_id: count(1) for auction in auctions}
+    sequence_lock = Lock()
+    bids: List[Tuple[Auction, UserAccount]] = [
+        (auctions[(i + j) % len(auctions)], bidder)
+        for j in range(run["bids_per_bidder"])
+        for i, bidder in enumerate(bidders)
+    ]
+
+    def place(bid: Tuple[Auction, UserAccount]) -> Tuple[bool, float]:
+        auction, bidder = bid
+        with sequence_lock:
+            amount = run["reserve"] + next(sequences[auction.app_id]) * run["min_bid_increment"]
+        started = perf_counter()
+        succeeded = auction.place_bid(bidder, amount)
+        return succeeded, perf_counter() - started
+
+    rpc_records.clear()
+    started = perf_counter()
+    with redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=run["concurrency"]) as executor:
+        outcomes = list(executor.map(place, bids))
+    duration = perf_counter() - started
+    rpc_by_method = rpc_records.summary("method")
+    rpc_by_caller = rpc_records.summary("caller")
+    instrumented_client.remove_sink(rpc_records)
+
+    latencies = [latency * 1000 for succeeded, latency in outcomes if succeeded]
+    succeeded = len(latencies)
+    total_calls = rpc_records.count()
+    return {
+        "auctions": run["auctions"],
+        "bidders": run["bidders"],
+        "concurrency": run["concurrency"],
+        "bids": len(outcomes),
+        "succeeded": succeeded,
+        "failed": len(outcomes) - succeeded,
+        "failure_rate": (len(outcomes) - succeeded) / len(outcomes) if outcomes else 0.0,
+        "duration_s": duration,
+        "bids_per_second": len(outcomes) / duration if duration else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "mean": sum(latencies) / succeeded if succeeded else 0.0,
+            "max": max(latencies, default=0.0),
+        },
+        "rpc_calls": total_calls,
+        "rpc_calls_per_bid": total_calls / len(outcomes) if outcomes else 0.0,
+        "rpc_calls_by_method": {method: entry["count"] for method, entry in rpc_by_method.items()},
+        "rpc_calls_by_caller": {caller: entry["count"] for caller, entry in rpc_by_caller.items()},
+        "rpc_latency_ms_by_method": {method: entry["latency_ms"] / entry["calls"] for method, entry in rpc_by_method.items()},
+        "rpc_bytes": {
+            "request": sum(entry["request_bytes"] for entry in rpc_by_method.values()),
+            "response": sum(entry["response_bytes"] for entry in rpc_by_method.values()),
+        },
+    }
+
+
+def run_scenario(spec: Dict[str, Any], client: Any, kmd_client: Any = None) -> Dict[str, Any]:
+    """ Runs every load level of a scenario spec against a client """
+    runs = [run_bid_benchmark(client, kmd_client, run) for run in spec.get("runs", [{}])]
+    return {
+        "scenario": spec.get("name", "bid-path"),
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "client": type(client).__name__,
+        "runs": runs,
+    }
+
+
+def write_results(results: Dict[str, Any], results_dir: str = DEFAULT_RESULTS_DIR) -> str:
+    """ Writes results as JSON named after scenario, commit and time """
+    os.makedirs(results_dir, exist_ok=True)
+    commit = (results.get("commit") or "nocommit")[:12]
+    stamp = results["timestamp"].replace(":", "").replace("-", "").split(".")[0]
+    path = os.path.join(results_dir, f"{results['scenario']}-{commit}-{stamp}.json")
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+    return path
+
+
+def compare_results(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ Relative change of the headline metrics, run by run """
+    metrics = [
+        ("bids_per_second", lambda run: run["bids_per_second"]),
+        ("p50_ms", lambda run: run["latency_ms"]["p50"]),
+        ("p95_ms", lambda run: run["latency_ms"]["p95"]),
+        ("p99_ms", lambda run: run["latency_ms"]["p99"]),
+        ("failure_rate", lambda run: run["failure_rate"]),
+        ("rpc_calls_per_bid", lambda run: run["rpc_calls_per_bid"]),
+    ]
+    rows = []
+    for index, (old, new) in enumerate(zip(baseline["runs"], candidate["runs"])):
+        for name, value in metrics:
+            before, after = value(old), value(new)
+            rows.append({
+                "run": index,
+                "metric": name,
+                "baseline": before,
+                "candidate": after,
+                "change": (after - before) / before if before else None,
+            })
+    return rows
+
+
+def program_size(teal: str, compiler: Optional[AlgodClient] = None) -> int:
+    """ Size in bytes of the program compiled by the algod compiler
+
+        Without one it is the estimate of bytecode_size, the simulator's
+        compile does not assemble.
+    """
+    if compiler is None:
+        return bytecode_size(teal)
+    return len(b64decode(compiler.compile(teal)["result"]))
+
+
+def measure_contract(contract: str, compiler: Optional[AlgodClient] = None) -> Dict[str, Any]:
+    """ Program size and opcode cost of every call path of an approval program
+
+        The calls are made on a SimulatedAlgodClient, which runs the TEAL
+        and records the cost of each application call. The size comes from
+        compiler, an algod client, and is estimated without one.
+    """
+    client = SimulatedAlgodClient()
+    users = UserAccounts(SimulatedKMDClient(client), batch_size=4)
+    artist, auctioneer, first_bidder, second_bidder = (users.initialize_user_account(client) for _ in range(4))
+    costs: Dict[str, int] = dict()
+
+    def measure(*paths: str) -> Any:
+        """ Records the cost of the application calls made by the next call """
+        def record(action: Any, *args: Any) -> Any:
+            made = len(client.app_call_costs)
+            with redirect_stdout(io.StringIO()):
+                outcome = action(*args)
+            new_costs = list(client.app_call_costs.values())[made:]
+            if len(new_costs) != len(paths):
+                raise RuntimeError(f"{contract}: {' '.join(paths)} made {len(new_costs)} application calls")
+            costs.update(zip(paths, new_costs))
+            return outcome
+        return record
+
+    now = client.now()
+    auctions = [
+        Auction(client, artist, auctioneer, artist.create_asset(client),
+                start_time=now + 10, end_time=now + 100, contract=contract)
+        for _ in range(3)
+    ]
+    with_bids, before_start, without_bids = auctions
+    measure("create", "fund")(with_bids.init_auction)
+    before_start.init_auction()
+    without_bids.init_auction()
+
+    measure("close_before_start")(before_start.close, auctioneer)
+    client.advance_time(10)
+    with_bids.opt_in(second_bidder)
+    measure("first_bid")(with_bids.place_bid, first_bidder, with_bids.reserve)
+    measure("outbid")(with_bids.place_bid, second_bidder, with_bids.reserve + with_bids.min_bid_increment)
+    measure("close_without_bids")(without_bids.close, auctioneer)
+    client.advance_time(100)
+    measure("close_with_bids")(with_bids.close, auctioneer)
+
+    approval_teal, _ = CompiledContracts(client, cache_dir=None, contract=contract).get_teal()
+    return {
+        "contract": contract,
+        "teal_lines": len(approval_teal.splitlines()),
+        "ops": len(assemble(approval_teal, fuse=False).ops) - 1,
+        "size_bytes": program_size(approval_teal, compiler),
+        "size_estimated": compiler is None,
+        "costs": {path: costs[path] for path in CONTRACT_PATHS},
+    }
+
+
+def compare_contracts(
+    baseline: str = "baseline",
+    candidate: str = "optimized",
+    compiler: Optional[AlgodClient] = None) -> List[Dict[str, Any]]:
+    """ Size and per path cost of two approval programs, with the change """
+    before, after = measure_contract(baseline, compiler), measure_contract(candidate, compiler)
+    size = "size_bytes_estimated" if compiler is None else "size_bytes"
+    metrics = [(size, before["size_bytes"], after["size_bytes"])]
+    metrics += [(name, before[name], after[name]) for name in ("ops", "teal_lines")]
+    metrics += [(f"cost_{path}", before["costs"][path], after["costs"][path]) for path in CONTRACT_PATHS]
+    return [
+        {
+            "metric": name,
+            "baseline": old,
+            "candidate": new,
+            "change": (new - old) / old if old else None,
+        }
+        for name, old, new in metrics
+    ]
+
+
+def profile_contract(contract: str = "optimized", compiler: Optional[AlgodClient] = None) -> Dict[str, Any]:
+    """ Static profile of an approval program, with the size of both programs
+
+        Unlike measure_contract nothing is run: every branch of the
+        dispatch is costed from the TEAL alone, see TealProfiler. Program
+        sizes come from compiler, an algod client, and are estimated
+        without one. Per line and per subroutine sizes are always estimated.
+    """
+    approval_teal, clear_teal = CompiledContracts(SimulatedAlgodClient(), cache_dir=None, contract=contract).get_teal()
+    report = TealProfiler(approval_teal).report()
+    if compiler is not None:
+        report["size_bytes"] = program_size(approval_teal, compiler)
+    clear_bytes = program_size(clear_teal, compiler)
+    return {
+        "contract": contract,
+        **report,
+        "size_estimated": compiler is None,
+        "clear_bytes": clear_bytes,
+        "total_bytes": report["size_bytes"] + clear_bytes,
+        "size_limit": MAX_APP_TOTAL_PROGRAM_LEN,
+    }
+
+
+def measure_startup(runs: int = 9, artifacts: Optional[str] = None) -> Dict[str, Any]:
+    """ Median cold start of a process that imports Auction, creates an auction and bids
+
+        Every run is a fresh interpreter, with AUCTION_ARTIFACTS set to
+        artifacts or unset. Programs come from the artifacts or the TEAL
+        cache, so compiling is not part of it. The CPU time of the whole
+        process is steadier than wall time on a loaded host.
+    """
+    environment = {key: value for key, value in os.environ.items() if key != "AUCTION_ARTIFACTS"}
+    if artifacts is not None:
+        environment["AUCTION_ARTIFACTS"] = artifacts
+    environment["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), environment.get("PYTHONPATH")]))
+
+    samples: List[Dict[str, Any]] = []
+    # the first run fills the TEAL cache when it is cold
+    for run in range(runs + 1):
+        before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        started = perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT], env=environment, capture_output=True, text=True, check=True
+        ).stdout
+        wall_ms = (perf_counter() - started) * 1000
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        if run:
+            sample = json.loads(output.strip().splitlines()[-1])
+            sample["process_ms"] = wall_ms
+            sample["process_cpu_ms"] = (after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime) * 1000
+            samples.append(sample)
+
+    return {
+        "runs": runs,
+        "artifacts": artifacts,
+        "placed": all(sample["placed"] for sample in samples),
+        "pyteal_imported": any(sample["pyteal"] for sample in samples),
+        **{key: median(sample[key] for sample in samples) for key in ("import_ms", "first_bid_ms", "process_ms", "process_cpu_ms")},
+    }
+
+
+def measure_transport(requests: int = 2000, concurrency: int = 8, accounts: int = 64) -> List[Dict[str, Any]]:
+    """ The SDK's urllib transport against PooledAlgodClient, both talking to an AlgodStandIn
+
+        Three workloads: requests status calls in a row, as many
+        account_info calls from concurrency threads, and balance snapshots
+        of accounts addresses, which the pooled client pipelines. Each row
+        holds the requests per second, the mean time per request and the
+        connections the server accepted.
+    """
+    rows: List[Dict[str, Any]] = []
+    addresses = [f"STANDIN{number}" for number in range(accounts)]
+    snapshots = max(1, requests // accounts)
+
+    def threaded(client: Any) -> None:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(client.account_info, (addresses[number % accounts] for number in range(requests))))
+
+    workloads = [
+        ("status in a row", requests, lambda client: [client.status() for _ in range(requests)]),
+        (f"account_info on {concurrency} threads", requests, threaded),
+        (f"balance snapshot of {accounts}", snapshots * accounts, lambda client: [get_balance_snapshot(client, addresses) for _ in range(snapshots)]),
+    ]
+    with AlgodStandIn() as server:
+        clients = {
+            "urllib": AlgodClient(TOKEN, server.address),
+            "pooled": PooledAlgodClient(TOKEN, server.address, max_connections=concurrency),
+        }
+        for workload, count, run in workloads:
+            for transport, client in clients.items():
+                connections = server.connections
+                started = perf_counter()
+                run(client)
+                elapsed = perf_counter() - started
+                rows.append({
+                    "workload": workload,
+                    "transport": transport,
+                    "requests": count,
+                    "requests_per_second": count / elapsed,
+                    "mean_us": elapsed / count * 1_000_000,
+                    "connections": server.connections - connections,
+                })
+        clients["pooled"].close()
+    return rows
@@ -0,0 +1,26 @@
+""" Util functions that print the messages of the auction classes """
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from rich import print as rich_print
+
+# set per thread or task, so muting one caller leaves the output of the others alone
+_quiet: ContextVar[bool] = ContextVar("quiet", default=False)
+
+
+def rprint(*objects: Any, **kwargs: Any) -> None:
+    """ rich's print, dropped inside quiet """
+    if not _quiet.get():
+        rich_print(*objects, **kwargs)
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """ Drops what rprint prints in the current thread or task until the block ends """
+    token = _quiet.set(True)
+    try:
+        yield
+    finally:
+        _quiet.reset(token)
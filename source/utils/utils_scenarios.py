@@ -0,0 +1,54 @@
+""" Util functions that render scenario runs with rich """
+
+from typing import Any, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+from source.classes.class_ScenarioRunner import StepListener
+
+
+def make_console() -> Console:
+    """ Console the scenario listeners and tables print to """
+    return Console()
+
+
+def balance_table(balances: Dict[str, Dict[str, int]]) -> Table:
+    """ Algos and NFT held by every actor and the escrow """
+    table = Table(title="Wallets and assets")
+    table.add_column("Person", justify="left", style="yellow1", no_wrap=True)
+    table.add_column("Algos", justify="right", style="blue")
+    table.add_column("NFT", justify="right", style="blue")
+    for name, balance in balances.items():
+        table.add_row(name, str(balance["algos"]), str(balance["nft"]))
+    return table
+
+
+def narrate(console: Console, prefix_names: bool = False) -> StepListener:
+    """ Listener that tells every step as it happens, with the balances it asked for """
+    def listener(scenario: Dict[str, Any], step: Dict[str, Any]) -> None:
+        prefix = f"[white]{scenario['name']}: " if prefix_names else ""
+        if "say" in step:
+            console.print(f"\n{prefix}[green]{step['say']}")
+        actor = f" [yellow1]{step['actor']}" if step["actor"] else ""
+        outcome = "[blue]done" if step["ok"] else "[red]failed"
+        verdict = "" if step["passed"] else " [red bold](not as expected)"
+        detail = f" [white]{step['detail']}" if step["detail"] else ""
+        console.print(f"{prefix}[bold]{step['step']:>2} {step['action']}{actor} {outcome}{verdict}{detail}")
+        if "balances" in step:
+            console.print(balance_table(step["balances"]))
+    return listener
+
+
+def results_table(results: List[Dict[str, Any]]) -> Table:
+    """ One row per scenario run """
+    table = Table(title="Scenarios")
+    table.add_column("Scenario", justify="left", style="yellow1")
+    table.add_column("Steps", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Result", justify="left")
+    for result in results:
+        passed = sum(step["passed"] for step in result["steps"])
+        outcome = "[green]passed" if result["passed"] else f"[red]{result['error']}"
+        table.add_row(result["name"], f"{passed}/{result['planned']}", f"{result['seconds']:.3f}", outcome)
+    return table
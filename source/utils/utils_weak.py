@@ -0,0 +1,12 @@
+""" Util functions for the helpers shared per client, which must not keep their client alive """
+
+from typing import Any
+from weakref import ReferenceType
+
+
+def dereference(reference: "ReferenceType[Any]") -> Any:
+    """ Object behind a weak reference, ReferenceError once it was collected """
+    target = reference()
+    if target is None:
+        raise ReferenceError("the client was garbage collected")
+    return target
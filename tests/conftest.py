@@ -0,0 +1,28 @@
+""" Shared test setup: the compiled TEAL cache lives in a temporary directory """
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# source.classes.class_ContractCompiler reads AUCTION_TEAL_CACHE once, when it is imported
+_TEAL_CACHE = tempfile.mkdtemp(prefix="auction-teal-")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """ Points the TEAL cache at the temporary directory before any test module imports the compiler """
+    os.environ["AUCTION_TEAL_CACHE"] = _TEAL_CACHE
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """ Removes the temporary TEAL cache """
+    shutil.rmtree(_TEAL_CACHE, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_teal_cache() -> str:
+    """ Fails every test if the compiler was imported before the cache was moved """
+    from source.classes.class_ContractCompiler import DEFAULT_CACHE_DIR
+    assert DEFAULT_CACHE_DIR == _TEAL_CACHE, f"TEAL cache is {DEFAULT_CACHE_DIR}, not the temporary one"
+    return DEFAULT_CACHE_DIR
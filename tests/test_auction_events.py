@@ -0,0 +1,151 @@
+""" Tests of the auction event store and the indexer that fills it """
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+from algosdk import account, constants, error
+
+from source.classes.class_Auction import Auction
+from source.classes.class_AuctionEventIndexer import AuctionEventIndexer
+from source.classes.class_AuctionEventStore import (
+    EVENT_BID,
+    EVENT_CLOSE,
+    EVENT_CREATE,
+    EVENT_FUND,
+    EVENT_REFUND,
+    AuctionEvent,
+    AuctionEventStore,
+)
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.classes.class_UserAccount import UserAccount
+from source.utils.utils_console import quiet
+
+FUNDING = 100_000_000
+AUCTION = {"app_id": 7, "nft_id": 3, "seller": "SELLER", "creator": "CREATOR", "start": 10, "end": 20,
+           "reserve_amount": 1_000_000, "min_bid_inc": 100_000, "created_round": 2}
+
+
+def event(round_number: int, position: int, kind: str, account_name: Optional[str], amount: Optional[int], sequence: int = 0) -> Dict[str, Any]:
+    """ Event row of auction 7 as the indexer records it """
+    return {"round": round_number, "position": position, "sequence": sequence, "app_id": 7, "kind": kind,
+            "account": account_name, "amount": amount, "timestamp": 100 + round_number}
+
+
+class BlockSource:
+    """ Client with empty blocks from first to last on one network, or failing every block request """
+
+    def __init__(self, genesis_hash: str, first: int, last: int, failing: bool = False) -> None:
+        self.genesis_hash, self.first, self.last, self.failing = genesis_hash, first, last, failing
+
+    def status(self) -> Dict[str, Any]:
+        return {"last-round": self.last}
+
+    def block_info(self, round_number: int) -> Dict[str, Any]:
+        if self.failing:
+            raise ConnectionResetError("connection closed by the server")
+        if not self.first <= round_number <= self.last:
+            raise error.AlgodHTTPError(f"failed to retrieve information from the ledger: round {round_number} not found", 404)
+        return {"block": {"rnd": round_number, "ts": round_number, "gh": self.genesis_hash, "txns": []}}
+
+
+def test_store_answers_queries() -> None:
+    store = AuctionEventStore(":memory:")
+    store.record_block("network", 2, [AUCTION], [event(2, 0, EVENT_CREATE, "CREATOR", None)])
+    store.record_block("network", 3, [], [event(3, 1, EVENT_BID, "ALICE", 1_000_000), event(3, 4, EVENT_BID, "BOB", 1_100_000),
+                                           event(3, 4, EVENT_REFUND, "ALICE", 1_000_000, sequence=1)])
+    store.record_block("network", 5, [], [event(5, 0, EVENT_CLOSE, "BOB", 1_100_000)])
+
+    assert store.cursor() == {"genesis_hash": "network", "round": 5}
+    assert store.auction(7) == AUCTION and store.auction(8) is None
+    assert store.auction_ids() == [7]
+    assert [bid.account for bid in store.bid_history(7)] == ["ALICE", "BOB"]
+    assert store.bids_by("ALICE") == [AuctionEvent(7, 3, 103, EVENT_BID, "ALICE", 1_000_000)]
+    assert store.highest_bid(7) == AuctionEvent(7, 3, 103, EVENT_BID, "BOB", 1_100_000)
+    assert [e.kind for e in store.events_between(3, 4)] == [EVENT_BID, EVENT_BID, EVENT_REFUND]
+    assert [e.kind for e in store.events(7, EVENT_CLOSE)] == [EVENT_CLOSE]
+
+
+def test_recording_a_block_twice_changes_nothing() -> None:
+    store = AuctionEventStore(":memory:")
+    for _ in range(2):
+        store.record_block("network", 2, [AUCTION], [event(2, 0, EVENT_CREATE, "CREATOR", None)])
+    assert len(store.events(7)) == 1 and store.auction_ids() == [7]
+
+
+def test_store_survives_reopening(tmp_path: Any) -> None:
+    path = str(tmp_path / "events.db")
+    store = AuctionEventStore(path)
+    store.record_block("network", 2, [AUCTION], [event(2, 0, EVENT_CREATE, "CREATOR", None)])
+    store.close()
+    reopened = AuctionEventStore(path)
+    assert reopened.cursor() == {"genesis_hash": "network", "round": 2}
+    reopened.reset()
+    assert reopened.cursor() is None and reopened.auction_ids() == [] and reopened.events(7) == []
+
+
+def test_indexer_records_an_auction() -> None:
+    client = SimulatedAlgodClient()
+    artist, auctioneer, first, second = (UserAccount(account.generate_account()[0]) for _ in range(4))
+    for actor in (artist, auctioneer, first, second):
+        client.fund_account(actor.get_address(), FUNDING)
+    with quiet():
+        now = client.now()
+        auction = Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now + 10, end_time=now + 100)
+        auction.init_auction()
+        client.advance_time(11)
+        assert auction.place_bid(first, 2_000_000, with_opt_in=True)
+        assert auction.place_bid(second, 2_200_000, with_opt_in=True)
+        client.advance_time(100)
+        assert auction.close(auctioneer)
+
+    store = AuctionEventStore(":memory:")
+    indexer = AuctionEventIndexer(client, store)
+    assert indexer.sync() == client.status()["last-round"]
+    assert indexer.sync() == 0
+
+    events = [(e.kind, e.account, e.amount) for e in store.events(auction.app_id)]
+    assert events[0][0] == EVENT_CREATE and events[1][0] == EVENT_FUND
+    assert events[2:] == [
+        (EVENT_BID, first.get_address(), 2_000_000),
+        (EVENT_BID, second.get_address(), 2_200_000),
+        # the contract pays the fee of the refund out of it
+        (EVENT_REFUND, first.get_address(), 2_000_000 - constants.min_txn_fee),
+        (EVENT_CLOSE, second.get_address(), 2_200_000),
+    ]
+    assert store.auction(auction.app_id)["nft_id"] == auction.nft_id
+
+
+def synced_store() -> AuctionEventStore:
+    """ Store holding rounds 1 to 5 of network A """
+    store = AuctionEventStore(":memory:")
+    AuctionEventIndexer(BlockSource("A", 1, 5), store, programs=[]).sync()
+    return store
+
+
+def test_sync_raises_transport_errors_and_keeps_the_store() -> None:
+    store = synced_store()
+    with pytest.raises(ConnectionResetError):
+        AuctionEventIndexer(BlockSource("A", 1, 9, failing=True), store, programs=[]).sync(9)
+    assert store.cursor() == {"genesis_hash": "A", "round": 5}
+
+
+def test_sync_raises_when_the_cursor_round_is_pruned() -> None:
+    store = synced_store()
+    with pytest.raises(Exception, match="Round 5 .* not available"):
+        AuctionEventIndexer(BlockSource("A", 6, 9), store, programs=[]).sync()
+    assert store.cursor() == {"genesis_hash": "A", "round": 5}
+
+
+@pytest.mark.parametrize("first, last", [(1, 3), (0, 9)])
+def test_sync_starts_over_on_another_network(first: int, last: int) -> None:
+    store = synced_store()
+    with quiet():
+        ingested = AuctionEventIndexer(BlockSource("B", first, last), store, programs=[]).sync()
+    assert ingested == last
+    assert store.cursor() == {"genesis_hash": "B", "round": last}
+
+
+def test_sync_continues_after_the_cursor() -> None:
+    store = synced_store()
+    assert AuctionEventIndexer(BlockSource("A", 1, 9), store, programs=[]).sync() == 4
+    assert store.cursor() == {"genesis_hash": "A", "round": 9}
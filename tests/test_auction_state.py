@@ -0,0 +1,91 @@
+""" Tests of reading global-state deltas into AuctionState """
+
+from base64 import b64encode
+
+from algosdk import account, encoding
+
+from source.classes.class_Auction import Auction
+from source.classes.class_AuctionState import AuctionState, AuctionStateDecoder, decode_auction_state
+from source.classes.class_BlockFollower import BlockFollower
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient, block_delta
+from source.classes.class_UserAccount import UserAccount
+from source.utils.utils_console import quiet
+
+FUNDING = 100_000_000
+
+
+def test_block_delta_keys_and_bytes_are_raw_strings() -> None:
+    public_key = b"bidder-public-key-of-32-bytes!!!"
+    delta = [
+        {"key": b64encode(b"bid_account").decode(), "value": {"action": 1, "bytes": b64encode(public_key).decode()}},
+        {"key": b64encode(b"bid_amount").decode(), "value": {"action": 2, "uint": 2_000_000}},
+        {"key": b64encode(b"nft_id").decode(), "value": {"action": 2, "uint": 0}},
+    ]
+    assert block_delta(delta) == {
+        "bid_account": {"at": 1, "bs": public_key.decode()},
+        "bid_amount": {"at": 2, "ui": 2_000_000},
+        "nft_id": {"at": 2},
+    }
+    # every byte that is not valid UTF-8 is replaced on its own, as algod's JSON encoder does
+    assert block_delta([{"key": b64encode(b"k").decode(), "value": {"action": 1, "bytes": b64encode(b"\xff\xfea").decode()}}]) == {
+        "k": {"at": 1, "bs": "\ufffd\ufffda"},
+    }
+
+
+def test_apply_block_delta() -> None:
+    public_key = b"bidder-public-key-of-32-bytes!!!"
+    state = AuctionState(nft_id=7, bid_amount=1_000_000)
+    updated = AuctionStateDecoder().apply_delta(state, {
+        "bid_account": {"at": 1, "bs": public_key.decode()},
+        "bid_amount": {"at": 2, "ui": 2_000_000},
+        "nft_id": {"at": 3},
+        "not_a_field": {"at": 2, "ui": 1},
+    })
+    assert updated is not None
+    assert (updated.bid_account, updated.bid_amount, updated.nft_id) == (encoding.encode_address(public_key), 2_000_000, 0)
+    assert (state.bid_account, state.bid_amount, state.nft_id) == (None, 1_000_000, 7)
+
+
+def test_apply_block_delta_with_mangled_address() -> None:
+    state = AuctionState(bid_amount=1_000_000)
+    assert AuctionStateDecoder().apply_delta(state, {"bid_account": {"at": 1, "bs": "\ufffd" + "a" * 31}}) is None
+    assert AuctionStateDecoder().apply_delta(state, {"bid_account": {"at": 1, "bs": "\ufffd" * 32}}) is None
+
+
+def test_apply_pending_transaction_delta() -> None:
+    public_key = b"bidder-public-key-of-32-bytes!!!"
+    updated = AuctionStateDecoder().apply_delta(AuctionState(), [
+        {"key": b64encode(b"bid_account").decode(), "value": {"action": 1, "bytes": b64encode(public_key).decode()}},
+        {"key": b64encode(b"bid_amount").decode(), "value": {"action": 2, "uint": 2_000_000}},
+    ])
+    assert updated is not None
+    assert (updated.bid_account, updated.bid_amount) == (encoding.encode_address(public_key), 2_000_000)
+
+
+def test_follower_reads_simulated_blocks() -> None:
+    client = SimulatedAlgodClient()
+    artist, auctioneer, bidder = (UserAccount(account.generate_account()[0]) for _ in range(3))
+    for actor in (artist, auctioneer, bidder):
+        client.fund_account(actor.get_address(), FUNDING)
+    with quiet():
+        now = client.now()
+        auction = Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now + 10, end_time=now + 100)
+        auction.init_auction()
+        client.advance_time(11)
+        follower = BlockFollower(client)
+        follower.subscribe(auction.app_id)
+        follower.poll()
+        before = follower.state(auction.app_id)
+        assert auction.place_bid(bidder, 2_000_000, with_opt_in=True)
+
+    last_round = client.status()["last-round"]
+    entry = next(entry for entry in client.block_info(last_round)["block"]["txns"] if entry.get("dt", {}).get("gd"))
+    delta = entry["dt"]["gd"]
+    assert delta["bid_amount"] == {"at": 2, "ui": 2_000_000}
+    public_key = encoding.decode_address(bidder.get_address())
+    expected = decode_auction_state(client.application_info(auction.app_id)["params"]["global-state"])
+    readable = len(delta["bid_account"]["bs"].encode()) == len(public_key)
+    assert AuctionStateDecoder().apply_delta(before, delta) == (expected if readable else None)
+
+    follower.poll()
+    assert follower.state(auction.app_id) == expected
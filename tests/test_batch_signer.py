@@ -0,0 +1,49 @@
+""" Tests of the batch signer against the SDK's own signing """
+
+from typing import List, Tuple
+
+from algosdk import account, encoding
+from algosdk.future import transaction
+
+from source.classes.class_BatchSigner import BatchSigner, sign_transactions
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+
+
+def payments(count: int) -> List[Tuple[transaction.Transaction, str]]:
+    """ count payments from three senders, each paired with its sender's key """
+    params = SimulatedAlgodClient().suggested_params()
+    keys = [account.generate_account()[0] for _ in range(3)]
+    receiver = account.generate_account()[1]
+    return [
+        (transaction.PaymentTxn(account.address_from_private_key(keys[index % 3]), params, receiver, 1_000 + index), keys[index % 3])
+        for index in range(count)
+    ]
+
+
+def encoded(signed: List[transaction.SignedTransaction]) -> List[str]:
+    """ msgpack encoding of each signed transaction """
+    return [encoding.msgpack_encode(txn) for txn in signed]
+
+
+def test_inline_signatures_match_the_sdk() -> None:
+    pairs = payments(10)
+    assert encoded(sign_transactions(pairs)) == encoded([txn.sign(key) for txn, key in pairs])
+
+
+def test_worker_processes_keep_the_input_order() -> None:
+    pairs = payments(20)
+    signer = BatchSigner(workers=2, threshold=5, chunk_size=3)
+    try:
+        assert encoded(signer.sign(pairs)) == encoded([txn.sign(key) for txn, key in pairs])
+        assert signer.executor is not None
+    finally:
+        signer.close()
+    assert signer.executor is None
+
+
+def test_key_of_another_account_sets_the_authorizing_address() -> None:
+    [(txn, _)] = payments(1)
+    rekeyed_to, address = account.generate_account()
+    (signed,) = BatchSigner().sign([(txn, rekeyed_to)])
+    assert signed.authorizing_address == address
+    assert encoding.msgpack_encode(signed) == encoding.msgpack_encode(txn.sign(rekeyed_to))
@@ -0,0 +1,75 @@
+""" Tests of the prepared bid group against the SDK constructors """
+
+from typing import List, Optional
+
+import pytest
+from algosdk import account, encoding, error
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from source.classes import class_BidTemplate
+from source.classes.class_BidTemplate import PUBLIC_KEY_CACHE_SIZE, BidTemplate, public_key
+
+APP_ID = 42
+NFT_ID = 7
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+PARAMS = {
+    "flat": transaction.SuggestedParams(2_000, 100, 1_100, GENESIS_HASH, "testnet-v1.0", flat_fee=True),
+    "per byte": transaction.SuggestedParams(3, 100, 1_100, GENESIS_HASH, "testnet-v1.0"),
+    "minimum": transaction.SuggestedParams(0, 100, 1_100, GENESIS_HASH, "testnet-v1.0"),
+    "no genesis id": transaction.SuggestedParams(1_000, 5, 1_005, GENESIS_HASH, "", flat_fee=True),
+}
+
+
+def sdk_group(bidder: str, amount: int, highest_bidder: Optional[str], params: transaction.SuggestedParams, opt_in: bool) -> List[transaction.Transaction]:
+    """ Bid group as the SDK constructors build it """
+    escrow = get_application_address(APP_ID)
+    group: List[transaction.Transaction] = [
+        transaction.PaymentTxn(bidder, params, escrow, amount),
+        transaction.ApplicationCallTxn(
+            bidder, params, APP_ID, transaction.OnComplete.NoOpOC, app_args=[b"bid"], foreign_assets=[NFT_ID],
+            accounts=[highest_bidder] if highest_bidder is not None else None,
+        ),
+    ]
+    if opt_in:
+        group.insert(0, transaction.AssetOptInTxn(bidder, params, NFT_ID))
+    return transaction.assign_group_id(group)
+
+
+@pytest.mark.parametrize("params", PARAMS.values(), ids=PARAMS.keys())
+@pytest.mark.parametrize("opt_in", [False, True])
+@pytest.mark.parametrize("with_highest_bidder", [False, True])
+def test_template_encodes_like_the_sdk(params: transaction.SuggestedParams, opt_in: bool, with_highest_bidder: bool) -> None:
+    template = BidTemplate(APP_ID, NFT_ID)
+    bidder = account.generate_account()[1]
+    highest_bidder = account.generate_account()[1] if with_highest_bidder else None
+    built = template.build(bidder, 1_500_000, highest_bidder, params, opt_in)
+    expected = sdk_group(bidder, 1_500_000, highest_bidder, params, opt_in)
+    assert [encoding.msgpack_encode(txn) for txn in built] == [encoding.msgpack_encode(txn) for txn in expected]
+    assert [txn.get_txid() for txn in built] == [txn.get_txid() for txn in expected]
+    assert [txn.fee for txn in built] == [txn.fee for txn in expected]
+
+
+def test_builds_do_not_share_state() -> None:
+    template = BidTemplate(APP_ID, NFT_ID)
+    first_bidder, second_bidder = account.generate_account()[1], account.generate_account()[1]
+    first = template.build(first_bidder, 1_000_000, None, PARAMS["flat"], opt_in=True)
+    second = template.build(second_bidder, 2_000_000, first_bidder, PARAMS["per byte"])
+    assert [txn.sender for txn in first] == [first_bidder] * 3
+    assert first[1].amt == 1_000_000 and first[2].accounts == []
+    assert first[0].receiver == first_bidder
+    assert second[0].amt == 2_000_000 and second[1].accounts == [first_bidder]
+    assert template.payment.sender == template.call.sender == template.escrow_address and template.payment.amt == 0
+
+
+@pytest.mark.parametrize("amount", [-1, 1.5, "100"])
+def test_amount_must_be_a_non_negative_integer(amount: object) -> None:
+    with pytest.raises(error.WrongAmountType):
+        BidTemplate(APP_ID, NFT_ID).build(account.generate_account()[1], amount, None, PARAMS["flat"])
+
+
+def test_public_key_cache_is_bounded() -> None:
+    addresses = [account.generate_account()[1] for _ in range(PUBLIC_KEY_CACHE_SIZE + 10)]
+    for address in addresses:
+        assert public_key(address) == encoding.decode_address(address)
+    assert len(class_BidTemplate._public_keys) <= PUBLIC_KEY_CACHE_SIZE
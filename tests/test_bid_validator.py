@@ -0,0 +1,85 @@
+""" Tests of the local bid checks against cached auction state """
+
+import pytest
+from algosdk import account, error
+
+from source.classes.class_Auction import Auction
+from source.classes.class_AuctionState import AuctionState
+from source.classes.class_BidValidator import BID_TOO_EARLY, BID_TOO_LATE, BID_TOO_LOW, BID_TOO_SMALL, BidValidator
+from source.classes.class_TealEvaluator import TealEvaluator
+from source.utils.utils_auction import MIN_TRANSACTION_COST
+from source.utils.utils_console import quiet
+from tests.test_teal_evaluator import AMOUNTS, bid_group, evaluate, new_actors, new_client
+
+START, END = 1_000, 2_000
+BIDDER = account.generate_account()[1]
+
+
+def validator_at(timestamp: int, bid_amount: int = 0) -> BidValidator:
+    """ Validator of an auction open from START to END, with one bid of bid_amount when it is not 0 """
+    validator = BidValidator()
+    validator.update_state(AuctionState(start=START, end=END, min_bid_inc=100), last_round=5)
+    validator.observe_timestamp(timestamp)
+    if bid_amount:
+        validator.observe_bid(BIDDER, bid_amount, confirmed_round=6)
+    return validator
+
+
+def test_bids_outside_the_auction_are_rejected() -> None:
+    assert validator_at(START - 1).check(5_000) == BID_TOO_EARLY
+    assert validator_at(END).check(5_000) == BID_TOO_LATE
+    assert validator_at(START).check(5_000) is None
+
+
+def test_bids_must_cover_the_fee_and_outbid_by_the_increment() -> None:
+    validator = validator_at(START)
+    assert validator.check(MIN_TRANSACTION_COST - 1) == BID_TOO_SMALL
+    assert validator.min_bid() == MIN_TRANSACTION_COST
+    validator = validator_at(START, bid_amount=5_000)
+    assert validator.highest_bidder() == BIDDER
+    assert validator.check(5_099) == BID_TOO_LOW
+    assert validator.check(5_100) is None
+    assert "5100" in validator.message(BID_TOO_LOW)
+    with pytest.raises(error.WrongAmountType):
+        validator.check(-1)
+
+
+def test_state_and_time_only_move_forward() -> None:
+    validator = validator_at(START, bid_amount=5_000)
+    assert validator.round == 6 and validator.is_current(6) and not validator.is_current(7)
+    # a smaller confirmed bid is older than the cached one
+    validator.observe_bid(account.generate_account()[1], 4_000, confirmed_round=7)
+    assert (validator.highest_bidder(), validator.state.bid_amount, validator.round) == (BIDDER, 5_000, 6)
+    validator.observe_timestamp(START - 10)
+    assert validator.timestamp == START
+    validator.invalidate()
+    assert not validator.is_current(0)
+
+
+def test_checks_agree_with_the_contract_on_current_state() -> None:
+    client = new_client()
+    artist, auctioneer, first, second = new_actors(client, [account.generate_account()[0] for _ in range(4)])
+    with quiet():
+        now = client.now()
+        auction = Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now + 10, end_time=now + 100)
+        auction.init_auction()
+        client.advance_time(11)
+        assert auction.place_bid(first, 2_000_000, with_opt_in=True)
+    teal = client.apps[auction.app_id]["approval"][1:].decode()
+    validator = auction.refresh_state()
+    auction.latest_timestamp()
+    for amount in AMOUNTS:
+        passed = evaluate(client, TealEvaluator(teal), bid_group(client, auction, second, first, amount), 1, auction.app_id).passed
+        assert (validator.check(amount) is None) == passed
+
+
+def test_finish_round_exits_when_the_node_clock_is_far_ahead() -> None:
+    client = new_client()
+    artist, auctioneer = new_actors(client, [account.generate_account()[0] for _ in range(2)])
+    with quiet():
+        now = client.now()
+        auction = Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now - 1001, end_time=now + 100)
+        with pytest.raises(SystemExit) as exited:
+            auction.finish_round()
+    assert exited.value.code == 1
+    assert auction.bid_validator.timestamp == now
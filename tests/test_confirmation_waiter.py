@@ -0,0 +1,189 @@
+""" Tests of the confirmation waiter shared by the callers of a client """
+
+import gc
+from collections import Counter
+from threading import Event, Lock
+from typing import Any, Dict, List, Optional, Sequence, Union
+from weakref import ref
+
+import pytest
+from algosdk import error
+from algosdk.kmd import KMDClient
+
+from source.classes import class_AsyncConfirmationWaiter, class_BlockFollower, class_ConfirmationWaiter, class_ParamsProvider
+from source.classes.class_ConfirmationWaiter import ConfirmationWaiter, get_confirmation_waiter
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.utils import utils_account
+
+WAIT_SECONDS = 5
+
+
+class ScriptedClient:
+    """ Node whose transactions confirm or fail in the rounds given, and that counts lookups """
+
+    def __init__(self, confirm: Optional[Dict[str, int]] = None, pool_errors: Optional[Dict[str, str]] = None) -> None:
+        self.round = 1
+        self.confirm = confirm or dict()
+        self.pool_errors = pool_errors or dict()
+        self.lookups: Counter = Counter()
+        self.failing_status: Optional[Exception] = None
+        self.lock = Lock()
+        # cleared, it holds the waiter's thread back until every caller has submitted
+        self.open = Event()
+        self.open.set()
+
+    def status(self) -> Dict[str, Any]:
+        self.open.wait()
+        return {"last-round": self.round}
+
+    def status_after_block(self, round_number: int) -> Dict[str, Any]:
+        if self.failing_status is not None:
+            raise self.failing_status
+        with self.lock:
+            self.round = max(self.round, round_number + 1)
+        return self.status()
+
+    def pending_transaction_info(self, transaction_id: str) -> Dict[str, Any]:
+        self.lookups[transaction_id] += 1
+        if transaction_id not in self.confirm and transaction_id not in self.pool_errors:
+            raise error.AlgodHTTPError("txn does not exist", 404)
+        confirmed = self.confirm.get(transaction_id, 0)
+        return {
+            "confirmed-round": confirmed if 0 < confirmed <= self.round else 0,
+            "pool-error": self.pool_errors.get(transaction_id, ""),
+            "txn": {"txn": {"type": "pay"}},
+        }
+
+
+class BatchingClient(ScriptedClient):
+    """ ScriptedClient that also answers pending_transaction_infos, or fails every batch """
+
+    def __init__(self, *args: Any, failing_batches: bool = False, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.batches = 0
+        self.failing_batches = failing_batches
+
+    def pending_transaction_infos(self, transaction_ids: Sequence[str]) -> List[Union[Dict[str, Any], Exception]]:
+        self.batches += 1
+        if self.failing_batches:
+            raise ConnectionResetError("connection closed by the server")
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for transaction_id in transaction_ids:
+            try:
+                results.append(self.pending_transaction_info(transaction_id))
+            except error.AlgodHTTPError as exception:
+                results.append(exception)
+        return results
+
+
+def test_waiters_of_one_transaction_share_its_lookups() -> None:
+    client = ScriptedClient(confirm={"A": 4, "B": 2})
+    client.open.clear()
+    waiter = ConfirmationWaiter(client)
+    futures = [waiter.submit("A") for _ in range(5)] + [waiter.submit("B")]
+    client.open.set()
+    assert {future.result(WAIT_SECONDS).confirmed_round for future in futures} == {4, 2}
+    # one lookup per round while A is pending, however many callers wait for it
+    assert client.lookups["A"] == 4
+    assert client.lookups["B"] == 2
+
+
+def test_wait_all_keeps_the_input_order() -> None:
+    client = ScriptedClient(confirm={"A": 5, "B": 2, "C": 3})
+    assert [txn.confirmed_round for txn in ConfirmationWaiter(client).wait_all(["A", "B", "C"])] == [5, 2, 3]
+
+
+def test_pool_error_fails_the_transaction() -> None:
+    client = ScriptedClient(confirm={"A": 2}, pool_errors={"B": "overspend"})
+    waiter = ConfirmationWaiter(client)
+    confirmed, rejected = waiter.submit("A"), waiter.submit("B")
+    with pytest.raises(Exception, match="Pool Error: overspend"):
+        rejected.result(WAIT_SECONDS)
+    assert confirmed.result(WAIT_SECONDS).confirmed_round == 2
+
+
+def test_timeout_counts_rounds() -> None:
+    client = ScriptedClient(confirm={"A": 50})
+    waiter = ConfirmationWaiter(client)
+    with pytest.raises(Exception, match="not confirmed after 3 rounds"):
+        waiter.wait("A", timeout=3)
+    assert client.lookups["A"] == 3
+    with pytest.raises(Exception, match="not confirmed after 0 rounds"):
+        waiter.submit("A", timeout=0).result(WAIT_SECONDS)
+
+
+def test_batches_fetch_every_pending_transaction_at_once() -> None:
+    client = BatchingClient(confirm={"A": 2, "B": 3})
+    client.open.clear()
+    waiter = ConfirmationWaiter(client)
+    futures = [waiter.submit(transaction_id) for transaction_id in ("A", "B", "unknown")]
+    client.open.set()
+    with pytest.raises(error.AlgodHTTPError):
+        futures[2].result(WAIT_SECONDS)
+    assert [future.result(WAIT_SECONDS).confirmed_round for future in futures[:2]] == [2, 3]
+    # B is left alone in the last round and looked up on its own
+    assert client.batches == 2
+
+
+def test_failed_batch_falls_back_to_one_lookup_per_transaction() -> None:
+    client = BatchingClient(confirm={"A": 2, "B": 3}, failing_batches=True)
+    client.open.clear()
+    waiter = ConfirmationWaiter(client)
+    futures = [waiter.submit(transaction_id) for transaction_id in ("A", "B", "unknown")]
+    client.open.set()
+    with pytest.raises(error.AlgodHTTPError):
+        futures[2].result(WAIT_SECONDS)
+    assert [future.result(WAIT_SECONDS).confirmed_round for future in futures[:2]] == [2, 3]
+    assert client.batches == 2
+    assert client.lookups == {"A": 2, "B": 3, "unknown": 1}
+
+
+def test_lost_node_fails_every_waiter_and_the_waiter_recovers() -> None:
+    client = ScriptedClient(confirm={"A": 5, "B": 5})
+    client.failing_status = ConnectionResetError("connection closed by the server")
+    waiter = ConfirmationWaiter(client)
+    futures = [waiter.submit("A"), waiter.submit("B")]
+    for future in futures:
+        with pytest.raises(ConnectionResetError):
+            future.result(WAIT_SECONDS)
+    client.failing_status = None
+    assert waiter.wait("A").confirmed_round == 5
+    assert not waiter.waiting
+
+
+def test_one_waiter_per_client() -> None:
+    client = SimulatedAlgodClient()
+    assert get_confirmation_waiter(client) is get_confirmation_waiter(client)
+    assert get_confirmation_waiter(client) is not get_confirmation_waiter(SimulatedAlgodClient())
+
+
+def test_shared_helpers_let_their_client_be_collected() -> None:
+    client = SimulatedAlgodClient()
+    kmd_client = KMDClient("a" * 64, "http://localhost:4002")
+    helpers = [
+        get_confirmation_waiter(client),
+        class_ParamsProvider.get_params_provider(client),
+        class_AsyncConfirmationWaiter.get_async_confirmation_waiter(client),
+        class_BlockFollower.get_block_follower(client),
+        utils_account.get_kmd_session(kmd_client),
+    ]
+    references = [ref(client), ref(kmd_client)]
+    del client, kmd_client
+    gc.collect()
+    assert [reference() for reference in references] == [None, None]
+    for cache in (class_ConfirmationWaiter._waiters, class_ParamsProvider._providers,
+                  class_AsyncConfirmationWaiter._waiters, class_BlockFollower._followers, utils_account._sessions):
+        assert not any(helper in helpers for helper in cache.values())
+    with pytest.raises(ReferenceError):
+        helpers[0].client.status()
+
+
+def test_waiter_of_a_collected_client_stops_polling() -> None:
+    client = ScriptedClient()
+    waiter = ConfirmationWaiter(client)
+    future = waiter.submit("A", timeout=10 ** 9)
+    del client
+    gc.collect()
+    with pytest.raises(ReferenceError):
+        future.result(WAIT_SECONDS)
+    assert waiter.thread is None and not waiter.waiting
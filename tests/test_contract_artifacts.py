@@ -0,0 +1,56 @@
+""" Tests of the contract artifacts built ahead of time """
+
+import json
+import os
+from pathlib import Path
+
+from source.classes.class_ContractArtifacts import ARTIFACT_FORMAT, ContractArtifacts, load_artifacts
+from source.classes.class_ContractCompiler import CompiledContracts, build_artifacts
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.contracts import APPROVAL_PROGRAMS, CONTRACT_INTERFACE
+from source.utils.utils_console import quiet
+
+
+def test_built_artifacts_hold_the_compiled_programs(tmp_path: Path) -> None:
+    client = SimulatedAlgodClient()
+    directory = str(tmp_path / "artifacts")
+    build_artifacts([client], directory)
+    artifacts = load_artifacts(directory)
+    assert artifacts is not None and artifacts.is_current()
+    assert artifacts.contracts() == list(APPROVAL_PROGRAMS)
+    assert artifacts.interface() == CONTRACT_INTERFACE
+    for contract in APPROVAL_PROGRAMS:
+        compiled = CompiledContracts(client, cache_dir=None, contract=contract).get_compiled_contracts()
+        assert artifacts.programs(contract, "simulator") == compiled
+        assert artifacts.programs(contract, "algod") is None
+        assert os.path.exists(os.path.join(directory, f"{contract}.approval.teal"))
+    # read once per process
+    assert load_artifacts(directory) is artifacts
+
+
+def test_compiled_contracts_prefer_the_artifacts(tmp_path: Path) -> None:
+    artifacts = ContractArtifacts(str(tmp_path))
+    artifacts.add("baseline", "simulator", b"approval", b"clear", "#pragma version 5", "#pragma version 5")
+    contracts = CompiledContracts(SimulatedAlgodClient(), cache_dir=None, contract="baseline", artifacts=artifacts)
+    assert contracts.is_built()
+    assert contracts.get_compiled_contracts() == (b"approval", b"clear")
+
+
+def test_missing_stale_and_foreign_manifests_are_ignored(tmp_path: Path) -> None:
+    with quiet():
+        assert load_artifacts(None) is None
+        assert load_artifacts(str(tmp_path / "missing")) is None
+
+        stale = ContractArtifacts(str(tmp_path / "stale"))
+        stale.save(CONTRACT_INTERFACE)
+        with open(stale.path) as manifest_file:
+            manifest = json.load(manifest_file)
+        manifest["source"] = "0" * 64
+        with open(stale.path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        assert load_artifacts(stale.directory) is None
+
+        manifest["format"] = ARTIFACT_FORMAT + 1
+        with open(stale.path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        assert not ContractArtifacts(stale.directory).load()
@@ -0,0 +1,68 @@
+""" Tests of the scheduler that closes auctions past their end time """
+
+from typing import List, Tuple
+
+from algosdk import account, error
+
+from source.classes.class_Auction import Auction
+from source.classes.class_DeadlineScheduler import DeadlineScheduler
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+from source.classes.class_UserAccount import UserAccount
+from source.utils.utils_console import quiet
+
+FUNDING = 100_000_000
+
+
+def scheduled_auctions(durations: List[int], group_size: int = 16) -> Tuple[SimulatedAlgodClient, DeadlineScheduler, List[Auction]]:
+    """ Started auctions ending after each of durations seconds, scheduled to be closed by their auctioneer """
+    client = SimulatedAlgodClient()
+    artist, auctioneer, bidder = (UserAccount(account.generate_account()[0]) for _ in range(3))
+    for user in (artist, auctioneer, bidder):
+        client.fund_account(user.get_address(), FUNDING)
+    with quiet():
+        now = client.now()
+        auctions = [
+            Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now + 10, end_time=now + 10 + duration)
+            for duration in durations
+        ]
+        for auction in auctions:
+            auction.init_auction()
+        client.advance_time(10)
+        assert auctions[0].place_bid(bidder, 2_000_000, with_opt_in=True)
+    scheduler = DeadlineScheduler(client, auctioneer, group_size=group_size)
+    scheduler.schedule(auctions)
+    return client, scheduler, auctions
+
+
+def is_deleted(client: SimulatedAlgodClient, auction: Auction) -> bool:
+    """ True once the application of auction is gone """
+    try:
+        client.application_info(auction.app_id)
+    except error.AlgodHTTPError:
+        return True
+    return False
+
+
+def test_auctions_close_in_order_of_their_end_time() -> None:
+    client, scheduler, (late, early, middle) = scheduled_auctions([300, 100, 200])
+    assert scheduler.next_deadline() == early.end_time
+    with quiet():
+        assert scheduler.tick() == []
+        client.advance_time(100)
+        assert scheduler.tick() == [early]
+        assert scheduler.pending() == 2
+        client.advance_time(200)
+        assert sorted(auction.app_id for auction in scheduler.tick()) == sorted([late.app_id, middle.app_id])
+    assert scheduler.pending() == 0 and scheduler.next_deadline() is None
+    assert all(is_deleted(client, auction) for auction in (late, early, middle))
+
+
+def test_auction_closed_by_hand_does_not_hold_back_the_others() -> None:
+    client, scheduler, auctions = scheduled_auctions([100, 100, 100], group_size=3)
+    with quiet():
+        client.advance_time(100)
+        assert auctions[1].close(auctions[1].auctioneer)
+        closed = scheduler.tick()
+    assert sorted(auction.app_id for auction in closed) == sorted([auctions[0].app_id, auctions[2].app_id])
+    assert scheduler.pending() == 0
+    assert all(is_deleted(client, auction) for auction in auctions)
@@ -0,0 +1,82 @@
+""" Tests of the suggested params shared by the callers of a client """
+
+import asyncio
+from typing import Any
+
+from source.classes.class_ParamsProvider import ParamsProvider, get_params_provider, suggested_params
+from source.classes.class_SimulatedAlgodClient import SimulatedAlgodClient
+
+
+class CountingClient(SimulatedAlgodClient):
+    """ Simulator that counts its suggested_params requests """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.requests = 0
+
+    def suggested_params(self, **kwargs: Any) -> Any:
+        self.requests += 1
+        return super().suggested_params(**kwargs)
+
+
+class AsyncCountingClient(CountingClient):
+    """ CountingClient whose suggested_params is a coroutine """
+
+    async def suggested_params(self, **kwargs: Any) -> Any:
+        return super().suggested_params(**kwargs)
+
+
+def test_params_are_fetched_once_within_the_ttl() -> None:
+    client = CountingClient()
+    provider = ParamsProvider(client)
+    assert provider.get() is provider.get()
+    assert client.requests == 1
+
+
+def test_expired_and_invalidated_params_are_fetched_again() -> None:
+    client = CountingClient()
+    provider = ParamsProvider(client, ttl=0)
+    provider.get()
+    provider.get()
+    assert client.requests == 2
+    provider = ParamsProvider(client)
+    provider.get()
+    provider.invalidate()
+    provider.get()
+    assert client.requests == 4
+
+
+def test_observed_rounds_move_the_validity_window() -> None:
+    client = CountingClient()
+    provider = ParamsProvider(client)
+    params = provider.get()
+    window = params.last - params.first
+    provider.observe_round(params.first + 5)
+    moved = provider.get()
+    assert (moved.first, moved.last) == (params.first + 5, params.first + 5 + window)
+    assert (moved.fee, moved.gh, moved.min_fee) == (params.fee, params.gh, params.min_fee)
+    # older rounds never move the window back
+    provider.observe_round(params.first)
+    assert provider.get() is moved
+    assert client.requests == 1
+
+
+def test_async_clients_share_the_cache() -> None:
+    client = AsyncCountingClient()
+    provider = ParamsProvider(client)
+
+    async def fetch_twice() -> Any:
+        return await provider.get_async(), await provider.get_async()
+
+    first, second = asyncio.run(fetch_twice())
+    assert first is second
+    assert client.requests == 1
+
+
+def test_one_provider_per_client() -> None:
+    client = CountingClient()
+    assert get_params_provider(client) is get_params_provider(client)
+    assert get_params_provider(client) is not get_params_provider(CountingClient())
+    suggested_params(client)
+    suggested_params(client)
+    assert client.requests == 1
@@ -0,0 +1,138 @@
+""" Tests of the pooled keep-alive transport against local servers """
+
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from typing import Any, Iterator
+
+import pytest
+from algosdk import account, error
+
+from source.classes.class_AlgodStandIn import AlgodStandIn
+from source.classes.class_PooledTransport import PooledAlgodClient, PooledTransport
+from source.classes.class_RPCInstrumentation import MemorySink, instrument
+
+TOKEN = "a" * 64
+
+
+class _AnswerOnceHandler(socketserver.StreamRequestHandler):
+    """ Answers the first request of a connection and drops it on the second without answering """
+
+    def handle(self) -> None:
+        for answered in range(2):
+            headers = {}
+            line = self.rfile.readline()
+            if not line:
+                return
+            while True:
+                line = self.rfile.readline()
+                if line in (b"\r\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            self.rfile.read(int(headers.get("content-length", 0)))
+            if answered:
+                return
+            self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}")
+
+
+class AnswerOnceServer(socketserver.ThreadingTCPServer):
+    """ Local server that never answers a second request on a connection, connections counts those accepted """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _AnswerOnceHandler)
+        self.connections = 0
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def stand_in() -> Iterator[AlgodStandIn]:
+    with AlgodStandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def answer_once() -> Iterator[AnswerOnceServer]:
+    server = AnswerOnceServer()
+    Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_one_connection(stand_in: AlgodStandIn) -> None:
+    client = PooledAlgodClient(TOKEN, stand_in.address)
+    for _ in range(20):
+        assert client.status()["last-round"] == 1
+    client.close()
+    assert client.transport.opened == 1
+    assert stand_in.connections == 1
+
+
+def test_threads_share_at_most_max_connections(stand_in: AlgodStandIn) -> None:
+    client = PooledAlgodClient(TOKEN, stand_in.address, max_connections=3)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        rounds = list(executor.map(lambda _: client.status()["last-round"], range(200)))
+    client.close()
+    assert rounds == [1] * 200
+    assert client.transport.opened <= 3
+
+
+def test_pipelined_results_keep_the_input_order(stand_in: AlgodStandIn) -> None:
+    client = PooledAlgodClient(TOKEN, stand_in.address)
+    addresses = [account.generate_account()[1] for _ in range(40)]
+    assert [info["address"] for info in client.account_infos(addresses)] == addresses
+    results = client.algod_requests([("/status", None), ("/no-such-route", None), ("/status", None)])
+    client.close()
+    assert results[0] == results[2] and results[0]["last-round"] == 1
+    assert isinstance(results[1], error.AlgodHTTPError) and results[1].code == 404
+    assert stand_in.connections == 1
+
+
+def test_instrumentation_counts_every_pipelined_request(stand_in: AlgodStandIn) -> None:
+    sink = MemorySink()
+    client = instrument(PooledAlgodClient(TOKEN, stand_in.address), sink)
+    client.status()
+    client.account_infos(addresses=[account.generate_account()[1] for _ in range(5)])
+    client.wrapped.close()
+    assert [record.requests for record in sink.records] == [1, 5]
+    assert sink.count() == 6
+    summary = sink.summary("method")
+    assert (summary["account_infos"]["count"], summary["account_infos"]["calls"]) == (5, 1)
+
+
+def test_only_idempotent_requests_are_pipelined(stand_in: AlgodStandIn) -> None:
+    transport = PooledTransport(stand_in.address)
+    with pytest.raises(ValueError):
+        transport.pipeline([("GET", "/v2/status", {}, b""), ("POST", "/v2/transactions", {}, b"x")])
+    assert transport.opened == 0
+
+
+def test_lost_get_is_sent_again(answer_once: AnswerOnceServer) -> None:
+    transport = PooledTransport(f"http://127.0.0.1:{answer_once.server_address[1]}")
+    assert transport.request("GET", "/v2/status", {})[0] == 200
+    # the server reads this one on the reused connection and hangs up without an answer
+    assert transport.request("GET", "/v2/status", {})[0] == 200
+    assert transport.opened == 2
+
+
+def test_lost_post_is_not_sent_again(answer_once: AnswerOnceServer) -> None:
+    transport = PooledTransport(f"http://127.0.0.1:{answer_once.server_address[1]}")
+    assert transport.request("GET", "/v2/status", {})[0] == 200
+    with pytest.raises(ConnectionError):
+        transport.request("POST", "/v2/transactions", {}, b"signed group")
+    assert answer_once.connections == 1
+
+
+def test_new_connection_failing_is_an_error() -> None:
+    server = AnswerOnceServer()
+    port = server.server_address[1]
+    server.server_close()
+    with pytest.raises(ConnectionError):
+        PooledTransport(f"http://127.0.0.1:{port}").request("GET", "/v2/status", {})
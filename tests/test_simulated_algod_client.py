@@ -0,0 +1,113 @@
+""" Tests of the checks and the ledger of the simulated algod client """
+
+from typing import Any, List, Tuple
+
+import pytest
+from algosdk import account, error
+from algosdk.future import transaction
+
+from source.classes.class_SimulatedAlgodClient import MAX_GROUP_SIZE, SimulatedAlgodClient
+
+FUNDING = 10_000_000
+
+
+@pytest.fixture
+def funded() -> Tuple[SimulatedAlgodClient, List[Tuple[str, str]]]:
+    """ Simulator with two funded accounts, as (private key, address) pairs """
+    client = SimulatedAlgodClient(clock=lambda: 1_700_000_000)
+    accounts = [account.generate_account() for _ in range(2)]
+    for _, address in accounts:
+        client.fund_account(address, FUNDING)
+    return client, accounts
+
+
+def payment(client: SimulatedAlgodClient, sender: str, receiver: str, amount: int) -> transaction.PaymentTxn:
+    """ Unsigned payment with the simulator's suggested params """
+    return transaction.PaymentTxn(sender, client.suggested_params(), receiver, amount)
+
+
+def balance(client: SimulatedAlgodClient, address: str) -> int:
+    """ Algo balance of address """
+    return client.account_info(address)["amount"]
+
+
+def test_payment_moves_the_amount_and_the_fee(funded: Any) -> None:
+    client, [(key, sender), (_, receiver)] = funded
+    txn = payment(client, sender, receiver, 1_000)
+    transaction_id = client.send_transaction(txn.sign(key))
+    client.status_after_block(client.status()["last-round"])
+    assert client.pending_transaction_info(transaction_id)["confirmed-round"] > 0
+    assert balance(client, sender) == FUNDING - 1_000 - txn.fee
+    assert balance(client, receiver) == FUNDING + 1_000
+
+
+def test_transaction_signed_by_another_key_is_rejected(funded: Any) -> None:
+    client, [(key, sender), (other_key, receiver)] = funded
+    with pytest.raises(error.AlgodHTTPError, match="should have been authorized by"):
+        client.send_transaction(payment(client, sender, receiver, 1_000).sign(other_key))
+    forged = payment(client, sender, receiver, 1_000).sign(key)
+    forged.signature = payment(client, sender, receiver, 2_000).sign(key).signature
+    with pytest.raises(error.AlgodHTTPError, match="signature didn't pass"):
+        client.send_transaction(forged)
+    assert balance(client, sender) == FUNDING
+
+
+def test_group_must_be_sent_whole(funded: Any) -> None:
+    client, [(key, sender), (other_key, receiver)] = funded
+    group = transaction.assign_group_id([payment(client, sender, receiver, 1_000), payment(client, receiver, sender, 2_000)])
+    with pytest.raises(error.AlgodHTTPError, match="incomplete group"):
+        client.send_transaction(group[0].sign(key))
+    ungrouped = [payment(client, sender, receiver, 1_000).sign(key), payment(client, receiver, sender, 2_000).sign(other_key)]
+    with pytest.raises(error.AlgodHTTPError, match="not grouped"):
+        client.send_transactions(ungrouped)
+    client.send_transactions([group[0].sign(key), group[1].sign(other_key)])
+    assert balance(client, receiver) == FUNDING - 1_000 - group[1].fee
+
+
+def test_failing_transaction_rolls_back_its_group(funded: Any) -> None:
+    client, [(key, sender), (other_key, receiver)] = funded
+    group = transaction.assign_group_id([
+        payment(client, sender, receiver, 1_000),
+        payment(client, receiver, sender, FUNDING * 2),
+    ])
+    with pytest.raises(error.AlgodHTTPError, match="overspend"):
+        client.send_transactions([group[0].sign(key), group[1].sign(other_key)])
+    assert [balance(client, sender), balance(client, receiver)] == [FUNDING, FUNDING]
+
+
+def test_minimum_balance_and_group_size_are_enforced(funded: Any) -> None:
+    client, [(key, sender), (_, receiver)] = funded
+    with pytest.raises(error.AlgodHTTPError, match="below min"):
+        client.send_transaction(payment(client, sender, receiver, FUNDING - 1_000).sign(key))
+    payments = [payment(client, sender, receiver, amount).sign(key) for amount in range(1, MAX_GROUP_SIZE + 2)]
+    with pytest.raises(error.AlgodHTTPError, match="group size 17"):
+        client.send_transactions(payments)
+
+
+def test_replayed_and_expired_transactions_are_rejected(funded: Any) -> None:
+    client, [(key, sender), (_, receiver)] = funded
+    signed = payment(client, sender, receiver, 1_000).sign(key)
+    client.send_transaction(signed)
+    with pytest.raises(error.AlgodHTTPError, match="already in ledger"):
+        client.send_transaction(signed)
+    params = client.suggested_params()
+    params.last = params.first - 1
+    with pytest.raises(error.AlgodHTTPError, match="txn dead"):
+        client.send_transaction(transaction.PaymentTxn(sender, params, receiver, 1_000).sign(key))
+
+
+def test_unknown_transaction_and_application_are_not_found(funded: Any) -> None:
+    client, _ = funded
+    with pytest.raises(error.AlgodHTTPError, match="txn does not exist"):
+        client.pending_transaction_info("unknown")
+    with pytest.raises(error.AlgodHTTPError, match="application does not exist"):
+        client.application_info(1234)
+
+
+def test_advancing_time_moves_the_clock_and_produces_a_block(funded: Any) -> None:
+    client, _ = funded
+    first = client.status()["last-round"]
+    before = client.now()
+    client.advance_time(30)
+    assert client.now() == before + 30
+    assert client.status()["last-round"] > first
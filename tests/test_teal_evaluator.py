@@ -0,0 +1,180 @@
+""" Tests of TealEvaluator against the simulator's Python model of the contract """
+
+import random
+from typing import Any, List, Tuple
+
+import pytest
+from algosdk import account, encoding
+from algosdk.future import transaction
+
+from source.classes.class_Auction import Auction
+from source.classes.class_ContractCompiler import CompiledContracts
+from source.classes.class_SimulatedAlgodClient import GroupContext, SimulatedAlgodClient
+from source.classes.class_TealEvaluator import APP_CALL_BUDGET, TealEvaluator, assemble
+from source.classes.class_UserAccount import UserAccount
+from source.utils.utils_console import quiet
+
+STORIES = 60
+BIDDERS = 4
+FUNDING = 100_000_000
+AMOUNTS = [500, 1_000_000, 1_050_000, 1_100_000, 2_000_000, 5_000_000, 5_050_000, 5_100_000, 9_000_000]
+CLOCK = 1_700_000_000
+
+
+def new_client(execute_teal: bool = True) -> SimulatedAlgodClient:
+    """ Simulator on a frozen clock, so a story runs the same every time """
+    return SimulatedAlgodClient(clock=lambda: CLOCK, execute_teal=execute_teal)
+
+
+def new_actors(client: SimulatedAlgodClient, private_keys: List[str]) -> List[UserAccount]:
+    """ Funded accounts for private_keys """
+    actors = [UserAccount(private_key) for private_key in private_keys]
+    for actor in actors:
+        client.fund_account(actor.get_address(), FUNDING)
+    return actors
+
+
+def bid_story(seed: int, private_keys: List[str], execute_teal: bool, contract: str) -> Tuple[List[Any], List[Any]]:
+    """ Random bids, waits and closes on one auction: the outcome of each step and the final holdings """
+    rng = random.Random(seed)
+    client = new_client(execute_teal)
+    artist, auctioneer, *bidders = new_actors(client, private_keys)
+    outcomes: List[Any] = []
+    with quiet():
+        now = client.now()
+        auction = Auction(client, artist, auctioneer, artist.create_asset(client),
+                          start_time=now + 10, end_time=now + 100, contract=contract)
+        auction.init_auction()
+        for _ in range(25):
+            draw = rng.random()
+            if draw < 0.15:
+                client.advance_time(rng.choice([3, 10, 30]))
+                outcomes.append(("wait",))
+            elif draw < 0.8:
+                bidder = rng.choice(bidders)
+                amount = rng.choice(AMOUNTS)
+                outcomes.append(("bid", amount, auction.place_bid(bidder, amount, with_opt_in=rng.random() < 0.5)))
+            else:
+                closer = rng.choice([artist, auctioneer, bidders[0]])
+                outcomes.append(("close", bool(auction.close(closer))))
+                if outcomes[-1][1]:
+                    break
+    holdings = [sorted(actor.get_balance(client).items()) for actor in [artist, auctioneer, *bidders]]
+    return outcomes, holdings
+
+
+@pytest.mark.parametrize("seed", range(STORIES))
+def test_teal_matches_native_model(seed: int) -> None:
+    private_keys = [account.generate_account()[0] for _ in range(2 + BIDDERS)]
+    native = bid_story(seed, private_keys, False, "baseline")
+    assert bid_story(seed, private_keys, True, "baseline") == native
+    assert bid_story(seed, private_keys, True, "optimized") == native
+
+
+@pytest.mark.parametrize("contract", ["baseline", "optimized"])
+def test_create_call_with_bid_as_first_argument_creates_the_app(contract: str) -> None:
+    client = new_client()
+    (creator,) = new_actors(client, [account.generate_account()[0]])
+    approval, clear = CompiledContracts(client, cache_dir=None, contract=contract).get_compiled_contracts()
+    create = transaction.ApplicationCreateTxn(
+        creator.get_address(), client.suggested_params(), transaction.OnComplete.NoOpOC, approval, clear,
+        transaction.StateSchema(num_uints=7, num_byte_slices=3), transaction.StateSchema(num_uints=0, num_byte_slices=0),
+        app_args=[b"bid", 1, CLOCK + 10, CLOCK + 100, 0, 1, encoding.decode_address(creator.get_address())],
+    )
+    transaction_id = client.send_transaction(create.sign(creator.get_private_key()))
+    assert client.pending_transaction_info(transaction_id)["application-index"] > 0
+
+
+@pytest.fixture(scope="module")
+def running_auction() -> Tuple[SimulatedAlgodClient, Auction, List[UserAccount]]:
+    """ Auction that has started and holds one bid """
+    client = new_client()
+    artist, auctioneer, first, second = new_actors(client, [account.generate_account()[0] for _ in range(4)])
+    with quiet():
+        now = client.now()
+        auction = Auction(client, artist, auctioneer, artist.create_asset(client), start_time=now + 10, end_time=now + 100)
+        auction.init_auction()
+        client.advance_time(11)
+        assert auction.place_bid(first, 2_000_000, with_opt_in=True)
+    return client, auction, [first, second]
+
+
+def bid_group(client: SimulatedAlgodClient, auction: Auction, bidder: UserAccount, previous: UserAccount, amount: int) -> List[transaction.Transaction]:
+    """ Unsigned payment and bid call of bidder """
+    params = client.suggested_params()
+    payment = transaction.PaymentTxn(bidder.get_address(), params, client.application_address(auction.app_id), amount)
+    call = transaction.ApplicationCallTxn(
+        bidder.get_address(), params, auction.app_id, transaction.OnComplete.NoOpOC,
+        app_args=[b"bid"], foreign_assets=[auction.nft_id], accounts=[previous.get_address()],
+    )
+    return transaction.assign_group_id([payment, call])
+
+
+def evaluate(client: SimulatedAlgodClient, evaluator: TealEvaluator, group: List[transaction.Transaction], index: int, app_id: int) -> Any:
+    """ Result of group[index] against a fresh context, with the group's payment applied first """
+    context = GroupContext(client, client.now())
+    if group[0].type == "pay":
+        context.pay(group[0].sender, group[0].receiver, group[0].amt)
+    return evaluator.evaluate(context, group, index, app_id)
+
+
+def test_unsupported_opcode_raises_value_error() -> None:
+    with pytest.raises(ValueError, match="unsupported opcode ed25519verify"):
+        assemble("#pragma version 5\nbyte 0x00\nbyte 0x00\nbyte 0x00\ned25519verify")
+
+
+def test_newer_teal_version_raises_value_error() -> None:
+    with pytest.raises(ValueError, match="TEAL version 6"):
+        assemble("#pragma version 6\nint 1")
+
+
+def test_endless_loop_exhausts_the_budget(running_auction: Any) -> None:
+    client, auction, (bidder, previous) = running_auction
+    group = bid_group(client, auction, bidder, previous, 2_200_000)
+    result = evaluate(client, TealEvaluator("#pragma version 5\nloop:\nint 1\nbnz loop\nint 1"), group, 1, auction.app_id)
+    assert not result.passed
+    assert "dynamic cost budget exceeded" in result.error
+    # the bid group holds one application call
+    assert result.cost > APP_CALL_BUDGET
+
+
+def test_application_calls_of_a_group_share_one_budget(running_auction: Any) -> None:
+    client, auction, (bidder, _) = running_auction
+    # 7 ops per iteration, about 900 for the program: more than one call's budget, less than two
+    evaluator = TealEvaluator("#pragma version 5\nint 0\nstore 0\nloop:\nload 0\nint 1\n+\ndup\nstore 0\nint 128\n<\nbnz loop\nint 1")
+    params = client.suggested_params()
+    calls = transaction.assign_group_id([
+        transaction.ApplicationCallTxn(bidder.get_address(), params, auction.app_id, transaction.OnComplete.NoOpOC, note=bytes([call]))
+        for call in range(2)
+    ])
+    context = GroupContext(client, client.now())
+    first = evaluator.evaluate(context, calls, 0, auction.app_id)
+    assert first.passed and APP_CALL_BUDGET < first.cost < 2 * APP_CALL_BUDGET
+    second = evaluator.evaluate(context, calls, 1, auction.app_id)
+    assert not second.passed
+    assert f"budget {2 * APP_CALL_BUDGET - first.cost}" in second.error
+    # on its own each call fits in the group's budget
+    assert evaluate(client, evaluator, calls, 1, auction.app_id).passed
+
+
+@pytest.mark.parametrize("fuse", [True, False])
+def test_negative_gtxns_offset_fails(running_auction: Any, fuse: bool) -> None:
+    client, auction, (bidder, previous) = running_auction
+    group = bid_group(client, auction, bidder, previous, 2_200_000)
+    teal = "#pragma version 5\ntxn GroupIndex\nint 1\n-\ngtxns Amount\nint 0\n>"
+    assert evaluate(client, TealEvaluator(teal, fuse), group, 1, auction.app_id).passed
+    result = evaluate(client, TealEvaluator(teal, fuse), group, 0, auction.app_id)
+    assert not result.passed
+    assert "- would result negative" in result.error
+    assert result.error.endswith("line=4")
+
+
+@pytest.mark.parametrize("amount", [500, 2_000_000, 2_050_000, 2_100_000, 9_000_000])
+def test_fused_and_unfused_programs_agree(running_auction: Any, amount: int) -> None:
+    client, auction, (bidder, previous) = running_auction
+    teal = client.apps[auction.app_id]["approval"][1:].decode()
+    group = bid_group(client, auction, bidder, previous, amount)
+    fused = evaluate(client, TealEvaluator(teal, fuse=True), group, 1, auction.app_id)
+    unfused = evaluate(client, TealEvaluator(teal, fuse=False), group, 1, auction.app_id)
+    assert fused == unfused
+    assert len(assemble(teal, fuse=True).ops) < len(assemble(teal, fuse=False).ops)